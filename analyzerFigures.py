@@ -0,0 +1,88 @@
+# dataAnalyzer.py figures: each draws one chart from review cube roll-ups (reviewCube.py)
+#
+# matplotlib and seaborn are imported on first draw, so loading this module is cheap and the
+# functions can run in headless render workers (see figureRenderer.py).
+
+
+def _plotting():
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    return plt, sns
+
+
+def reviews_per_source(counts):
+    plt, sns = _plotting()
+    plt.figure(figsize=(6, 4))
+    sns.barplot(x=counts.index.astype(str), y=counts.values, palette="Set2")
+    plt.title("Number of Reviews per Source")
+    plt.ylabel("Count")
+    plt.tight_layout()
+
+
+def rating_distribution(histogram, width):
+    plt, sns = _plotting()
+    plt.figure(figsize=(8, 5))
+    sns.histplot(data=histogram.assign(rating=histogram["rating_bin"] + width / 2), x="rating", weights="rating_count",
+                 binwidth=width, binrange=(0, 10), kde=True, color="skyblue")
+    plt.title("Distribution of Review Ratings")
+    plt.xlabel("Rating")
+    plt.ylabel("Frequency")
+    plt.tight_layout()
+
+
+def rating_by_year(yearly):
+    plt, _ = _plotting()
+    plt.figure(figsize=(8, 5))
+    plt.plot(yearly.index, yearly["mean"], marker='o', color='coral')
+    plt.fill_between(yearly.index, yearly["ci_low"], yearly["ci_high"], color='coral', alpha=0.2, linewidth=0)
+    plt.title("Average Rating by Year with Trend Line")
+    plt.ylabel("Average Rating")
+    plt.xlabel("Year")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def reviews_by_year(counts):
+    plt, _ = _plotting()
+    plt.figure(figsize=(8, 4))
+    counts.plot(kind='bar', color='teal')
+    plt.title("Number of Reviews by Year")
+    plt.ylabel("Review Count")
+    plt.xlabel("Year")
+    plt.tight_layout()
+
+
+def reviews_by_traveler_type(counts):
+    plt, sns = _plotting()
+    plt.figure(figsize=(8, 4))
+    sns.barplot(x=counts.index.astype(str), y=counts.values, palette='pastel')
+    plt.title("Number of Reviews by Traveler Type")
+    plt.ylabel("Count")
+    plt.xlabel("Traveler Type")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def rating_by_traveler_type(avg_rating):
+    plt, sns = _plotting()
+    plt.figure(figsize=(8, 5))
+    sns.barplot(x=avg_rating.index.astype(str), y=avg_rating.values, palette="viridis")
+    plt.title("Average Review Rating by Traveler Type")
+    plt.xlabel("Traveler Type")
+    plt.ylabel("Average Rating")
+    plt.ylim(0, 10)  # assuming ratings are out of 10
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def rating_by_length_of_stay(stays):
+    plt, sns = _plotting()
+    plt.figure(figsize=(8, 5))
+    sns.barplot(x=stays.index.astype(str), y=stays["mean"].to_numpy(), palette='Blues')
+    plt.errorbar(range(len(stays)), stays["mean"], fmt="none", ecolor="black", capsize=3,
+                 yerr=[stays["mean"] - stays["ci_low"], stays["ci_high"] - stays["mean"]])
+    plt.title("Average Review Rating by Length of Stay (95% CI)")
+    plt.xlabel("Length of Stay (nights)")
+    plt.ylabel("Rating")
+    plt.tight_layout()
@@ -0,0 +1,71 @@
+# Benchmark: dataAnalyzer's numbers from raw reviews vs from the review cube, as history grows
+#
+# The raw path reads the analyzer's columns from the Parquet store and groups them; the cube
+# path loads review_cube.parquet and rolls it up. Also times folding a batch of new reviews
+# into the cube.
+# Usage:
+#   python benchmarkCube.py [max_rows] [workdir]      # default 2,000,000 rows in ./cube_bench
+
+import os
+import shutil
+import sys
+import time
+
+from benchmarkStorage import synthetic_cleaned
+from reviewCube import build_cube, load_cube, save_cube, summarize, update_cube
+from reviewSchema import apply_schema
+from reviewStore import read_reviews, write_reviews
+
+COLUMNS = ["source", "review_date", "review_rating", "traveler_type", "length_of_stay"]
+
+
+def raw_refresh(store):
+    df = read_reviews(store, columns=COLUMNS, since="2014-01-01")
+    df["year"] = df["review_date"].dt.year
+    df.groupby("source", observed=True).size()
+    df.groupby("year")["review_rating"].agg(["mean", "count", "std"])
+    df.groupby("traveler_type", observed=True)["review_rating"].mean()
+    df.groupby("length_of_stay")["review_rating"].describe()
+
+
+def cube_refresh(path):
+    cube = load_cube(path)
+    cube = cube[cube["year"] >= 2014]
+    cube.groupby("source")["reviews"].sum()
+    summarize(cube, ["year"])
+    summarize(cube, ["traveler_type"])
+    summarize(cube, ["stay_bucket"])
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    workdir = sys.argv[2] if len(sys.argv) > 2 else "cube_bench"
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    store, cube_path = os.path.join(workdir, "cleaned_reviews"), os.path.join(workdir, "review_cube.parquet")
+
+    batch, rows, seed = max_rows // 8, 0, 0
+    while rows < max_rows:
+        # One cleaner run's worth of new reviews (text is not needed here)
+        new = apply_schema(synthetic_cleaned(batch, seed=seed).assign(text="x"))
+        write_reviews(new, store, append=rows > 0)
+        start = time.perf_counter()
+        if rows:
+            update_cube(new, cube_path)
+        else:
+            save_cube(build_cube(new), cube_path)
+        update = time.perf_counter() - start
+        rows, seed = rows + batch, seed + 1
+        if seed in (1, 2, 4, 8):   # history doubling
+            print(f"history={rows:9d}  raw refresh={timed(raw_refresh, store):6.3f}s  "
+                  f"cube refresh={timed(cube_refresh, cube_path):6.3f}s  "
+                  f"cube cells={len(load_cube(cube_path)):7d}  batch update={update:5.2f}s")
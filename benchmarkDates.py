@@ -0,0 +1,59 @@
+# Benchmark: per-row dateutil parsing (original dataCleaner path) vs dateNormalizer
+#
+# Usage:
+#   python benchmarkDates.py [rows]      # default 1,000,000 rows
+
+import random
+import sys
+import time
+
+import pandas as pd
+from dateutil import parser
+
+from dateNormalizer import DATE_FORMATS, parse_review_dates
+
+# Each source's raw date text as the scrapers produce it, plus a few stragglers for the fallback
+SOURCE_FORMATS = {
+    "Booking": lambda d: f"{d:%B} {d.day}, {d.year}",
+    "Expedia": lambda d: f"{d:%b} {d.day}, {d.year}",
+    "Tripadvisor": lambda d: f"{d:%B} {d.day}, {d.year}",
+}
+STRAGGLERS = ["2024-03-05", "5 March 2024", "Mar 2024", None]
+
+
+def synthetic_dates(source, n, seed=0):
+    rng = random.Random(seed)
+    days = pd.date_range("2012-01-01", "2025-12-31", freq="D")
+    fmt = SOURCE_FORMATS[source]
+    pool = [fmt(d) for d in days]
+    return pd.Series([rng.choice(pool) if rng.random() > 0.001 else rng.choice(STRAGGLERS) for _ in range(n)])
+
+
+def original(values):
+    parsed = values.apply(lambda x: parser.parse(x) if pd.notna(x) else pd.NaT)
+    return pd.to_datetime(parsed, errors="coerce")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    per_source = rows // len(SOURCE_FORMATS)
+    total_old = total_new = 0.0
+    for i, source in enumerate(SOURCE_FORMATS):
+        values = synthetic_dates(source, per_source, seed=i)
+
+        start = time.perf_counter()
+        old = original(values)
+        t_old = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = parse_review_dates(values, DATE_FORMATS.get(source))
+        t_new = time.perf_counter() - start
+
+        # Stragglers like "Mar 2024" take today's day from dateutil in both paths
+        assert old.astype("datetime64[ns]").equals(new.astype("datetime64[ns]")), f"{source}: parsed dates differ"
+        total_old += t_old
+        total_new += t_new
+        print(f"{source:12s} rows={per_source:8d}  dateutil={t_old:7.2f}s  vectorized={t_new:6.2f}s  "
+              f"speedup={t_old / t_new:6.1f}x  (identical)")
+    print(f"{'total':12s} rows={per_source * len(SOURCE_FORMATS):8d}  dateutil={total_old:7.2f}s  "
+          f"vectorized={total_new:6.2f}s  speedup={total_old / total_new:6.1f}x")
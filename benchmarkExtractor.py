@@ -0,0 +1,296 @@
+# Benchmark: compiled lxml extraction vs the scrapers' original BeautifulSoup code (rows must match)
+#
+# Usage:
+#   python benchmarkExtractor.py                      # synthetic pages for all platforms
+#   python benchmarkExtractor.py booking snapshots/   # saved page_source snapshots
+
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from reviewExtractor import extract_page, extract_snapshots
+
+CARDS_PER_PAGE = 200
+PAGES = 5
+
+
+# --- Reference: the scrapers' original BeautifulSoup parsing, as it was before reviewExtractor ---
+# Kept verbatim apart from returning (header, rows), so the engine is checked against the old
+# scrapers' behaviour and not against its own field specs and row functions.
+def booking_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    try:
+        total_rating_elem = soup.select_one("div.f63b14ab7a.dff2e52086")
+        total_rating = total_rating_elem.text.strip() if total_rating_elem else None
+
+        total_reviews_elem = soup.select_one("div.fff1944c52.fb14de7f14.eaa8455879")
+        total_reviews = total_reviews_elem.text.strip() if total_reviews_elem else None
+    except:
+        total_rating = None
+        total_reviews = None
+
+    review_list = []
+    for review in soup.select("div[data-testid='review-card']"):
+        try:
+            positive = review.select_one('div[data-testid="review-positive-text"]').get_text(separator=" ", strip=True)
+        except:
+            positive = ""
+        try:
+            negative = review.select_one('div[data-testid="review-negative-text"]').get_text(separator=" ", strip=True)
+        except:
+            negative = ""
+        review_text = (positive + " " + negative).strip()
+        try:
+            rating_raw = review.select_one("div.f63b14ab7a.dff2e52086").text.strip()
+            rating = float(rating_raw.split('/')[0])
+        except:
+            rating = None
+        try:
+            name = review.select_one("div.b08850ce41.f546354b44").text.strip()
+        except:
+            name = None
+        try:
+            date_elem = review.select_one("span[data-testid='review-date']")
+            raw_date = date_elem.text.strip()
+            review_date = raw_date.replace("Reviewed:", "").strip()
+        except Exception:
+            review_date = None
+        try:
+            stay_elem = review.select_one("span[data-testid='review-num-nights']")
+            stay_text = stay_elem.text.strip()
+            match = re.search(r"(\d+)\s+nights?", stay_text)
+            length_of_stay = int(match.group(1)) if match else None
+        except Exception:
+            length_of_stay = None
+        try:
+            traveler_type_elem = review.select_one("span[data-testid='review-traveler-type']")
+            traveler_type = traveler_type_elem.text.strip() if traveler_type_elem else None
+        except Exception:
+            traveler_type = None
+
+        review_list.append({
+            'review_text': review_text,
+            'review_rating': rating,
+            'traveler_name': name,
+            'review_date': review_date,
+            'length_of_stay': length_of_stay,
+            'traveler_type': traveler_type
+        })
+    return {"total_rating": total_rating, "total_reviews": total_reviews}, review_list
+
+
+def expedia_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    try:
+        total_rating_elem = soup.select_one("div.uitk-text.uitk-type-500.uitk-type-bold.uitk-text-default-theme")
+        total_rating_raw = total_rating_elem.text.strip() if total_rating_elem else None
+        total_rating = float(total_rating_raw.split('/')[0])
+
+        total_reviews_elem = soup.select_one("button.uitk-more-info-trigger > span")
+        total_reviews = total_reviews_elem.text.strip() if total_reviews_elem else None
+    except:
+        total_rating = None
+        total_reviews = None
+
+    review_list = []
+    for review in soup.select('article[itemprop="review"]'):
+        try:
+            review_text = review.select_one("span[itemprop='description']").text.strip()
+        except:
+            review_text = None
+        try:
+            rating_raw = review.select_one("span[itemprop='ratingValue']").text.strip()
+            rating = float(rating_raw.split('/')[0])
+        except:
+            rating = None
+        try:
+            name = review.select_one("h4.uitk-heading.uitk-heading-7").text.strip()
+        except:
+            name = None
+        try:
+            date = review.select_one("span[itemprop='datePublished']").text.strip()
+        except:
+            date = None
+        try:
+            traveler_type = review.select_one("div.uitk-text.uitk-type-300.uitk-text-standard-theme").text.strip()
+        except:
+            traveler_type = None
+        try:
+            stay_text = review.select_one("div.uitk-text.uitk-type-200.uitk-text-standard-theme.uitk-layout-flex-item").text.strip()
+            match = re.search(r"Stayed (\d+) night", stay_text)
+            length_of_stay = int(match.group(1)) if match else None
+        except:
+            length_of_stay = None
+
+        review_list.append({
+            'review_text': review_text,
+            'review_rating': rating,
+            'traveler_name': name,
+            'review_date': date,
+            'length_of_stay': length_of_stay,
+            'traveler_type': traveler_type
+        })
+    return {"total_rating": total_rating, "total_reviews": total_reviews}, review_list
+
+
+def tripadvisor_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    total_rating = None
+    rating_div = soup.find("div", {"data-automation": "bubbleRatingValue"})
+    if rating_div:
+        try:
+            total_rating = round(float(rating_div.text.strip()) * 2, 1)  # Convert to 10 scale
+        except ValueError:
+            total_rating = None
+    total_reviews = None
+    review_count_div = soup.find("div", {"data-automation": "bubbleReviewCount"})
+    if review_count_div:
+        match = re.search(r"([\d,]+)", review_count_div.text)
+        if match:
+            total_reviews = int(match.group(1).replace(",", ""))
+
+    reviews_data = []
+    for div in soup.select("div[class*='JVaPo']"):
+        text_el = div.select_one("span._d._c[data-automation^='reviewText']")
+        review_text = text_el.get_text(strip=True) if text_el else None
+        rating = None
+        title_el = div.select_one("svg[data-automation='bubbleRatingImage'] title")
+        if title_el:
+            m = re.search(r"(\d(?:\.\d)?) of 5 bubbles", title_el.text)
+            if m:
+                rating = float(m.group(1)) * 2
+
+        name_el = div.select_one("a.BMQDV._F.Gv.wSSLS.SwZTJ.FGwzt.ukgoS")
+        traveler_name = name_el.get_text(strip=True) if name_el else None
+
+        title_link = div.select_one("div[data-test-target='review-title'] > div > a")
+        review_title = title_link.get_text(strip=True) if title_link else None
+
+        date_el = div.select_one("div.hDWtV span[title]")
+        review_date = date_el["title"] if date_el else None
+
+        visited_divs = div.select("div.TgEgi div.biGQs._P.fiohW.fOtGX")
+        date_visited = visited_divs[0].get_text(strip=True) if len(visited_divs) > 0 else None
+        trip_type_raw = visited_divs[1].get_text(strip=True) if len(visited_divs) > 1 else None
+        if trip_type_raw == "Friends":
+            traveler_type = "Group"
+        elif trip_type_raw == "Business":
+            traveler_type = "Solo"
+        else:
+            traveler_type = trip_type_raw
+
+        reviews_data.append({
+            "review_text": review_text,
+            "review_rating": rating,
+            "traveler_name": traveler_name,
+            "review_title": review_title,
+            "review_date": review_date,
+            "date_visited": date_visited,
+            "traveler_type": traveler_type
+        })
+    return {"total_rating": total_rating, "total_reviews": total_reviews}, reviews_data
+
+
+ORIGINAL = {"booking": booking_bs4, "expedia": expedia_bs4, "tripadvisor": tripadvisor_bs4}
+
+# --- Synthetic page builders that mimic each platform's markup ---
+# Markup inside fields whose text BeautifulSoup leaves out
+HIDDEN = ["", "<script>track('card')</script> tail", "<style>.x{}</style>", "<!-- comment --> after"]
+
+
+def booking_card(i):
+    neg = "" if i % 7 == 0 else f'<div data-testid="review-negative-text"><span> Noise from   street </span><b>#{i}</b></div>'
+    stay = "" if i % 5 == 0 else f"<span data-testid='review-num-nights'>{i % 9 + 1} night{'s' if i % 9 else ''} · March</span>"
+    return f"""
+    <div data-testid='review-card'>
+      <div class="b08850ce41 f546354b44"> Guest {i} </div>
+      <span data-testid='review-traveler-type'>{random.choice(['Couple', 'Family', 'Solo traveler', 'Group'])}</span>
+      {stay}
+      <span data-testid='review-date'>Reviewed: March {i % 28 + 1}, 2024</span>
+      <div class="f63b14ab7a dff2e52086">{i % 10}.0</div>
+      <div data-testid="review-positive-text"><p>Great <i>location</i>, friendly staff</p> &amp; clean rooms {i}{HIDDEN[i % 4]}</div>
+      {neg}
+    </div>"""
+
+
+def expedia_card(i):
+    return f"""
+    <article itemprop="review">
+      <span itemprop="ratingValue">{i % 10 + 1}/10 Excellent</span>
+      <h4 class="uitk-heading uitk-heading-7">Traveler {i}</h4>
+      <span itemprop="datePublished">Mar {i % 28 + 1}, 2024</span>
+      <div class="uitk-text uitk-type-300 uitk-text-standard-theme">Traveled with partner</div>
+      <div class="uitk-text uitk-type-200 uitk-text-standard-theme uitk-layout-flex-item">Stayed {i % 6 + 1} nights in Mar 2024</div>
+      <span itemprop="description"> Room was  fine.{HIDDEN[i % 4]} Pool {i} was closed. </span>
+    </article>"""
+
+
+def tripadvisor_card(i):
+    trip = random.choice(["Friends", "Business", "Couples", "Family"])
+    return f"""
+    <div class="JVaPo Gi kQjeB">
+      <svg data-automation="bubbleRatingImage"><title>{i % 5 + 1}.0 of 5 bubbles</title></svg>
+      <a class="BMQDV _F Gv wSSLS SwZTJ FGwzt ukgoS" href="#">Member {i}</a>
+      <div data-test-target="review-title"><div><a href="#"><span>Lovely stay {i}</span></a></div></div>
+      <div class="hDWtV"><span title="March {i % 28 + 1}, 2024">2 weeks ago</span></div>
+      <div class="TgEgi"><div class="biGQs _P fiohW fOtGX">March 2024</div><div class="biGQs _P fiohW fOtGX">{trip}</div></div>
+      <span class="_d _c" data-automation="reviewText_{i}"><span>Nice view.</span> <span>Small room {i}.</span>{HIDDEN[i % 4]}</span>
+    </div>"""
+
+
+HEADERS = {
+    "booking": '<div class="f63b14ab7a dff2e52086">8.7</div><div class="fff1944c52 fb14de7f14 eaa8455879">1,234 reviews</div>',
+    "expedia": '<div class="uitk-text uitk-type-500 uitk-type-bold uitk-text-default-theme">9.2/10</div>'
+               '<button class="uitk-more-info-trigger"><span>1,024 verified reviews</span></button>',
+    "tripadvisor": '<div data-automation="bubbleRatingValue">4.5</div><div data-automation="bubbleReviewCount">2,345 reviews</div>',
+}
+CARDS = {"booking": booking_card, "expedia": expedia_card, "tripadvisor": tripadvisor_card}
+
+
+def synthetic_page(platform, n):
+    cards = "".join(CARDS[platform](i) for i in range(n))
+    return f"<html><head><title>x</title></head><body><header>{HEADERS[platform]}</header><main>{cards}</main></body></html>"
+
+
+def timed(fn, pages):
+    start = time.perf_counter()
+    results = [fn(html) for html in pages]
+    return results, time.perf_counter() - start
+
+
+def run(platform, pages):
+    ref, t_bs4 = timed(ORIGINAL[platform], pages)
+    fast, t_lxml = timed(lambda html: extract_page(html, platform), pages)
+    if ref != fast:
+        for i, (a, b) in enumerate(zip(ref, fast)):
+            if a != b:
+                raise AssertionError(f"{platform}: page {i} rows differ from BeautifulSoup output")
+        raise AssertionError(f"{platform}: page count differs")
+    rows = sum(len(r) for _, r in fast)
+    print(f"{platform:12s} pages={len(pages):3d} rows={rows:6d}  "
+          f"bs4={t_bs4:7.3f}s  lxml={t_lxml:7.3f}s  speedup={t_bs4 / t_lxml:5.1f}x  (rows identical)")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    if len(sys.argv) == 3:
+        platform, snapshot_dir = sys.argv[1], sys.argv[2]
+        paths = sorted(glob.glob(os.path.join(snapshot_dir, "*.html")))
+        pages = []
+        for p in paths:
+            with open(p, encoding="utf-8") as f:
+                pages.append(f.read())
+        run(platform, pages)
+
+        start = time.perf_counter()
+        pooled = extract_snapshots(paths, platform)
+        print(f"process pool over {len(paths)} snapshots: {time.perf_counter() - start:.3f}s")
+        assert pooled == [extract_page(html, platform) for html in pages]
+    else:
+        for platform in CARDS:
+            run(platform, [synthetic_page(platform, CARDS_PER_PAGE) for _ in range(PAGES)])
@@ -0,0 +1,62 @@
+# Benchmark: nearDuplicates scaling on synthetic reviews with planted cross-platform copies
+#
+# Usage:
+#   python benchmarkNearDuplicates.py [max_rows]      # default 1,000,000 rows, doubling from 125k
+
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from nearDuplicates import find_near_duplicates, resolve_clusters
+
+WORDS = ("room staff clean friendly breakfast pool view location bed noisy quiet spacious small "
+         "helpful rude check late early parking beach walk restaurant bar shower towels wifi price "
+         "value great terrible lovely stay night weekend family couple again recommend").split()
+PRIORITY = {"Booking": 3, "Expedia": 2, "Tripadvisor": 1}
+
+
+def synthetic_reviews(n, dup_share=0.05, seed=0):
+    """n reviews; dup_share of them are copies of another with spacing, truncation or punctuation changes."""
+    rng = random.Random(seed)
+    days = pd.date_range("2014-01-01", "2025-12-31", freq="D")
+    n_dups = int(n * dup_share)
+    texts = [" ".join(rng.choices(WORDS, k=rng.randint(15, 60))) for _ in range(n - n_dups)]
+    dates = [days[rng.randrange(len(days))] for _ in texts]
+    truth = list(range(len(texts)))
+    for _ in range(n_dups):
+        i = rng.randrange(n - n_dups)
+        words = texts[i].split()
+        variant = rng.choice(["space", "truncate", "punct"])
+        if variant == "space":
+            copy = "  ".join(words)
+        elif variant == "truncate":
+            copy = " ".join(words[:max(6, int(len(words) * 0.85))]) + "..."
+        else:
+            copy = ", ".join(words).capitalize() + "!"
+        texts.append(copy)
+        dates.append(dates[i] + pd.Timedelta(days=rng.randint(0, 2)))
+        truth.append(i)
+    sources = [rng.choice(list(PRIORITY)) for _ in texts]
+    return pd.DataFrame({"text": texts, "review_date": dates, "source": sources}), np.array(truth)
+
+
+if __name__ == "__main__":
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = 125_000
+    while rows <= max_rows:
+        df, truth = synthetic_reviews(rows)
+        start = time.perf_counter()
+        priority, length = df["source"].map(PRIORITY), df["text"].str.len()
+        clusters = find_near_duplicates(df, priority=priority, tiebreak=length)
+        keep = resolve_clusters(clusters, priority, length)
+        elapsed = time.perf_counter() - start
+
+        planted = np.flatnonzero(truth != np.arange(len(truth)))
+        found = clusters.to_numpy()
+        recall = np.mean((found[planted] >= 0) & (found[planted] == found[truth[planted]]))
+        print(f"rows={rows:9d}  time={elapsed:7.2f}s  per 100k={elapsed / rows * 1e5:5.2f}s  "
+              f"clustered={int((found >= 0).sum()):7d}  removed={int((~keep).sum()):7d}  recall={recall:.3f}")
+        rows *= 2
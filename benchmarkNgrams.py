@@ -0,0 +1,70 @@
+# Benchmark: top-20 phrases via CountVectorizer(max_features=20) + toarray() vs NgramCounter
+#
+# Each path runs in a fresh interpreter so peak RSS is measured per path; the synthetic corpus
+# draws words from a Zipf distribution so the n-gram vocabulary grows like real reviews.
+# Usage:
+#   python benchmarkNgrams.py [reviews]      # default 200,000 reviews
+
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from ngramCounter import NgramCounter
+
+BY = ["source", "traveler_type", "sentiment_category"]
+
+
+def synthetic_corpus(n, seed=0, words=30_000):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocabulary = np.array(["".join(rng.choice(letters, size=rng.integers(3, 9))) for _ in range(words)])
+    ranks = np.minimum(rng.zipf(1.3, size=n * 40), words) - 1
+    lengths = rng.integers(10, 70, size=n)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    tokens = vocabulary[ranks[:bounds[-1]] % words]
+    texts = [" ".join(tokens[bounds[i]:bounds[i + 1]]) for i in range(n)]
+    return pd.Series(texts), pd.DataFrame({
+        "source": rng.choice(["Booking", "Expedia", "Tripadvisor"], size=n),
+        "traveler_type": rng.choice(["Couple", "Family", "Group", "Solo", "Unknown"], size=n),
+        "sentiment_category": rng.choice(["Negative", "Neutral", "Positive"], size=n),
+    })
+
+
+def dense(texts, groups):
+    # The previous customerInsights.py path
+    vectorizer = CountVectorizer(ngram_range=(2, 3), stop_words="english", max_features=20)
+    X2 = vectorizer.fit_transform(texts)
+    return pd.DataFrame({"ngram": vectorizer.get_feature_names_out(), "count": X2.toarray().sum(axis=0)})
+
+
+def chunked(texts, groups):
+    return NgramCounter(by=BY).fit(texts, groups).top(20)
+
+
+def child(mode, n):
+    texts, groups = synthetic_corpus(n)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    top = {"dense": dense, "chunked": chunked}[mode](texts, groups)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(elapsed, (peak - baseline) / 1024, " ".join(map(str, sorted(top["count"], reverse=True))))
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--child":
+    child(sys.argv[2], int(sys.argv[3]))
+elif __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    results = {}
+    for mode in ["dense", "chunked"]:
+        out = subprocess.run([sys.executable, __file__, "--child", mode, str(n)],
+                             capture_output=True, text=True, check=True).stdout.split()
+        results[mode] = float(out[0]), float(out[1]), out[2:]
+        print(f"{mode:8s} reviews={n}  time={results[mode][0]:.2f}s  peak RSS +{results[mode][1]:.0f}MB")
+    assert results["dense"][2] == results["chunked"][2], "top-20 counts differ"
+    print("top-20 counts identical")
@@ -0,0 +1,148 @@
+# Benchmark: dataCleaner.py in memory vs --engine chunked as the raw CSVs grow 10x and 100x
+#
+# Each engine runs in a fresh interpreter in its own directory, so peak RSS is measured per
+# engine and input size. The outputs are compared: cleaned_reviews.csv and
+# near_duplicate_clusters.csv byte for byte, the review store and the cube by content.
+# Usage:
+#   python benchmarkOutOfCore.py [base_rows] [workdir]      # default 20,000 reviews in ./ooc_bench
+#
+# The chunked engine reads base_rows / 4 rows per chunk at every size (smaller than any source
+# file at 1x); the in-memory engine only runs up to 10x (about 1.7 GB at 200k reviews).
+
+import filecmp
+import os
+import resource
+import runpy
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarkNearDuplicates import synthetic_reviews
+from cleaningRules import CLUSTERS_FILE, OUTPUT_FILE, SOURCE_FILES
+from reviewCube import CUBE_FILE, DIMENSIONS, load_cube
+from reviewStore import STORE_DIR, read_reviews
+
+SCALES = [1, 10, 100]
+MEMORY_MAX_SCALE = 10
+TRAVELER_TYPES = {
+    "Booking": ["Couple", "Family", "Group", "Solo traveler", None],
+    "Expedia": ["Traveled with partner", "Traveled with family", "Traveled with a group", "Traveled alone", None],
+    "Tripadvisor": ["Couples", "Family", "Friends", "Solo", "Business", None],
+}
+
+
+def synthetic_sources(n, seed=0):
+    """Raw scraper CSV frames per source: about n reviews with near-duplicate copies across
+    platforms, exact re-scrapes within a source, cross-posted exact copies, missing ratings and
+    pre-2014 dates."""
+    rng = np.random.default_rng(seed)
+    df, _ = synthetic_reviews(n, seed=seed)
+    old = rng.random(len(df)) < 0.05
+    df.loc[old, "review_date"] -= pd.DateOffset(years=4)
+    df["name"] = rng.choice(["Ana", "Bo", "Cy", "Di", "Ed", "Fay", "Gus", "Hal"], size=len(df))
+    df["rating"] = rng.integers(1, 11, size=len(df)).astype(str)
+    df.loc[rng.random(len(df)) < 0.01, "rating"] = ""
+
+    # The same review posted on a lower-priority platform too
+    posted = df[(df["source"] == "Booking") & (rng.random(len(df)) < 0.03)].assign(source="Tripadvisor")
+    df = pd.concat([df, posted], ignore_index=True)
+
+    frames = {}
+    for source in SOURCE_FILES:
+        part = df[df["source"] == source]
+        part = pd.concat([part, part.sample(frac=0.02, random_state=seed)]).sample(frac=1, random_state=seed)
+        k = len(part)
+        raw = pd.DataFrame({
+            "review_text": part["text"].to_numpy(),
+            "review_rating": part["rating"].to_numpy(),
+            "traveler_name": part["name"].to_numpy(),
+            "review_date": part["review_date"].dt.strftime("%B %d, %Y").to_numpy(),
+        })
+        raw["traveler_type"] = rng.choice(np.array(TRAVELER_TYPES[source], dtype=object), size=k)
+        if source == "Tripadvisor":
+            raw["review_title"] = "Title"
+            raw["date_visited"] = part["review_date"].dt.strftime("%B %Y").to_numpy()
+            raw["total_rating"] = 4.5
+            raw["total_reviews"] = 2071
+        else:
+            raw["length_of_stay"] = rng.choice([1, 2, 3, 5, 8, 15, np.nan], size=k)
+            raw["total_rating"] = 8.7 if source == "Booking" else 9.0
+            raw["total_reviews"] = "1,234 verified reviews" if source == "Expedia" else "1234 reviews"
+        frames[source] = raw
+    return frames
+
+
+def generate(rows, workdir):
+    for source, raw in synthetic_sources(rows).items():
+        raw.to_csv(os.path.join(workdir, SOURCE_FILES[source]), index=False)
+
+
+def child(engine, rundir, chunk_size):
+    os.chdir(rundir)
+    sys.argv = ["dataCleaner.py", "--engine", engine, "--chunk-size", chunk_size]
+    start = time.perf_counter()
+    with open(os.devnull, "w") as quiet:
+        stdout, sys.stdout = sys.stdout, quiet
+        try:
+            runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataCleaner.py"))
+        except SystemExit:
+            pass
+        finally:
+            sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}")
+
+
+def same_outputs(dir_a, dir_b):
+    for name in [OUTPUT_FILE, CLUSTERS_FILE]:
+        if not filecmp.cmp(os.path.join(dir_a, name), os.path.join(dir_b, name), shallow=False):
+            return f"{name} differs"
+    stores = [read_reviews(os.path.join(d, STORE_DIR)).astype({"traveler_type": str}) for d in (dir_a, dir_b)]
+    stores = [s.sort_values(list(s.columns), ignore_index=True) for s in stores]
+    if not stores[0].equals(stores[1]):
+        return "review store differs"
+    cubes = [load_cube(os.path.join(d, CUBE_FILE)).sort_values(DIMENSIONS, ignore_index=True) for d in (dir_a, dir_b)]
+    if not cubes[0].equals(cubes[1]):
+        return "review cube differs"
+    return "identical"
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--child":
+    child(sys.argv[2], sys.argv[3], sys.argv[4])
+elif __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--compare":
+    print(same_outputs(sys.argv[2], sys.argv[3]))
+elif __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--generate":
+    generate(int(sys.argv[2]), sys.argv[3])
+elif __name__ == "__main__":
+    base = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workdir = os.path.abspath(sys.argv[2] if len(sys.argv) > 2 else "ooc_bench")
+
+    for scale in SCALES:
+        rows = base * scale
+        datadir = os.path.join(workdir, str(rows))
+        os.makedirs(datadir, exist_ok=True)
+        if not os.path.exists(os.path.join(datadir, SOURCE_FILES["Tripadvisor"])):
+            subprocess.run([sys.executable, __file__, "--generate", str(rows), datadir], check=True)
+        size = sum(os.path.getsize(os.path.join(datadir, f)) for f in SOURCE_FILES.values()) / 2**20
+
+        rundirs = {}
+        for engine in ["memory", "chunked"]:
+            if engine == "memory" and scale > MEMORY_MAX_SCALE:
+                continue
+            rundir = rundirs[engine] = os.path.join(datadir, engine)
+            os.makedirs(rundir, exist_ok=True)
+            for name in SOURCE_FILES.values():
+                if not os.path.exists(os.path.join(rundir, name)):
+                    os.symlink(os.path.join(datadir, name), os.path.join(rundir, name))
+            out = subprocess.run([sys.executable, __file__, "--child", engine, rundir, str(base // 4)],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            print(f"rows={rows:9d} ({size:6.0f} MB CSV)  {engine:8s} time={float(out[0]):7.1f}s  "
+                  f"peak RSS={float(out[1]):7.0f} MB")
+        if len(rundirs) == 2:
+            # In a child too: the next size's children would inherit the peak RSS of loading both stores
+            same = subprocess.run([sys.executable, __file__, "--compare", rundirs["memory"], rundirs["chunked"]],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+            print(f"rows={rows:9d}  outputs: {same}")
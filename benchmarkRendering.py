@@ -0,0 +1,81 @@
+# Benchmark: script startup with eager vs deferred imports, and headless figure rendering
+# with one worker vs one per core
+#
+# Startup is the time a fresh interpreter needs for each script's module-level imports, before
+# and after the plotting stack and spaCy were deferred. Rendering draws dataAnalyzer.py's
+# figures from synthetic reviews on the Agg backend.
+# Usage:
+#   python benchmarkRendering.py [rows] [formats...]      # default 500,000 rows, png svg
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import analyzerFigures as figs
+from benchmarkStorage import synthetic_cleaned
+from figureRenderer import FigureSet, default_workers
+from reviewCube import RATING_BIN, STAY_BUCKETS, build_cube, summarize
+from reviewSchema import apply_schema
+from trendStats import trend_bands
+
+PROJECT = ["reviewStore", "figureRenderer"]
+INSIGHTS = ["entityAggregates", "ngramCounter", "sentimentEngine", "topicModel", "translationCache",
+            "translationExecutor"]
+STARTUP = {
+    "dataAnalyzer   eager": ["pandas", "matplotlib.pyplot", "seaborn", "reviewStore"],
+    "dataAnalyzer   lazy": ["pandas", "analyzerFigures", "reviewCube"] + PROJECT,
+    "customerInsights eager": ["pandas", "matplotlib.pyplot", "wordcloud", "seaborn", "spacy"] + INSIGHTS + PROJECT,
+    "customerInsights lazy": ["pandas", "insightsFigures", "nerPipeline"] + INSIGHTS + PROJECT,
+}
+
+
+def startup_seconds(modules, repeat=3):
+    code = "import " + ", ".join(modules)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def analyzer_figures(figures, df):
+    # Same data preparation as dataAnalyzer.py, from a cube of the synthetic reviews
+    cube = build_cube(df)
+    cube = cube[cube["year"] >= 2014]
+    figures.add("reviews_per_source", figs.reviews_per_source, cube.groupby("source")["reviews"].sum())
+    figures.add("rating_distribution", figs.rating_distribution,
+                cube.groupby("rating_bin", as_index=False)["rating_count"].sum(), RATING_BIN)
+    figures.add("rating_by_year", figs.rating_by_year, trend_bands(cube, "year"))
+    figures.add("reviews_by_year", figs.reviews_by_year, cube.groupby("year")["reviews"].sum())
+    figures.add("reviews_by_traveler_type", figs.reviews_by_traveler_type,
+                cube.groupby("traveler_type")["reviews"].sum().sort_values(ascending=False))
+    figures.add("rating_by_traveler_type", figs.rating_by_traveler_type,
+                summarize(cube, ["traveler_type"])["mean"].dropna().sort_values(ascending=False))
+    figures.add("rating_by_length_of_stay", figs.rating_by_length_of_stay,
+                summarize(cube, ["stay_bucket"]).reindex(STAY_BUCKETS).dropna(subset=["mean"]))
+
+
+def child(rows, workers, formats, out):
+    df = apply_schema(synthetic_cleaned(rows))
+    figures = FigureSet(out, formats=formats, workers=workers)
+    analyzer_figures(figures, df)
+    figures.render()
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--child":
+    child(int(sys.argv[2]), int(sys.argv[3]), sys.argv[5:], sys.argv[4])
+elif __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    formats = sys.argv[2:] or ["png", "svg"]
+
+    for name, modules in STARTUP.items():
+        print(f"startup {name:24s} {startup_seconds(modules):5.2f}s")
+
+    # Each render run in a fresh interpreter so neither inherits the other's plotting imports
+    out = tempfile.mkdtemp()
+    for workers in sorted({1, default_workers()}):
+        subprocess.run([sys.executable, __file__, "--child", str(rows), str(workers),
+                        os.path.join(out, f"workers{workers}"), *formats], check=True)
@@ -0,0 +1,39 @@
+# Benchmark: memory and groupby speed of the cleaned table as read from CSV vs in the review schema
+#
+# Usage:
+#   python benchmarkSchema.py [rows]      # default 1,000,000 rows
+
+import io
+import sys
+import time
+
+import pandas as pd
+
+from benchmarkStorage import synthetic_cleaned
+from reviewSchema import apply_schema, validate
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    buffer = io.StringIO()
+    synthetic_cleaned(rows).to_csv(buffer, index=False)
+    buffer.seek(0)
+    legacy = pd.read_csv(buffer, dtype=object)  # the untyped table the stages used to pass around
+    legacy["review_rating"] = pd.to_numeric(legacy["review_rating"])
+    compact = validate(apply_schema(legacy))
+
+    for label, df in [("legacy", legacy), ("schema", compact)]:
+        usage = df.memory_usage(deep=True, index=False) / 2**20
+        by_type = best_of(lambda: df.groupby("traveler_type", observed=True)["review_rating"].mean())
+        by_source = best_of(lambda: df.groupby(["source", "traveler_type"], observed=True)["review_rating"].mean())
+        print(f"{label:7s} rows={len(df):9d}  memory={usage.sum():7.1f} MB (without text {usage.drop('text').sum():6.1f} MB)  "
+              f"groupby(traveler_type)={by_type * 1000:6.1f} ms  groupby(source, traveler_type)={by_source * 1000:6.1f} ms")
@@ -0,0 +1,98 @@
+# Benchmark: reviewSearch queries vs a pandas string scan of text and translations, as reviews accumulate
+#
+# Review words follow a Zipf distribution over a synthetic vocabulary, with planted terms at
+# known rates: a staff name (0.01%), "noise" (1%), "breakfast" (20%) and the phrase
+# "broken elevator" (0.1%). A third of the reviews get a separate translated_text. Each
+# batch is added like one cleaning run, then every query is timed (median of 5 runs).
+# Usage:
+#   python benchmarkSearch.py [max_rows] [workdir]      # default 2,000,000 reviews in ./search_bench
+
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarkStorage import synthetic_cleaned
+from reviewSchema import apply_schema
+from reviewSearch import ReviewSearch
+
+VOCABULARY = 30_000
+PLANTED = {"marisol": 0.0001, "noise": 0.01, "breakfast": 0.2, "broken elevator": 0.001}
+QUERIES = [
+    ("staff name", "marisol", {}),
+    ("noise", "noise", {}),
+    ("breakfast (20% match)", "breakfast", {}),
+    ("noise, Booking 2023+ <=5", "noise", {"sources": ["Booking"], "since": "2023-01-01", "max_rating": 5}),
+    ('"broken elevator" phrase', '"broken elevator"', {"raw": True}),
+]
+
+
+def random_texts(rng, words, n):
+    lengths = rng.integers(20, 80, size=n)
+    tokens = words[(rng.zipf(1.3, size=lengths.sum()) - 1) % len(words)]
+    texts = [" ".join(part) for part in np.split(tokens, np.cumsum(lengths)[:-1])]
+    for term, rate in PLANTED.items():
+        for i in np.flatnonzero(rng.random(n) < rate):
+            texts[i] = f"{texts[i]} {term}"
+    return texts
+
+
+def synthetic_batch(n, seed):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    word_rng = np.random.default_rng(12345)
+    words = np.array(["".join(word_rng.choice(letters, size=k)) for k in word_rng.integers(3, 10, size=VOCABULARY)])
+    df = apply_schema(synthetic_cleaned(n, seed=seed).assign(text=random_texts(rng, words, n)))
+    translated = np.array(random_texts(rng, words, n), dtype=object)
+    translated[rng.random(n) >= 1 / 3] = None
+    df["translated_text"] = translated
+    return df
+
+
+def pandas_scan(texts, translated, term):
+    pattern = rf"\b{term}\b"
+    return int((texts.str.contains(pattern, case=False) | translated.str.contains(pattern, case=False, na=False)).sum())
+
+
+def timed(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), result
+
+
+if __name__ == "__main__":
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    workdir = sys.argv[2] if len(sys.argv) > 2 else "search_bench"
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    path = os.path.join(workdir, "review_search.sqlite")
+    search = ReviewSearch(path)
+
+    batch, rows, seed = max_rows // 8, 0, 0
+    texts, translated = [], []
+    while rows < max_rows:
+        df = synthetic_batch(batch, seed)
+        start = time.perf_counter()
+        search.add(df)
+        added = time.perf_counter() - start
+        texts.append(df["text"].astype(object))
+        translated.append(df["translated_text"])
+        rows, seed = rows + batch, seed + 1
+        if seed not in (1, 2, 4, 8):   # report as the index doubles
+            continue
+
+        print(f"rows={rows:9d}  add batch={batch / added:8.0f} reviews/s  index={os.path.getsize(path) / 2**20:6.0f} MB")
+        for label, query, filters in QUERIES:
+            elapsed, hits = timed(lambda: search.search(query, **filters))
+            elapsed_all, keys = timed(lambda: search.keys(query, **filters), repeat=3)
+            print(f"    {label:26s} top 50={elapsed * 1000:8.1f} ms  all {len(keys):7d} keys={elapsed_all * 1000:8.1f} ms")
+        all_texts, all_translated = pd.concat(texts), pd.concat(translated)
+        elapsed, matched = timed(lambda: pandas_scan(all_texts, all_translated, "noise"), repeat=1)
+        print(f"    {'pandas str.contains noise':26s} {elapsed * 1000:8.1f} ms  ({matched} matches)")
+    search.close()
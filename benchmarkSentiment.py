@@ -0,0 +1,72 @@
+# Benchmark: sentimentEngine.polarity vs TextBlob(x).sentiment.polarity on a fixture corpus
+#
+# The fixture corpus mixes plain sentiment words, intensifier chains, negations, contractions,
+# "!" and emoticons. Reports agreement (max/mean abs diff, share within TOLERANCE) and speed.
+# Usage:
+#   python benchmarkSentiment.py [reviews]      # default 100,000 reviews
+
+import random
+import sys
+import time
+
+import numpy as np
+from textblob import TextBlob
+
+from sentimentEngine import TOLERANCE, polarity
+
+ADJECTIVES = ["good", "great", "bad", "terrible", "clean", "dirty", "friendly", "rude", "nice", "amazing",
+              "awful", "comfortable", "noisy", "quiet", "helpful", "small", "spacious", "perfect", "poor",
+              "excellent", "disappointing", "lovely", "horrible", "cheap", "expensive", "modern", "old"]
+NOUNS = ["room", "staff", "breakfast", "location", "pool", "bed", "view", "service", "bathroom", "wifi",
+         "reception", "hotel", "price", "shower", "restaurant"]
+INTENSIFIERS = ["very", "really", "extremely", "quite", "so", "too", "incredibly", "absolutely", "pretty"]
+NEGATIONS = ["not", "never", "no", "wasn't", "isn't", "didn't", "don't", "not really", "really not"]
+TAILS = ["", "", "", "!", "!!", ".", "...", " :)", " :(", " ;)", " (!)", " :D"]
+FILLERS = ["to be honest", "overall", "I think", "for the price", "during our stay", "in general", "we felt"]
+
+
+def sentence(rng):
+    noun, adj = rng.choice(NOUNS), rng.choice(ADJECTIVES)
+    shape = rng.random()
+    if shape < 0.3:
+        body = f"the {noun} was {adj}"
+    elif shape < 0.5:
+        body = f"the {noun} was {rng.choice(INTENSIFIERS)} {adj}"
+    elif shape < 0.6:
+        body = f"{rng.choice(INTENSIFIERS)} {rng.choice(INTENSIFIERS)} {adj} {noun}"
+    elif shape < 0.8:
+        body = f"the {noun} was {rng.choice(NEGATIONS)} {adj}"
+    elif shape < 0.9:
+        body = f"{rng.choice(FILLERS)}, a {adj} {noun} and a {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    else:
+        body = f"{rng.choice(NEGATIONS)} {rng.choice(INTENSIFIERS)} {adj}"
+    body = body[0].upper() + body[1:]
+    return body + rng.choice(TAILS)
+
+
+def fixture_corpus(n, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(sentence(rng) for _ in range(rng.randint(1, 6))) for _ in range(n)]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    texts = fixture_corpus(n)
+
+    start = time.perf_counter()
+    ours = polarity(texts)
+    t_ours = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = np.array([TextBlob(t).sentiment.polarity for t in texts])
+    t_ref = time.perf_counter() - start
+
+    diff = np.abs(ours - reference)
+    worst = int(diff.argmax())
+    print(f"reviews={n}  textblob={t_ref:.2f}s  engine={t_ours:.2f}s  speedup={t_ref / t_ours:.1f}x  "
+          f"per 100k: {t_ref / n * 1e5:.1f}s -> {t_ours / n * 1e5:.2f}s")
+    print(f"max |diff|={diff.max():.4f}  mean |diff|={diff.mean():.5f}  exact (<1e-9)={np.mean(diff < 1e-9):.2%}  "
+          f"within {TOLERANCE}={np.mean(diff <= TOLERANCE):.2%}")
+    if diff.max() > 1e-9:
+        print(f"worst: {texts[worst]!r}  textblob={reference[worst]:.4f}  engine={ours[worst]:.4f}")
+    assert diff.max() <= TOLERANCE, "engine outside the documented tolerance"
@@ -0,0 +1,138 @@
+# Load test: reviewService.py answering aggregate and listing queries at concurrency 50
+#
+# The service runs in its own process over a synthetic store. Clients on 50 threads keep one
+# connection each and draw from a fixed pool of distinct queries: the first pass misses the
+# result cache, later passes hit it. Appending reviews to the store must change the version
+# and the answers once the service has rechecked it.
+# Usage:
+#   python benchmarkService.py [rows] [workdir]      # default 1,000,000 reviews in ./service_bench
+
+import http.client
+import json
+import os
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarkStorage import synthetic_cleaned
+from reviewSchema import apply_schema
+from reviewService import POLL_SECONDS
+from reviewStore import write_reviews
+
+CONCURRENCY = 50
+QUERIES = 500          # distinct queries in the pool
+WARM_REQUESTS = 10_000
+
+
+def query_pool(n, seed=0):
+    """Distinct dashboard-like query strings: half aggregates, half listings."""
+    rng = random.Random(seed)
+    pool = set()
+    while len(pool) < n:
+        params = []
+        if rng.random() < 0.5:
+            params.append("source=" + ",".join(rng.sample(["Booking", "Expedia", "Tripadvisor"], rng.randint(1, 2))))
+        if rng.random() < 0.7:
+            start = rng.randint(2014, 2024)
+            params.append(f"since={start}-{rng.randint(1, 12):02d}-01&until={rng.randint(start, 2025)}-12-31")
+        if rng.random() < 0.4:
+            params.append("traveler_type=" + rng.choice(["Couple", "Family", "Group", "Solo", "Couple,Family"]))
+        if rng.random() < 0.4:
+            low = rng.randint(1, 8)
+            params.append(f"min_rating={low}&max_rating={rng.randint(low, 10)}")
+        if rng.random() < 0.5:
+            by = rng.choice(["source", "year", "source,year", "traveler_type", "year,month", "stay_bucket,rating_bin"])
+            pool.add("/aggregate?" + "&".join(params + [f"by={by}"]))
+        else:
+            pool.add("/reviews?" + "&".join(params + [f"page={rng.randint(1, 20)}"]))
+    return sorted(pool)
+
+
+def load_test(port, paths, concurrency=CONCURRENCY):
+    """Latencies (seconds) of every request and the wall time, with `concurrency` clients."""
+    todo = queue.SimpleQueue()
+    for path in paths:
+        todo.put(path)
+    latencies, lock = [], threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        mine = []
+        while True:
+            try:
+                path = todo.get_nowait()
+            except queue.Empty:
+                break
+            start = time.perf_counter()
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            assert response.status == 200, (path, response.status)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), time.perf_counter() - start
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path)
+    body = json.loads(conn.getresponse().read())
+    conn.close()
+    return body
+
+
+def report(label, latencies, wall):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{label:28s} requests={len(latencies):6d}  p50={p50:7.2f} ms  p99={p99:7.2f} ms  "
+          f"throughput={len(latencies) / wall:7.0f} req/s")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workdir = sys.argv[2] if len(sys.argv) > 2 else "service_bench"
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    store = os.path.join(workdir, "cleaned_reviews")
+    write_reviews(apply_schema(synthetic_cleaned(rows)), store)
+
+    service = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "reviewService.py"),
+                                "--port", "0", "--store", store], stdout=subprocess.PIPE, text=True)
+    try:
+        started = time.perf_counter()
+        banner = service.stdout.readline()
+        port = int(banner.rsplit(":", 1)[1])
+        print(f"{banner.strip()}  (loaded in {time.perf_counter() - started:.1f}s)")
+
+        pool = query_pool(QUERIES)
+        report("cold (cache misses)", *load_test(port, pool))
+        warm = random.Random(1).choices(pool, k=WARM_REQUESTS)
+        report("warm (cache hits)", *load_test(port, warm))
+        stats = get(port, "/version")
+        print(f"cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+
+        # A cleaner run appends to the store: the version changes and the cache is dropped
+        before = get(port, "/aggregate")["matched"]
+        write_reviews(apply_schema(synthetic_cleaned(rows // 100, seed=1)), store, append=True)
+        time.sleep(POLL_SECONDS + 0.1)
+        after = get(port, "/aggregate")
+        assert after["matched"] == before + rows // 100, (before, after["matched"])
+        print(f"after append: version {stats['version']} -> {after['version']}, {before} -> {after['matched']} reviews")
+        report("cold after reload", *load_test(port, pool))
+    finally:
+        service.terminate()
+        service.wait()
@@ -0,0 +1,85 @@
+# Benchmark: dataAnalyzer load path from cleaned_reviews.csv vs the partitioned Parquet store
+#
+# Each load runs in a fresh interpreter so peak RSS is measured per loader.
+# Usage:
+#   python benchmarkStorage.py [rows] [workdir]      # default 1,000,000 rows in ./storage_bench
+
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from reviewSchema import apply_schema
+from reviewStore import read_reviews, write_reviews
+
+ANALYZER_COLUMNS = ["source", "review_date", "review_rating", "traveler_type", "length_of_stay"]
+SINCE = "2014-01-01"
+
+
+def synthetic_cleaned(n, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array("room staff clean friendly breakfast pool view location bed noisy quiet helpful".split())
+    texts = [" ".join(rng.choice(words, size=k)) for k in rng.integers(20, 120, size=n)]
+    return pd.DataFrame({
+        "text": texts,
+        "review_rating": rng.integers(1, 11, size=n).astype(float),
+        "name": rng.choice(["Ana", "Bo", "Cy", "Di", "Ed"], size=n),
+        "review_date": pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 16 * 365, size=n), unit="D"),
+        "length_of_stay": rng.choice([1.0, 2.0, 3.0, np.nan], size=n),
+        "traveler_type": rng.choice(["Couple", "Family", "Group", "Solo", "Unknown"], size=n),
+        "total_rating": 8.5,
+        "total_reviews": 1234,
+        "source": rng.choice(["Booking", "Expedia", "Tripadvisor"], size=n),
+    })
+
+
+def load_csv(workdir):
+    # The analyzer's original path
+    df = pd.read_csv(os.path.join(workdir, "cleaned_reviews.csv"))
+    df["review_date"] = pd.to_datetime(df["review_date"], errors="coerce")
+    return df[df["review_date"] >= pd.to_datetime(SINCE)]
+
+
+def load_parquet(workdir):
+    return read_reviews(os.path.join(workdir, "cleaned_reviews"), columns=ANALYZER_COLUMNS, since=SINCE)
+
+
+def child(mode, workdir):
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    df = {"csv": load_csv, "parquet": load_parquet}[mode](workdir)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {(peak - baseline) / 1024} {len(df)}")
+
+
+def generate(rows, workdir):
+    df = synthetic_cleaned(rows)
+    df.to_csv(os.path.join(workdir, "cleaned_reviews.csv"), index=False)
+    write_reviews(apply_schema(df), os.path.join(workdir, "cleaned_reviews"))
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--child":
+    child(sys.argv[2], sys.argv[3])
+elif __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "--generate":
+    generate(int(sys.argv[2]), sys.argv[3])
+elif __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workdir = sys.argv[2] if len(sys.argv) > 2 else "storage_bench"
+    os.makedirs(workdir, exist_ok=True)
+
+    # Children inherit the parent's peak RSS, so the parent never holds the data itself
+    subprocess.run([sys.executable, __file__, "--generate", str(rows), workdir], check=True)
+    results = {}
+    for mode in ["csv", "parquet"]:
+        out = subprocess.run([sys.executable, __file__, "--child", mode, workdir],
+                             capture_output=True, text=True, check=True).stdout.split()
+        results[mode] = float(out[0]), float(out[1]), int(out[2])
+        print(f"{mode:8s} rows={results[mode][2]:9d}  load={results[mode][0]:6.2f}s  peak RSS +{results[mode][1]:7.1f} MB")
+    assert results["csv"][2] == results["parquet"][2], "row counts differ"
+    print(f"speedup={results['csv'][0] / results['parquet'][0]:.1f}x  "
+          f"memory={results['csv'][1] / max(results['parquet'][1], 1e-9):.1f}x less")
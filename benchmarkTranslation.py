@@ -0,0 +1,41 @@
+# Benchmark: TranslationExecutor throughput against a stub translator as concurrency rises
+#
+# The stub sleeps latency_s per call plus 2 ms per text, i.e. a backend that translates a whole
+# batch in one request. Batched rows therefore show round trips saved by batching as well as
+# concurrency. google_backend makes one request per text; the "batch=1" rows are the
+# figures that apply to it.
+# Usage:
+#   python benchmarkTranslation.py [texts] [latency_s] [fail_rate]      # default 2000 texts, 0.2s, 0.02
+
+import sys
+
+from fakeTranslator import FakeBackend
+from rateBudget import DomainBudget
+from translationExecutor import TranslationExecutor
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    fail_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+    texts = [f"Reseña número {i}: la habitación estaba limpia y el personal fue muy amable." for i in range(n)]
+
+    # Serial, one text per request: the old progress_apply path
+    backend = FakeBackend(latency=latency, per_item=0.002, fail_rate=fail_rate)
+    serial = TranslationExecutor(backend, name="stub", workers=1, budget=DomainBudget(rate=10**6, per=1.0),
+                                 retries=3, backoff=0.05, max_items=1)
+    serial.run(texts[:max(1, n // 20)])
+    base = serial.report["texts_per_sec"]
+    print(f"serial     batch=1   texts/s={base:8.1f}")
+
+    for max_items in [1, 20]:
+        for workers in [1, 2, 4, 8, 16, 32]:
+            backend = FakeBackend(latency=latency, per_item=0.002, fail_rate=fail_rate)
+            executor = TranslationExecutor(backend, name="stub", workers=workers,
+                                           budget=DomainBudget(rate=10**6, per=1.0), retries=3, backoff=0.05,
+                                           max_items=max_items)
+            translated, failures = executor.run(texts)
+            r = executor.report
+            assert len(translated) + len(failures) == n
+            print(f"workers={workers:3d} batch={max_items:<3d} batches={r['batches']:4d} "
+                  f"texts/s={r['texts_per_sec']:8.1f} ({r['texts_per_sec'] / base:5.1f}x)  retries={r['retries']:3d}  "
+                  f"failed={r['failed']}  elapsed={r['elapsed']:.2f}s")
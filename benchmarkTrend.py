@@ -0,0 +1,50 @@
+# Benchmark: yearly trend bands from sns.lineplot(ci=95) on raw rows vs trendStats on the cube
+#
+# The seaborn path bootstraps every review of every year while drawing; the analytic and
+# bootstrap paths work on the review cube's per-year sums and rating histograms.
+# Usage:
+#   python benchmarkTrend.py [max_rows]      # default 800,000 rows
+
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+
+from benchmarkStorage import synthetic_cleaned
+from reviewCube import build_cube
+from reviewSchema import apply_schema
+from trendStats import trend_bands
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def seaborn_trend(df):
+    plt.figure(figsize=(8, 5))
+    sns.lineplot(x="year", y="review_rating", data=df, errorbar=("ci", 95), marker="o", color="coral")
+    plt.gcf().canvas.draw()
+    plt.close("all")
+
+
+if __name__ == "__main__":
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 800_000
+    rows = max_rows // 16
+    while rows <= max_rows:
+        df = apply_schema(synthetic_cleaned(rows).assign(text="x"))
+        df["year"] = df["review_date"].dt.year
+        cube = build_cube(df)
+
+        t_seaborn, _ = timed(lambda: seaborn_trend(df[["year", "review_rating"]]))
+        t_analytic, analytic = timed(lambda: trend_bands(cube, "year"))
+        t_boot, boot = timed(lambda: trend_bands(cube, "year", method="bootstrap", seed=0))
+        edge = np.abs(np.r_[analytic["ci_low"] - boot["ci_low"], analytic["ci_high"] - boot["ci_high"]]).max()
+        print(f"rows={rows:8d}  seaborn ci=95={t_seaborn:7.2f}s  analytic={t_analytic * 1000:6.1f}ms  "
+              f"bootstrap={t_boot * 1000:6.1f}ms  max |analytic - bootstrap| band edge={edge:.4f}")
+        rows *= 4
@@ -4,14 +4,17 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
 import random
-import pandas as pd
 import os
 import shutil
+import sys
 import ctypes
 
+from reviewCapture import capture_reviews, enable_network_capture
+from reviewSink import ReviewSink
+from reviewExtractor import SPECS, extract_cards, extract_header, extract_page, fetch_new_cards, save_snapshot
+from scrapeWaits import LEDGER, Politeness, cards_signature, wait_for_cards_change, wait_for_dom_settle, wait_for_network_idle
+
 # Prevent Windows from sleeping
 ES_CONTINUOUS = 0x80000000
 ES_SYSTEM_REQUIRED = 0x00000001
@@ -24,22 +27,41 @@ options = Options()
 # options.add_argument("--headless")
 
 # Use a fresh user profile folder
-profile_path = "/tmp/selenium_profile"
+profile_path = os.environ.get("SELENIUM_PROFILE", "/tmp/selenium_profile")
 if os.path.exists(profile_path):
     shutil.rmtree(profile_path)
 options.add_argument(f"--user-data-dir={profile_path}")
 
+# Set to a folder to keep each page_source for offline re-parsing / benchmarking
+SNAPSHOT_DIR = None
+
+# Pull only new review cards from the modal instead of the whole page_source each page
+CONTAINER_MODE = True
+
+# Politeness jitter between actions (seconds); readiness is handled by event-driven waits
+POLITENESS = Politeness(0.5, 1.5, budget=None)
+CARD_SELECTOR = SPECS["booking"]["card"]
+
+# Read reviews from the JSON payloads the page loads, falling back to HTML when none are found
+CAPTURE_MODE = False
+RECORD_DIR = None  # Set to a folder to record captured payloads for offline replay
+if CAPTURE_MODE:
+    enable_network_capture(options)
+
 driver = uc.Chrome(service=Service(), options=options)
 
-url = "https://www.booking.com/hotel/us/new-york-32-east-32nd-street.html?aid=356980&label=gog235jc-1DCA0o7AFCHG5ldy15b3JrLTMyLWVhc3QtMzJuZC1zdHJlZXRIM1gDaI4CiAEBmAExuAEXyAEM2AED6AEB-AECiAIBqAIDuALl8ZHCBsACAdICJDlkNjgwNmQwLTYxOWItNDkwNS04OWNkLWQ0NmQ3ZDZiN2UxZtgCBOACAQ&sid=cdbbcb537506c49c4f17396bffb3731a#tab-main"
-driver.get(url)
+url = sys.argv[1] if len(sys.argv) > 1 else "https://www.booking.com/hotel/us/new-york-32-east-32nd-street.html?aid=356980&label=gog235jc-1DCA0o7AFCHG5ldy15b3JrLTMyLWVhc3QtMzJuZC1zdHJlZXRIM1gDaI4CiAEBmAExuAEXyAEM2AED6AEB-AECiAIBqAIDuALl8ZHCBsACAdICJDlkNjgwNmQwLTYxOWItNDkwNS04OWNkLWQ0NmQ3ZDZiN2UxZtgCBOACAQ&sid=cdbbcb537506c49c4f17396bffb3731a#tab-main"
+output_file = sys.argv[2] if len(sys.argv) > 2 else "booking_reviews_Boulan.csv"
+POLITENESS.request()
+with LEDGER.track("page"):
+    driver.get(url)
 wait = WebDriverWait(driver, 15)
 
 # --- Human-like scrolling on page ---
 def human_scroll(driver, times=3):
     for _ in range(times):
         driver.execute_script(f"window.scrollBy(0, {random.randint(200, 400)});")
-        time.sleep(random.uniform(1.5, 3))
+        POLITENESS.pause()
 
 human_scroll(driver, times=5)
 
@@ -49,15 +71,16 @@ try:
         EC.element_to_be_clickable((By.ID, "reviews-tab-trigger"))
     )
     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", review_tab)
-    time.sleep(1)
+    POLITENESS.pause()
+    POLITENESS.request()
     review_tab.click()
-    time.sleep(2)
+    wait_for_network_idle(driver)
     driver.execute_script("window.scrollBy(0, 500);")
     print("Clicked Guest Reviews tab")
 except Exception as e:
     print(f"Failed to click read reviews button: {e}")
     driver.quit()
-    exit()
+    exit(1)
 
 # --- Wait for review modal and scrollable container ---
 try:
@@ -70,90 +93,62 @@ try:
     )
     for _ in range(10):
         driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-        time.sleep(random.uniform(1.5, 2.5))
+        wait_for_dom_settle(driver)
     print("Review modal loaded")
 except Exception as e:
     print(f"Review modal did not load: {e}")
     driver.quit()
-    exit()
+    exit(1)
 
-review_list = []
+# Rows are appended to the sink as each page finishes; hotel totals go in its metadata record
+sink = ReviewSink(os.path.splitext(output_file)[0] + ".arrows", "booking")
 current_page = 1
 max_pages = 60  # Safety limit to avoid infinite loop
 
+# --- Header fields never change, so read them once ---
+html = driver.page_source
+with LEDGER.track("parsing"):
+    header = extract_header(html, "booking")
+total_rating = header["total_rating"]
+total_reviews = header["total_reviews"]
+sink.set_metadata(total_rating=total_rating, total_reviews=total_reviews)
+seen_cards = set()
+
 # --- Click "More reviews" until none left ---
 while current_page < max_pages:
-    # --- Parse HTML ---
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-
-    # --- Extract total rating and review count ---
-    try:
-        total_rating_elem = soup.select_one("div.f63b14ab7a.dff2e52086")
-        total_rating = total_rating_elem.text.strip() if total_rating_elem else None
-
-        total_reviews_elem = soup.select_one("div.fff1944c52.fb14de7f14.eaa8455879")
-        total_reviews = total_reviews_elem.text.strip() if total_reviews_elem else None
-    except:
-        total_rating = None
-        total_reviews = None
-
-    # --- Extract reviews ---
-    reviews = soup.select("div[data-testid='review-card']")
-
-    for review in reviews:
-        try:
-            positive = review.select_one('div[data-testid="review-positive-text"]').get_text(separator=" ", strip=True)
-        except:
-            positive = ""
-        try:
-            negative = review.select_one('div[data-testid="review-negative-text"]').get_text(separator=" ", strip=True)
-        except:
-            negative = ""
-
-        # Combine both with a separator, or just a space
-        review_text = (positive + " " + negative).strip()
-        try:
-            rating_raw = review.select_one("div.f63b14ab7a.dff2e52086").text.strip()
-            rating = float(rating_raw.split('/')[0])
-        except:
-            rating = None
-        try:
-            name = review.select_one("div.b08850ce41.f546354b44").text.strip()
-        except:
-            name = None
-        try:
-            date_elem = review.select_one("span[data-testid='review-date']")
-            raw_date = date_elem.text.strip()
-            review_date = raw_date.replace("Reviewed:", "").strip()
-        except Exception:
-            review_date = None
-        try:
-            stay_elem = review.select_one("span[data-testid='review-num-nights']")
-            stay_text = stay_elem.text.strip()
-            import re
-            match = re.search(r"(\d+)\s+nights?", stay_text)
-            length_of_stay = int(match.group(1)) if match else None
-        except Exception:
-            length_of_stay = None
-        try:
-            traveler_type_elem = review.select_one("span[data-testid='review-traveler-type']")
-            traveler_type = traveler_type_elem.text.strip() if traveler_type_elem else None
-        except Exception:
-            traveler_type = None
-
-        review_list.append({
-            'review_text': review_text,
-            'review_rating': rating,
-            'traveler_name': name,
-            'review_date': review_date,
-            'length_of_stay': length_of_stay,
-            'traveler_type': traveler_type
-        })
+    reviews = []
+    if CAPTURE_MODE:
+        with LEDGER.track("parsing"):
+            reviews = capture_reviews(driver, "booking", RECORD_DIR)
+    if reviews:
+        pass  # Captured from the JSON payloads
+    elif CONTAINER_MODE:
+        # --- Parse only cards not seen on earlier pages ---
+        with LEDGER.track("page"):
+            new_cards = fetch_new_cards(driver, scroll_container, "booking", seen_cards)
+        if SNAPSHOT_DIR:
+            with LEDGER.track("io"):
+                save_snapshot("\n".join(new_cards), SNAPSHOT_DIR, "booking", current_page)
+        with LEDGER.track("parsing"):
+            reviews = extract_cards(new_cards, "booking")
+    else:
+        # --- Parse HTML ---
+        with LEDGER.track("page"):
+            html = driver.page_source
+        if SNAPSHOT_DIR:
+            with LEDGER.track("io"):
+                save_snapshot(html, SNAPSHOT_DIR, "booking", current_page)
+
+        # --- Extract total rating, review count and reviews ---
+        with LEDGER.track("parsing"):
+            _, reviews = extract_page(html, "booking")
+    with LEDGER.track("io"):
+        sink.write_page(reviews)
 
     try:
         # Scroll the modal to bottom
         driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-        time.sleep(random.uniform(2, 3))
+        POLITENESS.pause()
 
         # Try to click "More reviews" inside the modal
         next_page_number = str(current_page + 1)
@@ -161,21 +156,25 @@ while current_page < max_pages:
         EC.element_to_be_clickable((By.XPATH, f"//button[normalize-space()='{next_page_number}']"))
         )
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-        time.sleep(random.uniform(1, 2))
+        POLITENESS.pause()
+        before = cards_signature(driver, CARD_SELECTOR)
+        POLITENESS.request()
         next_button.click()
-        time.sleep(random.uniform(3, 5))
+        # Wait for the next page's cards to replace the current ones
+        wait_for_cards_change(driver, CARD_SELECTOR, before)
+        wait_for_dom_settle(driver)
         current_page += 1
     except:
         print(f"No page {current_page + 1} found. Finished scraping.")
         break
 
 # --- Save to CSV ---
-df = pd.DataFrame(review_list)
-df['total_rating'] = total_rating
-df['total_reviews'] = total_reviews
-df.to_csv("booking_reviews_Boulan.csv", index=False)
+sink.close()
+with LEDGER.track("io"):
+    sink.export_csv(output_file)
 
-print(f"Scraped {len(review_list)} reviews, total rating: {total_rating}, total reviews: {total_reviews}")
+print(f"Scraped {sink.rows} reviews, total rating: {total_rating}, total reviews: {total_reviews}")
+LEDGER.report()
 
 driver.quit()
 
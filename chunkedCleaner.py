@@ -0,0 +1,361 @@
+# Out-of-core engine for dataCleaner.py (--engine chunked): the same rules, dedup order and
+# near-duplicate resolution as the in-memory path, with memory bounded by the chunk size
+# instead of the number of reviews.
+#
+# Pass 1 streams each source CSV in priority order; incremental runs first drop the rows the
+# DedupIndex knows. The exact-duplicate keys seen so far (per source and across sources) live
+# in a scratch SQLite file. Surviving rows are spilled to Parquet, numbered in the combined
+# order, and each chunk's LSH bucket keys to a sorted run. Earlier reviews sharing a bucket
+# with a new row are then spilled after the new rows, as in the in-memory engine.
+# Pass 2 groups the runs by key range into candidate pairs, checks their containment in
+# batches and resolves the clusters. Pass 3 streams the spill, drops the cluster losers and
+# appends each chunk to the CSV, the review store, the cube and the search index.
+#
+# Scope: the cleaning stage only. dataAnalyzer.py reads just the aggregate cube this engine
+# writes. The analysis stage, customerInsights.py, is not out-of-core: it loads every review
+# it analyses from the store into memory.
+#
+# Peak RSS with 1,000-row chunks is 289, 333 and 353 MB at 4k, 40k and 400k reviews. Pass 2
+# groups at most RANGE_BYTES of bucket records at once; below that size (4k to 40k reviews)
+# its peak still grows with the runs. The search index is opened with a small page cache.
+# Usage:
+#   python dataCleaner.py --engine chunked [--incremental | --rebuild] [--chunk-size N]
+
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from cleaningRules import (CLUSTERS_FILE, INDEX_FILE, OUTPUT_FILE, SOURCE_FILES, SOURCE_LABELS, SOURCE_PRIORITY,
+                           exact_keys, finish_reviews, next_cluster, prepare_source, read_source)
+from dateNormalizer import DATE_FORMATS, SAMPLE_SIZE, date_sample, infer_format
+from dedupIndex import DedupIndex, review_keys
+from nearDuplicates import (BANDS, THRESHOLD, band_key, bucket_ids, bucket_links, close_in_time, cluster_ids,
+                            long_enough, lsh_buckets, minhash_signatures, near_match, preference, resolve_clusters)
+from reviewCube import CUBE_FILE, build_cube, load_cube, merge_cubes, save_cube
+from reviewSearch import SEARCH_FILE, ReviewSearch
+from reviewStore import write_reviews
+
+CHUNK_ROWS = 100_000     # raw rows read per chunk
+PAIR_BATCH = 5_000       # candidate pairs checked per containment batch
+AUDIT_BATCH = 50_000     # near-duplicate audit rows written at once
+AUDIT_COLUMNS = ["source", "name", "review_date", "review_rating", "text"]
+COMBINED = len(SOURCE_FILES)   # key scope of the cross-source dedup (per-source scopes are 0..2)
+RANGE_BYTES = 16 * 2**20       # LSH bucket records grouped at once
+BUCKET = np.dtype([("key", "<u8"), ("band", "<i8"), ("row", "<i8"), ("day", "<i8")])
+SEARCH_CACHE_MB = 16     # appends only: reviewSearch's query-sized page cache would grow with the index
+
+
+class SeenKeys:
+    """Dedup keys accepted so far in this run, one scratch SQLite table per scope."""
+
+    def __init__(self, path, scopes):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TEMP TABLE batch (pos INTEGER, key INTEGER);
+        """)
+        for scope in range(scopes):
+            self.conn.execute(f"CREATE TABLE seen_{scope} (key INTEGER PRIMARY KEY)")
+
+    def first_seen(self, scope, keys):
+        """Mask of the keys not seen before in this scope (earlier chunks or earlier in keys)."""
+        keys = np.asarray(keys, dtype=np.int64)
+        fresh = ~pd.Series(keys).duplicated().to_numpy()
+        # Sorted by key, so the lookups and inserts walk the index in order
+        positions = np.flatnonzero(fresh)
+        positions = positions[np.argsort(keys[positions], kind="stable")]
+        with self.conn:
+            self.conn.execute("DELETE FROM batch")
+            self.conn.executemany("INSERT INTO batch VALUES (?, ?)",
+                                  zip(positions.tolist(), keys[positions].tolist()))
+            old = [pos for (pos,) in self.conn.execute(f"SELECT b.pos FROM batch b JOIN seen_{scope} s USING (key)")]
+            self.conn.execute(f"INSERT OR IGNORE INTO seen_{scope} SELECT key FROM batch")
+        fresh[old] = False
+        return fresh
+
+    def keys(self, scope, batch=100_000):
+        cursor = self.conn.execute(f"SELECT key FROM seen_{scope}")
+        while rows := cursor.fetchmany(batch):
+            yield [key for (key,) in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def write_buckets(signatures, rows, days, path):
+    """LSH bucket records (key, band, row, day) of one chunk's rows, sorted by key, for bucket_pairs()."""
+    records = np.empty(len(rows) * BANDS, dtype=BUCKET)
+    for band in range(BANDS):
+        part = records[band * len(rows):(band + 1) * len(rows)]
+        part["key"], part["band"], part["row"], part["day"] = band_key(signatures, band), band, rows, days
+    np.save(path, records[np.argsort(records["key"], kind="stable")])
+
+
+def bucket_pairs(paths):
+    """Candidate pairs as row codes (head << 32 | row), close in time, over every chunk's buckets.
+
+    Buckets yield their pairs as in nearDuplicates._candidate_pairs (bucket_links). The key space is split into ranges of about RANGE_BYTES of records, and each
+    range is gathered from all chunks' sorted runs and grouped on its own.
+    """
+    if not paths:
+        return np.empty(0, dtype=np.int64)
+    total = sum(np.load(path, mmap_mode="r").nbytes for path in paths)
+    ranges = max(1, -(-total // RANGE_BYTES))
+    edges = [np.uint64(i * (2**64 // ranges)) for i in range(ranges)] + [None]
+    codes = [np.empty(0, dtype=np.int64)]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        parts = []
+        for path in paths:
+            run = np.load(path, mmap_mode="r")
+            start = np.searchsorted(run["key"], lo)
+            stop = len(run) if hi is None else np.searchsorted(run["key"], hi)
+            parts.append(np.array(run[start:stop]))
+            del run
+        records = np.concatenate(parts)
+        records = records[np.lexsort((records["row"], records["key"], records["band"]))]
+        first = np.ones(len(records), dtype=bool)
+        first[1:] = (records["band"][1:] != records["band"][:-1]) | (records["key"][1:] != records["key"][:-1])
+        head, linked = bucket_links(first)
+        days = records["day"].view("datetime64[ns]")
+        close = close_in_time(days[head], days[linked])
+        codes.append(np.unique((records["row"][head[close]] << 32) | records["row"][linked[close]]))
+    return np.unique(np.concatenate(codes))
+
+
+def source_date_format(source, path, chunk_size):
+    """The format parse_review_dates would infer from the whole column (first SAMPLE_SIZE distinct values)."""
+    if DATE_FORMATS.get(source):
+        return DATE_FORMATS[source]
+    sample = pd.Series(dtype=object)
+    for raw in read_source(path, usecols=lambda col: col.strip().lower() == "review_date", chunksize=chunk_size):
+        sample = pd.concat([sample, date_sample(raw.iloc[:, 0])]).drop_duplicates()
+        if len(sample) >= SAMPLE_SIZE:
+            break
+    return infer_format(sample)
+
+
+def run_buckets(paths):
+    """Bucket ids (nearDuplicates.bucket_ids) of every sorted run, one array per run."""
+    for path in paths:
+        run = np.load(path, mmap_mode="r")
+        yield bucket_ids(run["key"], run["band"])
+
+
+def spill_rows(df, row, workdir, spills, buckets):
+    """Spill df as rows row.. of the combined order, and its LSH buckets to a sorted run."""
+    df.index = pd.RangeIndex(row, row + len(df))
+    eligible = df[long_enough(df["text"])]
+    if len(eligible):
+        days = eligible["review_date"].to_numpy("datetime64[ns]").view(np.int64)
+        buckets.append(os.path.join(workdir, f"buckets-{len(buckets):05d}.npy"))
+        write_buckets(minhash_signatures(eligible["text"]), eligible.index.to_numpy(), days, buckets[-1])
+    spill = os.path.join(workdir, f"rows-{len(spills):05d}.parquet")
+    df.to_parquet(spill, index=False)
+    spills.append((spill, row, row + len(df)))
+    return row + len(df)
+
+
+def combined_columns():
+    """Columns of the concatenated sources, in pd.concat order."""
+    columns = []
+    for source, path in SOURCE_FILES.items():
+        empty = prepare_source(read_source(path, nrows=0), source, infer_dates=False)
+        columns += [col for col in empty.columns if col not in columns]
+    return columns
+
+
+def spilled_parts(spills, rows, columns):
+    """Spilled rows by combined row number (sorted, unique), one frame per spill file, indexed by row."""
+    for path, start, stop in spills:
+        lo, hi = np.searchsorted(rows, [start, stop])
+        if hi > lo:
+            part = pq.read_table(path, columns=columns).take(rows[lo:hi] - start).to_pandas()
+            part.index = rows[lo:hi]
+            yield part
+
+
+def read_rows(spills, rows, columns):
+    return pd.concat(spilled_parts(spills, rows, columns)) if len(rows) else pd.DataFrame(columns=columns)
+
+
+class CsvBlocks:
+    """Appends frames to a CSV exactly as one DataFrame.to_csv call over their concatenation would.
+
+    to_csv formats 100,000 cells' worth of rows at a time, and a datetime column is written
+    without the time of day when no date in that block has one; frames are therefore buffered
+    and written in the same row blocks.
+    """
+
+    def __init__(self, path, append=False):
+        self.path, self.append = path, append
+        self.header = not (append and os.path.exists(path))
+        self.pending = []
+
+    def write(self, df, final=False):
+        block = 100_000 // len(df.columns) or 1
+        # Empty frames are left out of the concatenation, which would otherwise loosen the dtypes
+        self.pending = [part for part in self.pending + [df] if len(part)] or [df]
+        rows = sum(len(part) for part in self.pending)
+        if rows < block and not final:
+            return
+        frame = pd.concat(self.pending) if len(self.pending) > 1 else self.pending[0]
+        cut = rows if final else rows // block * block
+        if cut or self.header:
+            frame.iloc[:cut].to_csv(self.path, mode="a" if self.append else "w", header=self.header,
+                                    index=False, chunksize=block)
+            self.append, self.header = True, False
+        self.pending = [frame.iloc[cut:]]
+
+    def close(self, columns):
+        self.write(pd.DataFrame(columns=columns), final=True)
+
+
+def clean_chunked(incremental=False, rebuild=False, chunk_size=CHUNK_ROWS):
+    tracked = incremental or rebuild
+    if rebuild:
+        DedupIndex.remove(INDEX_FILE)
+        if os.path.exists(OUTPUT_FILE):
+            os.remove(OUTPUT_FILE)
+    index = DedupIndex(INDEX_FILE) if tracked else None
+    # Like the store, the search index only keeps earlier runs' reviews in incremental mode
+    if not incremental:
+        ReviewSearch.remove(SEARCH_FILE)
+    search = ReviewSearch(SEARCH_FILE, cache_mb=SEARCH_CACHE_MB)
+    workdir = tempfile.mkdtemp(prefix="cleaner_spill_", dir=".")
+    seen = SeenKeys(os.path.join(workdir, "seen.sqlite"), COMBINED + 1)
+    try:
+        # --- Pass 1: per-source rules and exact dedup, spill, near-duplicate candidates ---
+        columns = combined_columns()
+        spills, buckets, row = [], [], 0
+        skipped = already = other_source = 0
+        for scope, (source, path) in enumerate(SOURCE_FILES.items()):
+            fmt = source_date_format(source, path, chunk_size)
+            removed = 0
+            for raw in read_source(path, chunksize=chunk_size):
+                df = prepare_source(raw, source, fmt, infer_dates=False)
+                keys = exact_keys(df)
+                if tracked:
+                    # Rows an earlier run processed go before any other step
+                    winners = pd.Series(index.winners(review_keys(df)), index=df.index)
+                    known = winners.notna().to_numpy() | np.array(index.seen(source, keys), dtype=bool)
+                    skipped += int(known.sum())
+                    already += int(winners.notna().sum())
+                    other_source += int((winners.notna() & (winners != source)).sum())
+                    df, keys = df[~known], keys[~known]
+                exact = seen.first_seen(scope, keys)
+                removed += int((~exact).sum())
+                df = df[exact].dropna(subset=["review_rating"])
+                df = df[seen.first_seen(COMBINED, review_keys(df))].reindex(columns=columns)
+                if not df.empty:
+                    row = spill_rows(df.assign(_already=False), row, workdir, spills, buckets)
+            print(f"Duplicates removed in {SOURCE_LABELS[source]}: {removed}")
+        if tracked:
+            print(f"Processed in earlier runs: {skipped} rows "
+                  f"({already} already accepted, {other_source} of them won by another source)")
+        new_spills = len(spills)
+
+        if tracked and len(buckets):
+            # Earlier reviews sharing an LSH bucket with a new row, after the new rows (they win their clusters)
+            old = index.candidates(run_buckets(buckets))
+            old = old.assign(source_rank=old["source"].map(SOURCE_PRIORITY))
+            old = old.sort_values("source_rank", ascending=False, kind="stable")
+            old = old.reindex(columns=columns).assign(_already=True)
+            for lo in range(0, len(old), chunk_size):
+                row = spill_rows(old.iloc[lo:lo + chunk_size].copy(), row, workdir, spills, buckets)
+            del old
+
+        # --- Pass 2: containment of the candidate pairs, clusters and winners ---
+        codes = bucket_pairs(buckets)
+        a, b = codes >> 32, codes & 0xFFFFFFFF
+        match = np.zeros(len(codes), dtype=bool)
+        for lo in range(0, len(codes), PAIR_BATCH):
+            pa, pb = a[lo:lo + PAIR_BATCH], b[lo:lo + PAIR_BATCH]
+            docs = np.unique(np.concatenate([pa, pb]))
+            texts = read_rows(spills, docs, ["text"])["text"].reset_index(drop=True)
+            match[lo:lo + len(pa)] = near_match(texts, np.searchsorted(docs, pa), np.searchsorted(docs, pb), THRESHOLD)
+        a, b = a[match], b[match]
+        nodes = np.unique(np.concatenate([a, b]))
+
+        # Only what the clusters and resolve_clusters need is gathered for the matched rows
+        info = [part.assign(length=part.pop("text").str.len())
+                for part in spilled_parts(spills, nodes, ["source", "_already", "text"])]
+        members = pd.concat(info) if info else pd.DataFrame(columns=["source", "_already", "length"])
+        priority = members["source"].map(SOURCE_PRIORITY) + 10 * members["_already"]
+        grouped, ids = cluster_ids(len(nodes), np.searchsorted(nodes, a), np.searchsorted(nodes, b),
+                                   preference(priority, members["length"]))
+        rows = nodes[grouped]
+        clusters = pd.Series(ids, index=rows, dtype="int64")
+        keep = resolve_clusters(clusters, priority[grouped], members["length"][grouped])
+        losers = rows[~keep]
+        del info, members, priority
+
+        # Audit rows in the in-memory engine's order (cluster, kept row first, combined order)
+        # Incremental runs append theirs, numbered after the earlier runs' clusters
+        order = np.lexsort((rows, ~keep, ids))
+        first = next_cluster(CLUSTERS_FILE) if incremental else 0
+        audit_csv = CsvBlocks(CLUSTERS_FILE, append=first > 0)
+        for lo in range(0, len(order), AUDIT_BATCH):
+            batch = order[lo:lo + AUDIT_BATCH]
+            audit = read_rows(spills, np.sort(rows[batch]), AUDIT_COLUMNS).loc[rows[batch]]
+            audit.insert(0, "cluster", ids[batch] + first)
+            audit["kept"] = keep[batch]
+            audit_csv.write(audit)
+        audit_csv.close(["cluster"] + AUDIT_COLUMNS + ["kept"])
+        print(f"Near-duplicate clusters: {ids.max() + 1 if len(ids) else 0} "
+              f"({len(losers)} rows removed, see {CLUSTERS_FILE})")
+
+        # --- Pass 3: drop cluster losers, finish each chunk and append it to every output ---
+        output_csv = CsvBlocks(OUTPUT_FILE, append=tracked)
+        cube, total, shape_columns, missing = None, 0, None, None
+        for i, (path, start, stop) in enumerate(spills[:new_spills] or [(None, 0, 0)]):
+            if path is None:
+                df = pd.DataFrame(columns=columns + ["_already"])
+            else:
+                df = pd.read_parquet(path)
+                df.index = pd.RangeIndex(start, stop)
+                df = df[~np.isin(df.index, losers)]
+            if tracked and len(df):
+                # Uncommitted until every output is written
+                index.add(review_keys(df), df["source"].tolist())
+                searchable = df[long_enough(df["text"])]
+                index.add_reviews(searchable, lsh_buckets(searchable["text"]))
+            df = finish_reviews(df.drop(columns=["_already"]))
+
+            output_csv.write(df)
+            write_reviews(df, append=incremental or i > 0)
+            cube = build_cube(df) if cube is None else merge_cubes(cube, build_cube(df))
+            search.add(df)
+
+            total += len(df)
+            shape_columns = df.columns.tolist()
+            missing = df.isna().sum() if missing is None else missing + df.isna().sum()
+
+        if incremental and os.path.exists(CUBE_FILE):
+            cube = merge_cubes(load_cube(), cube)
+        output_csv.close(shape_columns)
+        save_cube(cube)
+        # The new rows' additions to the persistent index are committed once every output is written
+        if tracked:
+            for scope, source in enumerate(SOURCE_FILES):
+                for keys in seen.keys(scope):
+                    index.add_seen(source, keys)
+            index.commit()
+    finally:
+        seen.close()
+        search.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+        if index is not None:
+            index.close()
+
+    # --- Summary ---
+    print("\nCleaning complete.")
+    print(f"{'Appended' if incremental else 'Final cleaned'} review count (2014+): {total}")
+    print("\nDataset shape:", (total, len(shape_columns)))
+    print("Columns:", shape_columns)
+    print("\nMissing values per column:\n", missing)
@@ -0,0 +1,120 @@
+# Per-source and final cleaning rules shared by dataCleaner.py's in-memory engine and the
+# out-of-core engine in chunkedCleaner.py, so both apply exactly the same transformations.
+
+import os
+
+import pandas as pd
+
+from dateNormalizer import DATE_FORMATS, parse_review_dates
+from reviewSchema import apply_schema, validate
+
+OUTPUT_FILE = "cleaned_reviews.csv"
+INDEX_FILE = "cleaned_reviews.index.sqlite"
+CLUSTERS_FILE = "near_duplicate_clusters.csv"
+
+# Input files in source-priority order (Booking > Expedia > TripAdvisor)
+SOURCE_FILES = {
+    "Booking": "booking_reviews_Boulan.csv",
+    "Expedia": "expedia_reviews_Boulan.csv",
+    "Tripadvisor": "tripadvisor_reviews_Boulan.csv",
+}
+SOURCE_PRIORITY = {"Booking": 3, "Expedia": 2, "Tripadvisor": 1}
+SOURCE_LABELS = {"Booking": "Booking", "Expedia": "Expedia", "Tripadvisor": "TripAdvisor"}
+
+EXACT_KEY = ["text", "review_date", "review_rating"]   # duplicates within one source
+COMBINED_KEY = ["text", "name", "review_date"]         # duplicates across sources
+MIN_DATE = pd.Timestamp("2014-01-01")
+
+
+def exact_keys(df):
+    """64-bit hash of the within-source dedup key, as signed ints for SQLite."""
+    return pd.util.hash_pandas_object(df[EXACT_KEY], index=False).to_numpy().view("int64")
+
+
+def next_cluster(path=CLUSTERS_FILE):
+    """First cluster number after those in an existing audit file; incremental runs append after it."""
+    if not os.path.exists(path):
+        return 0
+    clusters = pd.read_csv(path, usecols=["cluster"])["cluster"]
+    return int(clusters.max()) + 1 if len(clusters) else 0
+
+
+def read_source(path, **kwargs):
+    """Raw scraper CSV; every column is read as text so chunked and whole-file reads agree."""
+    return pd.read_csv(path, dtype=str, **kwargs)
+
+
+# Function to extract keyword
+def simplify_traveler_type(text):
+    if pd.isna(text):
+        return None
+    text = text.lower()
+    if "partner" in text:
+        return "Couple"
+    elif "family" in text:
+        return "Family"
+    elif "group" in text:
+        return "Group"
+    else:
+        return "Solo"
+
+
+def prepare_source(df, source, date_format=None, infer_dates=True):
+    """Standardize one source's raw rows (any slice of its CSV).
+
+    date_format overrides DATE_FORMATS; with infer_dates=False a missing format is not
+    inferred from df, so every chunk of a source can be parsed with the whole file's format.
+    """
+    df = df.copy()
+    # --- Standardize column names ---
+    df.columns = df.columns.str.strip().str.lower()
+    # --- Add source column ---
+    df["source"] = source
+
+    # Format total reviews field
+    if source == "Booking":
+        df['total_reviews'] = df['total_reviews'].str.replace(' reviews', '').astype(int)
+    elif source == "Expedia":
+        df['total_reviews'] = (df['total_reviews'].str.replace(',', '')
+                               .str.replace(' verified reviews', '').astype(int))
+        # Strip text for traveler_type for Expedia
+        df['traveler_type'] = df['traveler_type'].apply(simplify_traveler_type)
+
+    # --- Rename for consistency ---
+    df.rename(columns={"traveler_name": "name", "review_text": "text"}, inplace=True)
+
+    # --- Robust date parsing (vectorized per source, dateutil only for stragglers) ---
+    fmt = date_format or DATE_FORMATS.get(source)
+    df["review_date"] = parse_review_dates(df["review_date"], fmt, infer=infer_dates)
+
+    # --- Convert numeric fields ---
+    df["review_rating"] = pd.to_numeric(df["review_rating"], errors="coerce").astype("float64")
+    df["length_of_stay"] = pd.to_numeric(df.get("length_of_stay"), errors="coerce")
+
+    # --- Clean text ---
+    df["text"] = df["text"].astype(str).str.strip()
+    return df
+
+
+def finish_reviews(df):
+    """Date filter, traveler_type labels, fills and schema for deduplicated rows (any subset)."""
+    # --- Filter reviews: 2014 onward ---
+    df = df[df["review_date"] >= MIN_DATE].copy()
+
+    # --- Normalize traveler_type labels ---
+    df["traveler_type"] = df["traveler_type"].replace({
+        "Solo traveler": "Solo",
+        "Couples": "Couple"
+    })
+
+    # Fill empty values for Traveler Type
+    df.fillna({'traveler_type': 'Unknown'}, inplace=True)
+
+    # Fill empty values for Lenght of Stay
+    df.fillna({'length_of_stay': 0}, inplace=True)
+
+    # Drop review_title and date_visited columns
+    df.drop(columns=["review_title", "date_visited"], inplace=True)
+
+    # --- Compact dtypes (reviewSchema.py), checked before anything is written ---
+    return validate(apply_schema(df))
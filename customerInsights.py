@@ -1,37 +1,61 @@
 # Customer Experience Insights
 
-import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-from textblob import TextBlob
-import seaborn as sns
-from deep_translator import GoogleTranslator
-from tqdm import tqdm
-import spacy
+import argparse
+import os
 from collections import Counter
-from collections import defaultdict
 
+import pandas as pd
 
-# Load the cleaned data
-df = pd.read_csv("cleaned_reviews.csv")
+import insightsFigures as figs
+from entityAggregates import aggregate_entities, save_aggregates, summarize
+from figureRenderer import FigureSet, add_render_arguments
+from nerPipeline import extract_entities, load_ner
+from ngramCounter import NgramCounter
+from reviewCube import CUBE_FILE, set_sentiment
+from reviewSearch import ReviewSearch
+from reviewStore import read_reviews
+from sentimentEngine import polarity
+from topicModel import TopicModel, print_history
+from translationCache import TranslationCache, print_stats, translate_texts
+from translationExecutor import TranslationExecutor, google_backend
+
+ap = argparse.ArgumentParser()
+add_render_arguments(ap)
+ap.add_argument("--search", action="append", metavar="QUERY",
+                help="Print the reviews matching QUERY (full-text, BM25-ranked) with their sentiment; repeatable")
+args = ap.parse_args()
+
+# Figures are shown one by one, or with --render DIR written to files by parallel workers;
+# matplotlib, seaborn, wordcloud and spaCy are only imported once they are needed
+figures = FigureSet.from_args(args)
+
+# Load the cleaned data (the columns this stage uses); every review is held in memory, this
+# stage has no out-of-core mode like dataCleaner.py --engine chunked
+# (name is part of the dedup key that links reviews to the search index)
+df = read_reviews(columns=["source", "review_date", "review_rating", "traveler_type", "length_of_stay", "name", "text"])
 
 # Drop missing or non-string entries in review text
 df = df[df['text'].notna() & df['text'].apply(lambda x: isinstance(x, str))]
 
-# Translate reviews if not already in English
-def translate_to_english(text):
-    try:
-        if pd.notnull(text) and len(text.strip()) > 5:
-            return GoogleTranslator(source='auto', target='en').translate(text)
-    except:
-        return text  # fallback if translation fails
-
-# Only translate if 'translated_text' column doesn't already exist
+# Translate reviews if not already in English (English skips the backend, translations are
+# cached in translations.sqlite across runs and hotels, misses are sent concurrently, one
+# request per text)
 if 'translated_text' not in df.columns:
-    tqdm.pandas()
-    df['translated_text'] = df['text'].progress_apply(translate_to_english)
+    cache = TranslationCache()
+    executor = TranslationExecutor(google_backend(), name="google", workers=8, max_items=1)
+    translations, stats, failures = translate_texts(df['text'], executor, cache)
+    df['translated_text'] = translations
+    cache.close()
+    print_stats(stats)
+    if failures:
+        pd.DataFrame(failures).to_csv("translation_failures.csv", index=False)
+        print(f"{len(failures)} translations failed, see translation_failures.csv (kept untranslated)")
+
+# Make the translations searchable in review_search.sqlite (reviewSearch.py); reviews the
+# cleaner has not indexed yet are added first
+search = ReviewSearch()
+search.add(df)
+print(f"Search index: {search.set_translations(df)} translations updated, {len(search)} reviews indexed")
 
 # Optional: Save progress with translations
 df.to_csv("translated_reviews.csv", index=False)
@@ -39,59 +63,66 @@ df.to_csv("translated_reviews.csv", index=False)
 # Drop null values 
 valid_texts = df['translated_text'].dropna().astype(str)
 
-# Sentiment Analysis using TextBlob
-df['sentiment'] = valid_texts.apply(lambda x: TextBlob(x).sentiment.polarity)
+# Sentiment Analysis: TextBlob's lexicon polarity, scored for the whole corpus at once
+df['sentiment'] = pd.Series(polarity(valid_texts), index=valid_texts.index)
+# Sentiment measures of the review cube (read by dataAnalyzer.py and the Power BI export)
+if os.path.exists(CUBE_FILE):
+    set_sentiment(df)
 df['sentiment_category'] = pd.cut(df['sentiment'], bins=[-1, -0.1, 0.1, 1], labels=['Negative', 'Neutral', 'Positive'])
-plt.figure(figsize=(6, 4))
-sns.countplot(data=df, x='sentiment_category', palette='coolwarm')
-plt.title("Sentiment Distribution")
-plt.tight_layout()
-plt.show()
+figures.add("sentiment_distribution", figs.sentiment_distribution, df['sentiment_category'].value_counts(sort=False))
 
-# Keep only negative reviews
-negative_reviews = df[df['sentiment'] < 0.1]
-negative_texts = negative_reviews['translated_text'].dropna().astype(str)
+# Drill-down: the reviews matching each --search query, best match first
+for query in args.search or []:
+    subset = search.slice(df, query)
+    print(f"\nSearch {query!r}: {len(subset)} reviews, average sentiment {subset['sentiment'].mean():.3f}")
+    print(subset[["source", "review_date", "review_rating", "sentiment", "translated_text"]].head(10).to_string())
+search.close()
+
+# Keep only negative reviews (their texts, not a copy of the frame)
+negative_texts = df.loc[df['sentiment'] < 0.1, 'translated_text'].dropna().astype(str)
 
 # Filter out missing traveler types and sentiments
-filtered_df = df[df['traveler_type'].notna() & df['sentiment'].notna()]
+filtered = df.loc[df['traveler_type'].notna() & df['sentiment'].notna(), ['traveler_type', 'sentiment']]
 
 # Sentiment by Traveler Type
-avg_sentiment = filtered_df.groupby('traveler_type')['sentiment'].mean().reset_index()
+avg_sentiment = filtered.groupby('traveler_type')['sentiment'].mean().reset_index()
 
-plt.figure(figsize=(8, 5))
-sns.barplot(data=avg_sentiment.sort_values(by="sentiment", ascending=False), x='traveler_type', y='sentiment', palette='coolwarm')
-plt.title("Average Sentiment by Traveler Type")
-plt.ylabel("Average Sentiment")
-plt.xlabel("Traveler Type")
-plt.tight_layout()
-plt.show()
+figures.add("sentiment_by_traveler_type", figs.sentiment_by_traveler_type,
+            avg_sentiment.sort_values(by="sentiment", ascending=False))
 
 # Frequent Bigrams or Trigrams
-# Using already cleaned/translations: valid_texts
-bigram_vectorizer = CountVectorizer(ngram_range=(2, 3), stop_words='english', max_features=20)
-X2 = bigram_vectorizer.fit_transform(valid_texts)
-bigram_freq = pd.DataFrame({
-    "bigram": bigram_vectorizer.get_feature_names_out(),
-    "count": X2.toarray().sum(axis=0)
-})
-
-plt.figure(figsize=(10, 6))
-sns.barplot(data=bigram_freq.sort_values(by="count", ascending=False), x="count", y="bigram", palette="magma")
-plt.title("Top 20 Most Frequent Phrases in Reviews")
-plt.tight_layout()
-plt.show()
+# Using already cleaned/translations: valid_texts, counted in chunks per source, traveler type
+# and sentiment bucket without building the full document-term matrix
+phrase_groups = df.loc[valid_texts.index, ["source", "traveler_type", "sentiment_category"]]
+phrases = NgramCounter(ngram_range=(2, 3), stop_words='english', by=phrase_groups.columns).fit(valid_texts, phrase_groups)
+bigram_freq = phrases.top(20).rename(columns={"ngram": "bigram"})
+phrases.top(10, by=["sentiment_category"]).to_csv("top_phrases_by_sentiment.csv", index=False)
+phrases.top(10, by=["source", "traveler_type"]).to_csv("top_phrases_by_source_traveler.csv", index=False)
+
+figures.add("top_phrases", figs.top_phrases, bigram_freq)
+
+# Topic Modeling: online LDA saved in topic_model.joblib; only reviews the model has not seen
+# are trained on (chunked partial_fit over all cores), every review gets its dominant topic
+topic_model = TopicModel.load_or_new()
+print_history(topic_model.update(topic_model.unseen(valid_texts)))
+topic_model.save()
+topic, topic_weight = topic_model.assign(valid_texts)
+df['topic'] = pd.Series(topic, index=valid_texts.index)
+df['topic_weight'] = pd.Series(topic_weight, index=valid_texts.index)
+print(topic_model.top_words().to_string(index=False))
+pd.DataFrame(topic_model.history).to_csv("topic_model_history.csv", index=False)
 
 # Named Entity Recognition with spaCy
-# Load English model
-nlp = spacy.load("en_core_web_sm")
+# Load English model (NER component only)
+nlp = load_ner()
 
-# Apply only to valid (translated) texts
-texts_sample = valid_texts[:1200]  # limit to 1000 for speed
+# One nlp.pipe pass over all valid (translated) texts; entities are cached in ner_cache/ by text hash
+entities, ner_stats = extract_entities(valid_texts, nlp)
+entities = pd.Series(entities, index=valid_texts.index)
+print(f"NER: {ner_stats['parsed']} texts parsed, {ner_stats['cached']} from cache in {ner_stats['seconds']:.1f}s")
 
 # Extract entities
-all_entities = []
-for doc in nlp.pipe(texts_sample, disable=["parser", "tagger"]):
-    all_entities.extend([(ent.text, ent.label_) for ent in doc.ents])
+all_entities = [ent for ents in entities for ent in ents]
 
 # Count and sort entities
 entity_df = pd.DataFrame(all_entities, columns=["Entity", "Label"])
@@ -105,60 +136,26 @@ for ent, label in all_entities:
     entities_by_type[label].append(ent)
 
 # Sentiment by Entity
-# Optional: filter reviews with text only
-valid_df = df[df['translated_text'].notna() & df['translated_text'].apply(lambda x: isinstance(x, str))]
-
-# Initialize storage
-entity_sentiments = defaultdict(list)
-
-# Loop through reviews and extract entities with sentiment
-for text in valid_df['translated_text']:
-    doc = nlp(text)
-    polarity = TextBlob(text).sentiment.polarity
-    for ent in doc.ents:
-        if ent.label_ in {"ORG", "PERSON"}:
-            key = (ent.text.lower(), ent.label_)
-            entity_sentiments[key].append(polarity)
-
-# Build sentiment DataFrame
-avg_entity_sentiment = pd.DataFrame([
-    {
-        "entity": ent_text,
-        "label": label,
-        "avg_sentiment": sum(pols)/len(pols),
-        "count": len(pols)
-    }
-    for (ent_text, label), pols in entity_sentiments.items()
-    if len(pols) >= 2
-])
+# Running count / sum / sum of squares per (entity, label, source, month), built in chunks,
+# merged and saved to entity_aggregates.parquet; averages and 95% CIs come from the aggregates
+reviews = df.loc[entities.index, ['sentiment', 'source', 'review_date']]
+entity_aggregates = aggregate_entities(entities, reviews['sentiment'], reviews['source'], reviews['review_date'])
+save_aggregates(entity_aggregates)
+
+# Build sentiment DataFrame (ORG and PERSON entities mentioned at least twice)
+avg_entity_sentiment = summarize(entity_aggregates, by=["entity", "label"], min_count=2)
 
 # Top 10 entities with lowest sentiment
 top_negative = avg_entity_sentiment.sort_values(by="avg_sentiment").head(10)
-plt.figure(figsize=(10, 6))
-sns.barplot(data=top_negative, x="avg_sentiment", y="entity", hue="label", dodge=False, palette="coolwarm")
-plt.title("Lowest Average Sentiment (ORG & PERSON)")
-plt.xlabel("Average Sentiment")
-plt.ylabel("Entity")
-plt.tight_layout()
-plt.show()
+figures.add("lowest_entity_sentiment", figs.entity_sentiment, top_negative, "Lowest Average Sentiment (ORG & PERSON)", "coolwarm")
 
 # Top 10 entities with highest sentiment
 top_positive = avg_entity_sentiment.sort_values(by="avg_sentiment", ascending=False).head(10)
-plt.figure(figsize=(10, 6))
-sns.barplot(data=top_positive, x="avg_sentiment", y="entity", hue="label", dodge=False, palette="crest")
-plt.title("Highest Average Sentiment (ORG & PERSON)")
-plt.xlabel("Average Sentiment")
-plt.ylabel("Entity")
-plt.tight_layout()
-plt.show()
+figures.add("highest_entity_sentiment", figs.entity_sentiment, top_positive, "Highest Average Sentiment (ORG & PERSON)", "crest")
 
 # Generate Word Cloud
 ## text_combined = " ".join(df['translated_text'].dropna().astype(str))
-text_combined = " ".join(negative_reviews['translated_text'].dropna().astype(str))
-wordcloud = WordCloud(width=1000, height=500, background_color='white').generate(text_combined)
-plt.figure(figsize=(12, 6))
-plt.imshow(wordcloud, interpolation='bilinear')
-plt.axis('off')
-plt.title("Most Common Words in Reviews")
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+text_combined = " ".join(negative_texts)
+figures.add("word_cloud", figs.word_cloud, text_combined)
+
+figures.render()
@@ -1,89 +1,56 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load cleaned review data
-df = pd.read_csv("cleaned_reviews.csv")
-
-# Convert review_date to datetime, coerce errors to NaT
-df['review_date'] = pd.to_datetime(df['review_date'], errors='coerce')
-
-# Keep only reviews from 2014 or later
-df = df[df['review_date'] >= pd.to_datetime('2014-01-01')]
+import argparse
+
+import analyzerFigures as figs
+from figureRenderer import FigureSet, add_render_arguments
+from reviewCube import RATING_BIN, STAY_BUCKETS, load_cube, summarize
+from trendStats import N_BOOT, trend_bands
+
+ap = argparse.ArgumentParser()
+add_render_arguments(ap)
+ap.add_argument("--trend-ci", choices=["analytic", "bootstrap"], default="analytic",
+                help="Yearly trend band: closed-form t interval, or a seeded bootstrap over rating histograms")
+ap.add_argument("--bootstrap-samples", type=int, default=N_BOOT)
+ap.add_argument("--seed", type=int, default=0)
+args = ap.parse_args()
+
+# Figures are shown one by one, or with --render DIR written to files by parallel workers
+figures = FigureSet.from_args(args)
+
+# Load the review cube kept up to date by dataCleaner.py (review count and rating count / sum /
+# sum of squares per source, year, month, traveler type, stay bucket and rating bin); its size
+# does not grow with the number of reviews, so every number below is a roll-up of it
+cube = load_cube()
+cube = cube[cube["year"] >= 2014]
 
 # Number of reviews per source
-plt.figure(figsize=(6, 4))
-sns.countplot(data=df, x="source", palette="Set2")
-plt.title("Number of Reviews per Source")
-plt.ylabel("Count")
-plt.tight_layout()
-plt.show()
+figures.add("reviews_per_source", figs.reviews_per_source, cube.groupby("source")["reviews"].sum())
 
 # Distribution of review ratings
-plt.figure(figsize=(8, 5))
-sns.histplot(df["review_rating"].dropna(), bins=20, kde=True, color="skyblue")
-plt.title("Distribution of Review Ratings")
-plt.xlabel("Rating")
-plt.ylabel("Frequency")
-plt.tight_layout()
-plt.show()
+rating_histogram = cube.groupby("rating_bin", as_index=False)["rating_count"].sum()
+figures.add("rating_distribution", figs.rating_distribution, rating_histogram, RATING_BIN)
 
-# Average rating per year
-df['year'] = df['review_date'].dt.year
-avg_rating_yearly = df.groupby('year')['review_rating'].mean()
+# Average rating per year, with its 95% confidence band precomputed from the cube
+avg_rating_yearly = trend_bands(cube, "year", method=args.trend_ci, n_boot=args.bootstrap_samples, seed=args.seed)
 
-plt.figure(figsize=(8, 5))
-sns.lineplot(x='year', y='review_rating', data=df, ci=95, marker='o', color='coral')
-plt.title("Average Rating by Year with Trend Line")
-plt.ylabel("Average Rating")
-plt.xlabel("Year")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
+figures.add("rating_by_year", figs.rating_by_year, avg_rating_yearly)
 
 # Number of reviews per year
-review_counts_yearly = df.groupby('year')['review_rating'].count()
+review_counts_yearly = cube.groupby("year")["reviews"].sum()
 
-plt.figure(figsize=(8, 4))
-review_counts_yearly.plot(kind='bar', color='teal')
-plt.title("Number of Reviews by Year")
-plt.ylabel("Review Count")
-plt.xlabel("Year")
-plt.tight_layout()
-plt.show()
-# Reset index to make review_date a column again
-df.reset_index(inplace=True)
+figures.add("reviews_by_year", figs.reviews_by_year, review_counts_yearly)
 
 # Reviews by Traveler Type
-plt.figure(figsize=(8, 4))
-sns.countplot(data=df, x='traveler_type', palette='pastel', order=df['traveler_type'].value_counts().index)
-plt.title("Number of Reviews by Traveler Type")
-plt.ylabel("Count")
-plt.xlabel("Traveler Type")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
+figures.add("reviews_by_traveler_type", figs.reviews_by_traveler_type,
+            cube.groupby("traveler_type")["reviews"].sum().sort_values(ascending=False))
 
 # Average rating per traveler type (excluding missing traveler_type)
-df_filtered = df[df['traveler_type'].notna()]
-avg_rating_traveler = df_filtered.groupby('traveler_type')['review_rating'].mean().sort_values(ascending=False)
+avg_rating_traveler = summarize(cube, ["traveler_type"])["mean"].dropna().sort_values(ascending=False)
 
 # Plot average rating per traveler type
-plt.figure(figsize=(8, 5))
-sns.barplot(x=avg_rating_traveler.index, y=avg_rating_traveler.values, palette="viridis")
-plt.title("Average Review Rating by Traveler Type")
-plt.xlabel("Traveler Type")
-plt.ylabel("Average Rating")
-plt.ylim(0, 10)  # assuming ratings are out of 10
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
+figures.add("rating_by_traveler_type", figs.rating_by_traveler_type, avg_rating_traveler)
 
 # Avg Rating by Length of Stay
-plt.figure(figsize=(8, 5))
-sns.boxplot(data=df[df['length_of_stay'].notna()], x='length_of_stay', y='review_rating', palette='Blues')
-plt.title("Review Rating by Length of Stay")
-plt.xlabel("Length of Stay (days)")
-plt.ylabel("Rating")
-plt.tight_layout()
-plt.show()
+avg_rating_stay = summarize(cube, ["stay_bucket"]).reindex(STAY_BUCKETS).dropna(subset=["mean"])
+figures.add("rating_by_length_of_stay", figs.rating_by_length_of_stay, avg_rating_stay)
+
+figures.render()
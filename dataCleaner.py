@@ -1,67 +1,64 @@
-import pandas as pd
-from dateutil import parser
-
-# Function to extract keyword
-def simplify_traveler_type(text):
-    if pd.isna(text):
-        return None
-    text = text.lower()
-    if "partner" in text:
-        return "Couple"
-    elif "family" in text:
-        return "Family"
-    elif "group" in text:
-        return "Group"
-    else:
-        return "Solo"
-
-# --- Load CSV files ---
-df_booking = pd.read_csv("booking_reviews_Boulan.csv")
-df_expedia = pd.read_csv("expedia_reviews_Boulan.csv")
-df_tripadvisor = pd.read_csv("tripadvisor_reviews_Boulan.csv")
-
-# --- Standardize column names ---
-for df in [df_booking, df_expedia, df_tripadvisor]:
-    df.columns = df.columns.str.strip().str.lower()
-
-# --- Add source column ---
-df_booking["source"] = "Booking"
-df_expedia["source"] = "Expedia"
-df_tripadvisor["source"] = "Tripadvisor"
+import argparse
+import os
+import sys
 
-# Format total reviews field
-for df in [df_booking]:
-    df['total_reviews'] = df['total_reviews'].str.replace(' reviews', '').astype(int)
-
-for df in [df_expedia]:
-    df['total_reviews'] = df['total_reviews'].str.replace(',', '').str.replace(' verified reviews', '').astype(int)
-
-# Strip text for traveler_type for Expedia
-for df in [df_expedia]:
-    df['traveler_type'] = df['traveler_type'].apply(simplify_traveler_type)
-
-# --- Rename for consistency ---
-for df in [df_booking, df_expedia, df_tripadvisor]:
-    df.rename(columns={"traveler_name": "name", "review_text": "text"}, inplace=True)
-
-# --- Robust date parsing ---
-for df in [df_booking, df_expedia, df_tripadvisor]:
-    df["review_date"] = df["review_date"].apply(lambda x: parser.parse(x) if pd.notna(x) else pd.NaT)
-    df["review_date"] = pd.to_datetime(df["review_date"], errors="coerce")
-
-# --- Convert numeric fields ---
-for df in [df_booking, df_expedia, df_tripadvisor]:
-    df["review_rating"] = pd.to_numeric(df["review_rating"], errors="coerce")
-    df["length_of_stay"] = pd.to_numeric(df.get("length_of_stay"), errors="coerce")
+import numpy as np
+import pandas as pd
 
-# --- Clean text ---
-for df in [df_booking, df_expedia, df_tripadvisor]:
-    df["text"] = df["text"].astype(str).str.strip()
+from cleaningRules import (CLUSTERS_FILE, COMBINED_KEY, EXACT_KEY, INDEX_FILE, OUTPUT_FILE, SOURCE_FILES,
+                           SOURCE_PRIORITY, exact_keys, finish_reviews, next_cluster, prepare_source, read_source)
+from chunkedCleaner import CHUNK_ROWS, clean_chunked
+from dedupIndex import DedupIndex, review_keys
+from nearDuplicates import find_near_duplicates, long_enough, lsh_buckets, resolve_clusters
+from reviewCube import build_cube, save_cube, update_cube
+from reviewSearch import SEARCH_FILE, ReviewSearch
+from reviewStore import write_reviews
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--incremental", action="store_true",
+                help="Append only reviews whose dedup key is not in the persistent index")
+ap.add_argument("--rebuild", action="store_true",
+                help="Drop the index and output, then rebuild both from the current CSVs")
+ap.add_argument("--engine", choices=["memory", "chunked"], default="memory",
+                help="chunked: stream the CSVs in bounded memory with on-disk dedup state (same output)")
+ap.add_argument("--chunk-size", type=int, default=CHUNK_ROWS, help="Rows per chunk for --engine chunked")
+args = ap.parse_args()
+
+if args.engine == "chunked":
+    clean_chunked(incremental=args.incremental, rebuild=args.rebuild, chunk_size=args.chunk_size)
+    sys.exit()
+
+tracked = args.incremental or args.rebuild
+if args.rebuild:
+    DedupIndex.remove(INDEX_FILE)
+    if os.path.exists(OUTPUT_FILE):
+        os.remove(OUTPUT_FILE)
+index = DedupIndex(INDEX_FILE) if tracked else None
+
+# --- Load CSV files and apply the per-source rules (cleaningRules.py) ---
+sources = {source: prepare_source(read_source(path), source) for source, path in SOURCE_FILES.items()}
+
+# --- Incremental mode: drop the rows earlier runs processed before any other step ---
+# A row is known when its exact-duplicate key was seen in its source, or its dedup key was
+# accepted from any source; every later step then only handles the new rows
+if tracked:
+    new_exact, skipped, already, other_source = {}, 0, 0, 0
+    for source, df in sources.items():
+        exact = exact_keys(df)
+        winners = pd.Series(index.winners(review_keys(df)), index=df.index)
+        known = winners.notna().to_numpy() | np.array(index.seen(source, exact), dtype=bool)
+        skipped += int(known.sum())
+        already += int(winners.notna().sum())
+        other_source += int((winners.notna() & (winners != source)).sum())
+        sources[source], new_exact[source] = df[~known], np.unique(exact[~known])
+    print(f"Processed in earlier runs: {skipped} rows "
+          f"({already} already accepted, {other_source} of them won by another source)")
+df_booking, df_expedia, df_tripadvisor = sources.values()
 
 # --- Drop exact duplicates within each source ---
 def deduplicate(df, label):
     before = len(df)
-    df.drop_duplicates(subset=["text", "review_date", "review_rating"], inplace=True)
+    df.drop_duplicates(subset=EXACT_KEY, inplace=True)
     removed = before - len(df)
     print(f"Duplicates removed in {label}: {removed}")
     return df
@@ -79,38 +76,82 @@ df_all = pd.concat([df_booking, df_expedia, df_tripadvisor], ignore_index=True)
 
 # --- Final deduplication: prioritize Booking > Expedia > TripAdvisor ---
 combined_before = len(df_all)
-source_priority = {"booking": 3, "expedia": 2, "tripadvisor": 1}
-df_all["source_rank"] = df_all["source"].map(source_priority)
-df_all = df_all.sort_values(by="source_rank", ascending=False)
-df_all.drop_duplicates(subset=["text", "name", "review_date"], inplace=True)
+df_all["source_rank"] = df_all["source"].map(SOURCE_PRIORITY)
+df_all = df_all.sort_values(by="source_rank", ascending=False, kind="stable")
+df_all.drop_duplicates(subset=COMBINED_KEY, inplace=True)
 combined_dupes_removed = combined_before - len(df_all)
-df_all.drop(columns=["source_rank"], inplace=True)
-
-# --- Filter reviews: 2014 onward ---
-df_all = df_all[df_all["review_date"] >= pd.to_datetime("2014-01-01")]
-
-# --- Normalize traveler_type labels ---
-df_all["traveler_type"] = df_all["traveler_type"].replace({
-    "Solo traveler": "Solo",
-    "Couples": "Couple"
-})
 
-# Fill empty values for Traveler Type
-df_all.fillna({'traveler_type': 'Unknown'}, inplace=True)
-
-# Fill empty values for Lenght of Stay
-df_all.fillna({'length_of_stay': '0'}, inplace=True)
-
-# Drop review_title and date_visited columns
-df_all.drop(columns=["review_title", "date_visited"], inplace=True)
-
-
-# --- Save to CSV ---
-df_all.to_csv("cleaned_reviews.csv", index=False)
+# --- Near-duplicate clusters across platforms (spacing, truncation, name formatting) ---
+# Incremental runs add the earlier reviews sharing an LSH bucket with a new row, after the new rows.
+# Rows already in the append-only output win their cluster, then source priority, then the longer text
+near = df_all[["source", "name", "review_date", "review_rating", "text", "source_rank"]]
+earlier = np.zeros(len(near), dtype=bool)
+if tracked:
+    eligible = long_enough(df_all["text"])
+    buckets = lsh_buckets(df_all.loc[eligible, "text"])
+    old = index.candidates([buckets])
+    old["source_rank"] = old["source"].map(SOURCE_PRIORITY)
+    old = old.sort_values("source_rank", ascending=False, kind="stable")
+    near = pd.concat([near, old[near.columns]], ignore_index=True)
+    earlier = np.append(earlier, np.ones(len(old), dtype=bool))
+priority, length = near["source_rank"] + 10 * earlier, near["text"].str.len()
+clusters = find_near_duplicates(near, priority=priority, tiebreak=length)
+keep = resolve_clusters(clusters, priority, length)
+# Incremental runs append their clusters to the audit file, numbered after the earlier runs' clusters
+first = next_cluster(CLUSTERS_FILE) if args.incremental else 0
+audit = near.loc[clusters >= 0, ["source", "name", "review_date", "review_rating", "text"]]
+audit.insert(0, "cluster", clusters[clusters >= 0] + first)
+audit["kept"] = keep[clusters.to_numpy() >= 0]
+audit = audit.sort_values(["cluster", "kept"], ascending=[True, False], kind="stable")
+audit.to_csv(CLUSTERS_FILE, mode="a" if first else "w", header=not first, index=False)
+keep = keep[:len(df_all)]
+near_dupes_removed = int((~keep).sum())
+print(f"Near-duplicate clusters: {int(clusters.max()) + 1 if (clusters >= 0).any() else 0} "
+      f"({near_dupes_removed} rows removed, see {CLUSTERS_FILE})")
+
+if tracked:
+    # Keys, fields and buckets of every new row that survived the final dedup, committed after the output is written
+    accepted = df_all[keep]
+    new_keys, new_sources = review_keys(accepted), accepted["source"].tolist()
+    searchable = df_all[eligible & keep]
+    searchable_buckets = buckets[keep[eligible]]
+df_all = df_all[keep]
+
+df_all = df_all.drop(columns=["source_rank"])
+
+# --- 2014 onward, traveler_type labels, fills and schema (cleaningRules.py) ---
+df_all = finish_reviews(df_all)
+
+
+# --- Save to CSV, the partitioned Parquet store and the aggregate cube (reviewCube.py) ---
+if tracked:
+    df_all.to_csv(OUTPUT_FILE, mode="a", header=not os.path.exists(OUTPUT_FILE), index=False)
+    write_reviews(df_all, append=args.incremental)
+    if args.incremental:
+        update_cube(df_all)
+    else:
+        save_cube(build_cube(df_all))
+    index.add(new_keys, new_sources)
+    for source, keys in new_exact.items():
+        index.add_seen(source, keys)
+    index.add_reviews(searchable, searchable_buckets)
+    index.commit()
+    index.close()
+else:
+    df_all.to_csv(OUTPUT_FILE, index=False)
+    write_reviews(df_all)
+    save_cube(build_cube(df_all))
+
+# --- Full-text search index (reviewSearch.py): this run's reviews, on top of earlier ones when incremental ---
+if not args.incremental:
+    ReviewSearch.remove(SEARCH_FILE)
+search = ReviewSearch(SEARCH_FILE)
+search.add(df_all)
+search.close()
 
 # --- Summary ---
 print("\nCleaning complete.")
-print(f"Final cleaned review count (2014+): {len(df_all)}")
+print(f"{'Appended' if args.incremental else 'Final cleaned'} review count (2014+): {len(df_all)}")
 print("\nDataset shape:", df_all.shape)
 print("Columns:", df_all.columns.tolist())
 print("\nMissing values per column:\n", df_all.isna().sum())
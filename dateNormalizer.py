@@ -0,0 +1,83 @@
+# Vectorized review date parsing: one pd.to_datetime call per source with an inferred or
+# configured format; only the strings that fail fall back to dateutil (cached per unique string).
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from dateutil import parser
+
+# Per-source format overrides; None means infer from the data
+DATE_FORMATS = {
+    "Booking": None,
+    "Expedia": None,
+    "Tripadvisor": None,
+}
+
+# Candidates tried in order; month-first before day-first to match dateutil's default
+CANDIDATE_FORMATS = [
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %Y",
+    "%b %Y",
+]
+
+SAMPLE_SIZE = 500
+
+
+def infer_format(values, candidates=CANDIDATE_FORMATS):
+    """Pick the candidate format that parses the largest share of a sample of unique values."""
+    sample = pd.Series(values.dropna().unique()[:SAMPLE_SIZE], dtype=object)
+    if sample.empty:
+        return None
+    best, best_hits = None, 0
+    for fmt in candidates:
+        hits = pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum()
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
+
+
+@lru_cache(maxsize=None)
+def _dateutil_parse(text):
+    try:
+        return pd.Timestamp(parser.parse(text))
+    except (ValueError, OverflowError):
+        return pd.NaT
+
+
+def date_sample(values):
+    """The distinct stripped, non-missing strings parse_review_dates would infer a format from."""
+    return pd.Series(values.dropna().astype(str).str.strip().unique(), dtype=object)
+
+
+def parse_review_dates(values, fmt=None, infer=True):
+    """Parse a column of date strings to datetime64, inferring the format when fmt is None.
+
+    Review dates repeat heavily, so each distinct string is parsed once and mapped back.
+    With infer=False a missing fmt sends every value to the dateutil fallback (used when the
+    format was already inferred from the whole column and parsing happens in chunks).
+    """
+    codes, uniques = pd.factorize(values.astype(object).where(values.isna(), values.astype(str).str.strip()))
+    uniques = pd.Series(uniques, dtype=object)
+    if fmt is None and infer:
+        fmt = infer_format(uniques)
+    if fmt is None:
+        parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+    else:
+        parsed = pd.to_datetime(uniques, format=fmt, errors="coerce")
+
+    failed = parsed.isna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(uniques[failed].map(_dateutil_parse), errors="coerce")
+
+    # Missing values have code -1, which picks the trailing NaT
+    lookup = np.append(pd.to_datetime(parsed, errors="coerce").to_numpy("datetime64[ns]"), np.datetime64("NaT", "ns"))
+    result = lookup[codes]
+    return pd.Series(result, index=values.index, name=values.name)
@@ -0,0 +1,113 @@
+# Persistent index of what earlier dataCleaner.py runs processed, so an incremental run can
+# drop those rows right after reading them:
+#   accepted  dedup key (text, name, review_date) of every accepted row, with the source that won it
+#   seen      per source, the exact-duplicate key of every row any run processed
+#   reviews   fields and LSH buckets of the accepted rows long enough for near-duplicate detection,
+#   buckets   so new rows are only compared with the earlier reviews they can match
+# A run's additions become visible together, at commit(), once its outputs are written.
+
+import os
+import sqlite3
+
+import pandas as pd
+
+KEY_COLUMNS = ["text", "name", "review_date"]
+SCHEMA_VERSION = 2   # 1: accepted keys only
+
+
+def review_keys(df):
+    """64-bit hash of the dedup key columns, as signed ints so SQLite can store them."""
+    return pd.util.hash_pandas_object(df[KEY_COLUMNS], index=False).to_numpy().view("int64")
+
+
+class DedupIndex:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS accepted (key INTEGER PRIMARY KEY, source TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS seen (source TEXT NOT NULL, key INTEGER NOT NULL,
+                                             PRIMARY KEY (source, key)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS reviews (id INTEGER PRIMARY KEY, key INTEGER NOT NULL UNIQUE, name TEXT,
+                                                review_date TEXT, review_rating REAL, text TEXT);
+            CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, key INTEGER NOT NULL,
+                                                PRIMARY KEY (bucket, key)) WITHOUT ROWID;
+        """)
+        if version < SCHEMA_VERSION and len(self):
+            self.conn.close()
+            raise ValueError(f"{path} has no near-duplicate state; recreate it with dataCleaner.py --rebuild")
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM accepted").fetchone()[0]
+
+    def winners(self, keys):
+        """Source recorded for each accepted key (None if not accepted)."""
+        keys = [int(k) for k in keys]
+        found = {}
+        for i in range(0, len(keys), 900):
+            chunk = keys[i:i + 900]
+            query = f"SELECT key, source FROM accepted WHERE key IN ({','.join('?' * len(chunk))})"
+            found.update(self.conn.execute(query, chunk))
+        return [found.get(k) for k in keys]
+
+    def contains(self, keys):
+        """Boolean mask: which keys are already accepted."""
+        return [winner is not None for winner in self.winners(keys)]
+
+    def seen(self, source, keys):
+        """Boolean mask: which exact-duplicate keys of source an earlier run processed."""
+        keys = [int(k) for k in keys]
+        found = set()
+        for i in range(0, len(keys), 900):
+            chunk = keys[i:i + 900]
+            query = f"SELECT key FROM seen WHERE source = ? AND key IN ({','.join('?' * len(chunk))})"
+            found.update(key for (key,) in self.conn.execute(query, [source] + chunk))
+        return [k in found for k in keys]
+
+    def candidates(self, buckets):
+        """Accepted reviews sharing an LSH bucket with the ids in buckets (a list of arrays), oldest first."""
+        self.conn.execute("CREATE TEMP TABLE wanted (bucket INTEGER PRIMARY KEY)")
+        for part in buckets:
+            self.conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((b,) for b in part.ravel().tolist()))
+        rows = self.conn.execute("""
+            SELECT r.key, a.source, r.name, r.review_date, r.review_rating, r.text FROM reviews r
+            JOIN accepted a USING (key)
+            WHERE r.key IN (SELECT b.key FROM wanted w JOIN buckets b USING (bucket))
+            ORDER BY r.id""").fetchall()
+        self.conn.execute("DROP TABLE wanted")
+        df = pd.DataFrame(rows, columns=["key", "source", "name", "review_date", "review_rating", "text"])
+        df["review_date"] = pd.to_datetime(df["review_date"])
+        df["review_rating"] = df["review_rating"].astype("float64")
+        return df
+
+    # Additions are not committed until commit()
+    def add(self, keys, sources):
+        self.conn.executemany("INSERT OR IGNORE INTO accepted (key, source) VALUES (?, ?)",
+                              zip((int(k) for k in keys), sources))
+
+    def add_seen(self, source, keys):
+        self.conn.executemany("INSERT OR IGNORE INTO seen (source, key) VALUES (?, ?)",
+                              ((source, int(k)) for k in keys))
+
+    def add_reviews(self, df, buckets):
+        """Accepted rows of df (text, name, review_date, review_rating) and their LSH buckets, one row each."""
+        keys = review_keys(df).tolist()
+        dates = df["review_date"].dt.strftime("%Y-%m-%d %H:%M:%S").where(df["review_date"].notna(), None)
+        columns = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in ["name", "review_rating", "text"]]
+        self.conn.executemany("INSERT OR IGNORE INTO reviews (key, name, review_date, review_rating, text) "
+                              "VALUES (?, ?, ?, ?, ?)", zip(keys, columns[0], dates.tolist(), columns[1], columns[2]))
+        self.conn.executemany("INSERT OR IGNORE INTO buckets (bucket, key) VALUES (?, ?)",
+                              ((int(b), key) for key, row in zip(keys, buckets) for b in row))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def remove(path):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,86 @@
+# Mergeable entity-sentiment aggregates for customerInsights.py
+#
+# Instead of a list of polarities per entity, keep count, sum and sum of squares per
+# (entity, label, source, month). Partial aggregates from chunks or worker processes merge by
+# adding them up, are saved as Parquet, and means and t confidence intervals are derived from
+# them for any roll-up (per entity, per entity and source, per month, ...).
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from trendStats import mean_ci
+
+AGGREGATES_FILE = "entity_aggregates.parquet"
+KEYS = ["entity", "label", "source", "month"]
+MEASURES = ["count", "sum", "sum_sq"]
+LABELS = frozenset({"ORG", "PERSON"})
+CHUNK = 100_000   # reviews per partial aggregate
+
+
+def partial_aggregates(entities, sentiment, source, review_date, labels=LABELS):
+    """Aggregates for one chunk; entities holds a list of (text, label) per review, all row-aligned."""
+    entities = list(entities)
+    lengths = np.fromiter(map(len, entities), dtype=np.int64, count=len(entities))
+    rows = np.repeat(np.arange(len(entities)), lengths)
+    flat = pd.DataFrame(list(itertools.chain.from_iterable(entities)), columns=["entity", "label"])
+    if flat.empty:
+        return pd.DataFrame(columns=KEYS + MEASURES)
+
+    polarity = np.asarray(sentiment, dtype=float)[rows]
+    flat["entity"] = flat["entity"].str.lower()
+    flat["source"] = np.asarray(source, dtype=object)[rows]
+    flat["month"] = pd.DatetimeIndex(review_date).to_period("M").to_timestamp()[rows]
+    flat["count"] = 1
+    flat["sum"] = polarity
+    flat["sum_sq"] = polarity ** 2
+    flat = flat[flat["label"].isin(labels) & ~np.isnan(polarity)]
+    return flat.groupby(KEYS, observed=True, dropna=False, sort=False)[MEASURES].sum().reset_index()
+
+
+def merge_aggregates(*parts):
+    """Combine partial aggregates (from chunks, processes or earlier runs) into one."""
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=KEYS + MEASURES)
+    return pd.concat(parts, ignore_index=True).groupby(KEYS, dropna=False, sort=False)[MEASURES].sum().reset_index()
+
+
+def _chunk_aggregates(args):
+    return partial_aggregates(*args)
+
+
+def aggregate_entities(entities, sentiment, source, review_date, chunk_size=CHUNK, n_process=1):
+    """Aggregates for all reviews, built chunk by chunk (optionally in worker processes) and merged."""
+    entities, sentiment = list(entities), np.asarray(sentiment, dtype=float)
+    source, review_date = np.asarray(source, dtype=object), pd.DatetimeIndex(review_date)
+    chunks = [(entities[lo:lo + chunk_size], sentiment[lo:lo + chunk_size], source[lo:lo + chunk_size],
+               review_date[lo:lo + chunk_size]) for lo in range(0, len(entities), chunk_size)]
+    if n_process > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(n_process) as pool:
+            parts = list(pool.map(_chunk_aggregates, chunks))
+    else:
+        parts = [_chunk_aggregates(chunk) for chunk in chunks]
+    return merge_aggregates(*parts)
+
+
+def save_aggregates(aggregates, path=AGGREGATES_FILE):
+    aggregates.to_parquet(path, index=False)
+
+
+def load_aggregates(path=AGGREGATES_FILE):
+    return pd.read_parquet(path)
+
+
+def summarize(aggregates, by=("entity", "label"), min_count=2, confidence=0.95):
+    """Mean sentiment with a t confidence interval per group of `by`, for groups with >= min_count mentions."""
+    by = list(by)
+    totals = aggregates.groupby(by, dropna=False, sort=False)[MEASURES].sum().reset_index()
+    totals = totals[totals["count"] >= min_count].reset_index(drop=True)
+    mean, _, low, high = mean_ci(totals["count"], totals["sum"], totals["sum_sq"], confidence)
+    totals["avg_sentiment"] = mean
+    totals["ci_low"] = low
+    totals["ci_high"] = high
+    return totals[by + ["avg_sentiment", "count", "ci_low", "ci_high"]]
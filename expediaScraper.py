@@ -4,14 +4,18 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
+from selenium.common.exceptions import TimeoutException
 import random
-import pandas as pd
 import os
 import shutil
+import sys
 import ctypes
 
+from reviewCapture import capture_reviews, enable_network_capture
+from reviewSink import ReviewSink
+from reviewExtractor import SPECS, extract_cards, extract_header, fetch_new_cards, save_snapshot
+from scrapeWaits import LEDGER, Politeness, cards_signature, wait_for_cards_change, wait_for_dom_settle
+
 # Prevent Windows from sleeping
 ES_CONTINUOUS = 0x80000000
 ES_SYSTEM_REQUIRED = 0x00000001
@@ -24,22 +28,38 @@ options = Options()
 # options.add_argument("--headless")
 
 # Use a fresh user profile folder
-profile_path = "/tmp/selenium_profile"
+profile_path = os.environ.get("SELENIUM_PROFILE", "/tmp/selenium_profile")
 if os.path.exists(profile_path):
     shutil.rmtree(profile_path)
 options.add_argument(f"--user-data-dir={profile_path}")
 
+# Set to a folder to keep the final page_source for offline re-parsing / benchmarking
+SNAPSHOT_DIR = None
+
+# Politeness jitter between actions (seconds); readiness is handled by event-driven waits
+POLITENESS = Politeness(0.5, 1.5, budget=None)
+CARD_SELECTOR = SPECS["expedia"]["card"]
+
+# Read reviews from the JSON payloads the page loads, falling back to HTML when none are found
+CAPTURE_MODE = False
+RECORD_DIR = None  # Set to a folder to record captured payloads for offline replay
+if CAPTURE_MODE:
+    enable_network_capture(options)
+
 driver = uc.Chrome(version_main=137, service=Service(), options=options)
 
-url = "https://www.expedia.com/Miami-Hotels-Boulan-South-Beach.h4599935.Hotel-Information?locale=en_US&siteid=1&pwaDialog=product-reviews"
-driver.get(url)
+url = sys.argv[1] if len(sys.argv) > 1 else "https://www.expedia.com/Miami-Hotels-Boulan-South-Beach.h4599935.Hotel-Information?locale=en_US&siteid=1&pwaDialog=product-reviews"
+output_file = sys.argv[2] if len(sys.argv) > 2 else "expedia_reviews_Boulan.csv"
+POLITENESS.request()
+with LEDGER.track("page"):
+    driver.get(url)
 wait = WebDriverWait(driver, 15)
 
 # --- Human-like scrolling on page ---
 def human_scroll(driver, times=3):
     for _ in range(times):
         driver.execute_script(f"window.scrollBy(0, {random.randint(200, 400)});")
-        time.sleep(random.uniform(1.5, 3))
+        POLITENESS.pause()
 
 human_scroll(driver, times=5)
 
@@ -49,18 +69,18 @@ try:
     
     # Scroll the button into view with some offset
     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", review_button)
-    time.sleep(1)
 
-    # Wait a little for the sticky bar to settle
-    time.sleep(2)
+    # Wait for the sticky bar to settle
+    wait_for_dom_settle(driver)
 
     # Click with JS to bypass overlapping elements
+    POLITENESS.request()
     driver.execute_script("arguments[0].click();", review_button)
     print("Clicked read reviews button")
 except Exception as e:
     print(f"Failed to click read reviews button: {e}")
     driver.quit()
-    exit()
+    exit(1)
 
 # --- Wait for review modal and scrollable container ---
 try:
@@ -71,97 +91,80 @@ try:
     scroll_container = review_modal.find_element(By.CSS_SELECTOR, "div.uitk-sheet-content.uitk-sheet-content-padded")
     for _ in range(5):
         driver.execute_script("arguments[0].scrollTop += 500;", scroll_container)
-        time.sleep(random.uniform(1.5, 3))
+        wait_for_dom_settle(driver)
     print("Review modal loaded")
 except Exception as e:
     print(f"Review modal did not load: {e}")
     driver.quit()
-    exit()
+    exit(1)
+
+# Rows are appended to the sink after every click; hotel totals go in its metadata record
+sink = ReviewSink(os.path.splitext(output_file)[0] + ".arrows", "expedia")
+
+# --- Header fields never change, so read them once ---
+with LEDGER.track("page"):
+    html = driver.page_source
+with LEDGER.track("parsing"):
+    header = extract_header(html, "expedia")
+total_rating = header["total_rating"]
+total_reviews = header["total_reviews"]
+sink.set_metadata(total_rating=total_rating, total_reviews=total_reviews)
+seen_cards = set()
+clicks = 0
+read_from = "payloads" if CAPTURE_MODE else "cards"
 
 # --- Click "More reviews" until none left ---
 while True:
+    reviews = []
+    if read_from == "payloads":
+        with LEDGER.track("parsing"):
+            reviews = capture_reviews(driver, "expedia", RECORD_DIR)
+        if not reviews and sink.rows == 0:
+            read_from = "cards"  # No payloads found: read the review cards instead
+    if read_from == "cards":
+        # --- Parse only the cards this click added to the modal ---
+        with LEDGER.track("page"):
+            new_cards = fetch_new_cards(driver, review_modal, "expedia", seen_cards)
+        if SNAPSHOT_DIR:
+            with LEDGER.track("io"):
+                save_snapshot("\n".join(new_cards), SNAPSHOT_DIR, "expedia", clicks + 1)
+        with LEDGER.track("parsing"):
+            reviews = extract_cards(new_cards, "expedia")
+    with LEDGER.track("io"):
+        sink.write_page(reviews)
+
+    # Scroll the modal to bottom
+    driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
+    POLITENESS.pause()
+
+    # Try to click "More reviews" inside the modal
     try:
-        # Scroll the modal to bottom
-        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-        time.sleep(random.uniform(2, 3))
-
-        # Try to click "More reviews" inside the modal
         more_btn = WebDriverWait(driver, 5).until(
             EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'More reviews')]"))
         )
-        driver.execute_script("arguments[0].scrollIntoView(true);", more_btn)
-        time.sleep(random.uniform(1.5, 2.5))
-        more_btn.click()
-        time.sleep(random.uniform(2.5, 4))
-    except:
+    except TimeoutException:
         print("No more 'More reviews' button found or all reviews loaded.")
         break
-
-# --- Parse HTML ---
-soup = BeautifulSoup(driver.page_source, "html.parser")
-
-# --- Extract total rating and review count ---
-try:
-    total_rating_elem = soup.select_one("div.uitk-text.uitk-type-500.uitk-type-bold.uitk-text-default-theme")
-    total_rating_raw = total_rating_elem.text.strip() if total_rating_elem else None
-    total_rating = float(total_rating_raw.split('/')[0])
-
-    total_reviews_elem = soup.select_one("button.uitk-more-info-trigger > span")
-    total_reviews = total_reviews_elem.text.strip() if total_reviews_elem else None
-except:
-    total_rating = None
-    total_reviews = None
-
-# --- Extract reviews ---
-review_list = []
-reviews = soup.select('article[itemprop="review"]')
-
-for review in reviews:
-    try:
-        review_text = review.select_one("span[itemprop='description']").text.strip()
-    except:
-        review_text = None
+    driver.execute_script("arguments[0].scrollIntoView(true);", more_btn)
+    POLITENESS.pause()
+    before = cards_signature(driver, CARD_SELECTOR)
+    POLITENESS.request()
+    more_btn.click()
+    # Wait for the appended cards instead of a fixed sleep
     try:
-        rating_raw = review.select_one("span[itemprop='ratingValue']").text.strip()
-        rating = float(rating_raw.split('/')[0])
-    except:
-        rating = None
-    try:
-        name = review.select_one("h4.uitk-heading.uitk-heading-7").text.strip()
-    except:
-        name = None
-    try:
-        date = review.select_one("span[itemprop='datePublished']").text.strip()
-    except:
-        date = None
-    try: 
-        traveler_type = review.select_one("div.uitk-text.uitk-type-300.uitk-text-standard-theme").text.strip()
-    except:
-        traveler_type = None
-    try:
-        stay_text = review.select_one("div.uitk-text.uitk-type-200.uitk-text-standard-theme.uitk-layout-flex-item").text.strip()
-        import re
-        match = re.search(r"Stayed (\d+) night", stay_text)
-        length_of_stay = int(match.group(1)) if match else None
-    except:
-        length_of_stay = None
-
-    review_list.append({
-        'review_text': review_text,
-        'review_rating': rating,
-        'traveler_name': name,
-        'review_date': date,
-        'length_of_stay': length_of_stay,
-        'traveler_type': traveler_type
-    })
+        wait_for_cards_change(driver, CARD_SELECTOR, before)
+    except TimeoutException:
+        print("'More reviews' loaded no new reviews.")
+        break
+    clicks += 1
 
 # --- Save to CSV ---
-df = pd.DataFrame(review_list)
-df['total_rating'] = total_rating
-df['total_reviews'] = total_reviews
-df.to_csv("expedia_reviews_Boulan.csv", index=False)
+sink.close()
+with LEDGER.track("io"):
+    sink.export_csv(output_file)
 
-print(f"Scraped {len(review_list)} reviews, total rating: {total_rating}, total reviews: {total_reviews}")
+print(f"Scraped {sink.rows} reviews, total rating: {total_rating}, total reviews: {total_reviews}")
+LEDGER.report()
 
 driver.quit()
 
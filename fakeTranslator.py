@@ -0,0 +1,33 @@
+# Local stand-in for a translation backend, used by translationCache.py --selftest and
+# benchmarkTranslation.py instead of a network service
+
+import random
+import threading
+import time
+
+from translationCache import TARGET
+
+
+class FakeBackend:
+    """Local stand-in for a batch translation service: tags each text and counts calls.
+
+    latency is slept per call and per_item per text; fail_on texts and a random fail_rate raise.
+    """
+
+    def __init__(self, fail_on=(), latency=0.0, per_item=0.0, fail_rate=0.0, seed=0):
+        self.calls = 0
+        self.fail_on = set(fail_on)
+        self.latency = latency
+        self.per_item = per_item
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.calls += 1
+            unlucky = self.rng.random() < self.fail_rate
+        time.sleep(self.latency + self.per_item * len(texts))
+        if unlucky or self.fail_on.intersection(texts):
+            raise RuntimeError("fake backend failure")
+        return [f"[{TARGET}] {text}" for text in texts]
@@ -0,0 +1,108 @@
+# Interactive or headless figure output for dataAnalyzer.py and customerInsights.py
+#
+# A figure is a module-level draw function plus the precomputed data it plots. By default each
+# figure is drawn and shown as soon as it is added, as before. With --render DIR the figures
+# are collected and drawn on the Agg backend in forked worker processes, straight to PNG/SVG
+# files, so no display is held. matplotlib is only imported where a figure is actually drawn.
+
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+FORMATS = ["png"]
+DPI = 100
+
+
+def add_render_arguments(parser):
+    parser.add_argument("--render", metavar="DIR", help="write figures to DIR (no display) instead of showing them")
+    parser.add_argument("--only", nargs="+", metavar="FIGURE", help="only draw these figures")
+    parser.add_argument("--formats", nargs="+", default=FORMATS, choices=["png", "svg", "pdf"])
+    parser.add_argument("--workers", type=int, help="render processes (default: one per core)")
+
+
+def default_workers():
+    # Spawned workers would re-run the calling script (no main guard), so only fork
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return 1
+    return os.cpu_count() or 1
+
+
+def _draw_to_files(name, draw, data, out_dir, formats):
+    start = time.perf_counter()
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    draw(*data)
+    paths = [os.path.join(out_dir, f"{name}.{fmt}") for fmt in formats]
+    for path in paths:
+        plt.savefig(path, dpi=DPI)
+    plt.close("all")
+    return name, time.perf_counter() - start, paths
+
+
+class FigureSet:
+    """Collects figures; shows them one by one, or renders them to files in parallel."""
+
+    def __init__(self, out_dir=None, only=None, formats=FORMATS, workers=None):
+        self.out_dir = out_dir
+        self.only = set(only) if only else None
+        self.formats = formats
+        self.workers = workers or default_workers()
+        self.pending = []
+        self.report = {}
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.render, args.only, args.formats, args.workers)
+
+    @property
+    def headless(self):
+        return self.out_dir is not None
+
+    def wanted(self, name):
+        return self.only is None or name in self.only
+
+    def add(self, name, draw, *data):
+        if not self.wanted(name):
+            return
+        if not self.headless:
+            import matplotlib.pyplot as plt
+
+            draw(*data)
+            plt.show()
+        else:
+            self.pending.append((name, draw, data))
+
+    def render(self):
+        """Draw the collected figures to out_dir; returns {name: seconds} and prints the timings."""
+        if not self.headless:
+            return {}
+        os.makedirs(self.out_dir, exist_ok=True)
+        start = time.perf_counter()
+        if self.pending:
+            # Import the plotting stack once here; forked workers inherit it instead of each paying for it
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot
+            # seaborn is only preloaded here, before the workers fork (the draw functions import it
+            # themselves); import_module keeps that from reading as an unused import
+            importlib.import_module("seaborn")
+        workers = min(self.workers, len(self.pending))
+        jobs = [(name, draw, data, self.out_dir, self.formats) for name, draw, data in self.pending]
+        if workers > 1:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                results = list(pool.map(_draw_to_files, *zip(*jobs)))
+        else:
+            results = [_draw_to_files(*job) for job in jobs]
+        elapsed = time.perf_counter() - start
+        self.pending = []
+
+        for name, seconds, paths in results:
+            print(f"figure {name:28s} {seconds:6.2f}s  {', '.join(paths)}")
+        print(f"rendered {len(results)} figures with {max(workers, 1)} worker(s) in {elapsed:.2f}s")
+        self.report = {"figures": len(results), "workers": max(workers, 1), "seconds": elapsed,
+                       "per_figure": {name: seconds for name, seconds, _ in results}}
+        return self.report["per_figure"]
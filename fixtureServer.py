@@ -0,0 +1,54 @@
+# Local HTTP server serving synthetic review pages that mimic each platform's pagination
+#
+#   GET /hotel/<hotel_id>?page=N  -> page N of that hotel's reviews, with <a rel="next"> while pages remain
+
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarkExtractor import CARDS, HEADERS
+
+
+def fixture_page(platform, hotel_id, page, pages, per_page):
+    start = (page - 1) * per_page
+    cards = "".join(CARDS[platform](start + i) for i in range(per_page))
+    next_link = f'<a rel="next" href="/hotel/{hotel_id}?page={page + 1}">Next</a>' if page < pages else ""
+    return (f"<html><head><title>{hotel_id}</title></head><body><header>{HEADERS[platform]}</header>"
+            f"<main>{cards}</main><nav>{next_link}</nav></body></html>")
+
+
+def start_fixture_server(platform, pages=5, per_page=10, fail_rate=0.0, seed=0):
+    """Start a server for one platform on a free localhost port. Returns (server, base_url)."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] != "hotel":
+                self.send_error(404)
+                return
+            with lock:
+                failed = rng.random() < fail_rate
+            if failed:
+                self.send_error(503)
+                return
+            page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            if page > pages:
+                self.send_error(404)
+                return
+            body = fixture_page(platform, parts[1], page, pages, per_page).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,63 @@
+# customerInsights.py figures: each draws one chart from data precomputed by the script
+#
+# matplotlib, seaborn and wordcloud are imported on first draw, so loading this module is cheap
+# and the functions can run in headless render workers (see figureRenderer.py).
+
+
+def _plotting():
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    return plt, sns
+
+
+def sentiment_distribution(counts):
+    plt, sns = _plotting()
+    plt.figure(figsize=(6, 4))
+    sns.barplot(x=counts.index.astype(str), y=counts.values, palette='coolwarm')
+    plt.title("Sentiment Distribution")
+    plt.ylabel("count")
+    plt.tight_layout()
+
+
+def sentiment_by_traveler_type(avg_sentiment):
+    plt, sns = _plotting()
+    plt.figure(figsize=(8, 5))
+    sns.barplot(data=avg_sentiment, x='traveler_type', y='sentiment', palette='coolwarm')
+    plt.title("Average Sentiment by Traveler Type")
+    plt.ylabel("Average Sentiment")
+    plt.xlabel("Traveler Type")
+    plt.tight_layout()
+
+
+def top_phrases(bigram_freq):
+    plt, sns = _plotting()
+    plt.figure(figsize=(10, 6))
+    sns.barplot(data=bigram_freq.sort_values(by="count", ascending=False), x="count", y="bigram", palette="magma")
+    plt.title("Top 20 Most Frequent Phrases in Reviews")
+    plt.tight_layout()
+
+
+def entity_sentiment(top, title, palette):
+    """Average sentiment bars with their confidence intervals, one row per entity."""
+    plt, sns = _plotting()
+    plt.figure(figsize=(10, 6))
+    sns.barplot(data=top, x="avg_sentiment", y="entity", hue="label", dodge=False, palette=palette)
+    plt.errorbar(top["avg_sentiment"], range(len(top)), fmt="none", ecolor="black", capsize=3,
+                 xerr=[top["avg_sentiment"] - top["ci_low"], top["ci_high"] - top["avg_sentiment"]])
+    plt.title(title)
+    plt.xlabel("Average Sentiment")
+    plt.ylabel("Entity")
+    plt.tight_layout()
+
+
+def word_cloud(text_combined):
+    plt, _ = _plotting()
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=1000, height=500, background_color='white').generate(text_combined)
+    plt.figure(figsize=(12, 6))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis('off')
+    plt.title("Most Common Words in Reviews")
+    plt.tight_layout()
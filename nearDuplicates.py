@@ -0,0 +1,249 @@
+# Cross-platform near-duplicate detection: MinHash signatures over word shingles, LSH banding
+# for candidate pairs, and an exact containment check on those pairs so truncated or
+# re-spaced copies still match. Matching pairs form star clusters around their preferred
+# review, so a short text contained in two different reviews cannot chain them together.
+#
+# Every step is a numpy pass over all shingles or all documents, so cost grows about linearly
+# with the number of reviews (see benchmarkNearDuplicates.py).
+
+import numpy as np
+import pandas as pd
+
+SHINGLE = 3           # words per shingle
+MIN_TOKENS = 5        # shorter reviews ("Great stay!") are left to the exact dedup
+BANDS, ROWS = 21, 3   # 63 permutations; a pair with Jaccard 0.5 becomes a candidate ~94% of the time
+THRESHOLD = 0.8       # share of the shorter review's shingles found in the longer one
+MIN_LENGTH_RATIO = 0.5   # the shorter review keeps at least this share of the longer one's shingles
+MAX_BUCKET = 64       # LSH buckets up to this size yield every pair; larger ones link to their first row
+MAX_DAYS = 31         # syndicated copies are posted close together
+CHUNK = 200_000       # documents per signature batch
+
+_rng = np.random.default_rng(20240305)
+_A = _rng.integers(1, 2**63, size=BANDS * ROWS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=BANDS * ROWS, dtype=np.uint64)
+_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+
+
+def _shingles(texts):
+    """Hashed word shingles for each text, as one flat array plus per-document counts."""
+    words = (texts.fillna("").astype(str).str.lower()
+             .str.replace(r"[^\w]+", " ", regex=True).str.split())
+    lengths = words.str.len().to_numpy()
+    tokens = pd.util.hash_array(words.explode().to_numpy(dtype=object))
+
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    valid = np.arange(len(tokens)) - starts <= np.repeat(lengths - SHINGLE, lengths)
+    hashes = np.zeros(int(valid.sum()), dtype=np.uint64)
+    positions = np.flatnonzero(valid)
+    with np.errstate(over="ignore"):
+        for offset in range(SHINGLE):
+            hashes ^= tokens[positions + offset] * _MIX[offset % len(_MIX)]
+            hashes = (hashes << np.uint64(13)) | (hashes >> np.uint64(51))
+    return hashes, lengths - SHINGLE + 1
+
+
+def minhash_signatures(texts):
+    """(n_texts, BANDS * ROWS) uint32 MinHash signatures. Every text needs >= SHINGLE words."""
+    signatures = np.empty((len(texts), BANDS * ROWS), dtype=np.uint32)
+    for lo in range(0, len(texts), CHUNK):
+        hashes, counts = _shingles(texts.iloc[lo:lo + CHUNK])
+        offsets = np.cumsum(counts) - counts
+        with np.errstate(over="ignore"):
+            for k in range(BANDS * ROWS):
+                values = ((hashes * _A[k] + _B[k]) >> np.uint64(32)).astype(np.uint32)
+                signatures[lo:lo + len(counts), k] = np.minimum.reduceat(values, offsets)
+    return signatures
+
+
+def band_key(signatures, band):
+    """LSH bucket of every signature in one band, as a uint64 key."""
+    rows = signatures[:, band * ROWS:(band + 1) * ROWS].astype(np.uint64)
+    key = np.zeros(len(signatures), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(ROWS):
+            key = key * np.uint64(0x100000001B3) + rows[:, r]
+    return key
+
+
+def bucket_ids(keys, bands):
+    """One int64 id per (band key, band), as DedupIndex stores the buckets of accepted reviews."""
+    with np.errstate(over="ignore"):
+        return (np.asarray(keys, dtype=np.uint64) * np.uint64(BANDS) + np.asarray(bands, dtype=np.uint64)).view(np.int64)
+
+
+def lsh_buckets(texts):
+    """(n_texts, BANDS) bucket ids of each text (see bucket_ids)."""
+    signatures = minhash_signatures(texts)
+    return np.column_stack([bucket_ids(band_key(signatures, band), band) for band in range(BANDS)])
+
+
+def long_enough(texts):
+    """Mask of the texts with at least MIN_TOKENS words, the ones near-duplicate detection considers."""
+    return (texts.fillna("").astype(str).str.count(r"\w+") >= MIN_TOKENS).to_numpy()
+
+
+def bucket_links(first):
+    """Position pairs (i, j), i < j, within the runs of a sorted array (first marks each run's start).
+
+    Runs of up to MAX_BUCKET positions yield every pair. Longer runs, which only very common
+    wording produces, link each position to the run's first one: pairs between their other
+    members are only found through another band.
+    """
+    starts = np.flatnonzero(first)
+    sizes = np.diff(np.append(starts, len(first)))
+    run_start, run_end = np.repeat(starts, sizes), np.repeat(starts + sizes, sizes)
+    positions = np.arange(len(first))
+    large = np.flatnonzero((run_end - run_start > MAX_BUCKET) & ~first)
+    left, right = [run_start[large]], [large]
+    small = np.flatnonzero((run_end - run_start <= MAX_BUCKET) & (run_end - positions > 1))
+    for offset in range(1, MAX_BUCKET):
+        small = small[small + offset < run_end[small]]
+        if not len(small):
+            break
+        left.append(small)
+        right.append(small + offset)
+    return np.concatenate(left), np.concatenate(right)
+
+
+def _candidate_pairs(signatures):
+    """Pairs (a < b) sharing at least one LSH band."""
+    n = len(signatures)
+    pairs = []
+    for band in range(BANDS):
+        keys = band_key(signatures, band)
+        order = np.argsort(keys, kind="stable")
+        first = np.ones(n, dtype=bool)
+        first[1:] = keys[order][1:] != keys[order][:-1]
+        i, j = bucket_links(first)
+        pairs.append(order[i] * n + order[j])
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codes = np.unique(np.concatenate(pairs))
+    return codes // n, codes % n
+
+
+def _overlap(texts, a, b, chunk=100_000):
+    """Shared shingles and the two shingle-set sizes, for each pair (texts.iloc[a], texts.iloc[b])."""
+    shared_all, size_a, size_b = np.zeros(len(a)), np.zeros(len(a)), np.zeros(len(a))
+    for lo in range(0, len(a), chunk):
+        pa, pb = a[lo:lo + chunk], b[lo:lo + chunk]
+        docs, inverse = np.unique(np.concatenate([pa, pb]), return_inverse=True)
+        hashes, counts = _shingles(texts.iloc[docs])
+        shingles = pd.DataFrame({"doc": np.repeat(np.arange(len(docs)), counts), "shingle": hashes}).drop_duplicates()
+        sizes = shingles.groupby("doc").size().to_numpy()
+
+        ia, ib = inverse[:len(pa)], inverse[len(pa):]
+        pair = np.arange(len(pa))
+        sides = pd.concat([pd.DataFrame({"pair": pair, "doc": ia}), pd.DataFrame({"pair": pair, "doc": ib})])
+        joined = sides.merge(shingles, on="doc")
+        shared = joined.duplicated(["pair", "shingle"]).groupby(joined["pair"]).sum()
+        shared_all[lo:lo + len(pa)] = shared.reindex(pair, fill_value=0).to_numpy()
+        size_a[lo:lo + len(pa)], size_b[lo:lo + len(pa)] = sizes[ia], sizes[ib]
+    return shared_all, size_a, size_b
+
+
+def containment(texts, a, b):
+    """Exact share of the smaller shingle set found in the other, for each pair (texts.iloc[a], texts.iloc[b])."""
+    shared, size_a, size_b = _overlap(texts, a, b)
+    return shared / np.minimum(size_a, size_b)
+
+
+def near_match(texts, a, b, threshold=THRESHOLD):
+    """Mask of the pairs whose containment reaches threshold and whose shingle sets differ in
+    size by at most MIN_LENGTH_RATIO (a generic sentence is contained in many longer reviews)."""
+    shared, size_a, size_b = _overlap(texts, a, b)
+    shorter, longer = np.minimum(size_a, size_b), np.maximum(size_a, size_b)
+    return (shared >= threshold * shorter) & (shorter >= MIN_LENGTH_RATIO * longer)
+
+
+def close_in_time(days_a, days_b):
+    """Pairs posted at most MAX_DAYS apart (datetime64 arrays); pairs with a missing date are kept."""
+    gap = np.abs(days_a - days_b) / np.timedelta64(1, "D")
+    return ~(gap > MAX_DAYS)  # NaT gaps compare False
+
+
+def preference(priority, tiebreak=None):
+    """Rank of every row (0 = kept first): highest priority, then tiebreak, then earliest row,
+    the order resolve_clusters() keeps rows in."""
+    priority = np.asarray(priority, dtype=np.float64)
+    tiebreak = np.zeros(len(priority)) if tiebreak is None else np.asarray(tiebreak, dtype=np.float64)
+    order = np.lexsort((np.arange(len(priority)), -tiebreak, -priority))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank
+
+
+def cluster_ids(n, a, b, rank=None):
+    """Mask of the clustered nodes, and their cluster numbers (ordered by smallest member).
+
+    Clusters are stars rather than connected components. Taking nodes by rank (default: node
+    number), each node not yet claimed becomes a center and claims its unclaimed neighbours,
+    so every member matches its cluster's best-ranked node directly. Centers that claim nobody
+    stay unclustered.
+    """
+    rank = np.arange(n) if rank is None else np.asarray(rank)
+    # Directed edges from the better-ranked end: u blocks v from becoming a center while u is undecided
+    swap = rank[a] > rank[b]
+    u, v = np.where(swap, b, a), np.where(swap, a, b)
+    state = np.zeros(n, dtype=np.int8)   # 0 undecided, 1 center, 2 claimed
+    state[np.setdiff1d(np.arange(n), np.concatenate([a, b]))] = 2
+    while (state == 0).any():
+        blocked = np.zeros(n, dtype=bool)
+        blocked[v[state[u] == 0]] = True
+        centers = (state == 0) & ~blocked
+        state[centers] = 1
+        claimed = np.concatenate([v[centers[u]], u[centers[v]]])
+        state[claimed[state[claimed] == 0]] = 2
+    # Each claimed node joins its best-ranked neighbouring center
+    edges = pd.DataFrame({"node": np.concatenate([u, v]), "center": np.concatenate([v, u])})
+    edges = edges[(state[edges["center"]] == 1) & (state[edges["node"]] == 2)]
+    edges = edges.assign(rank=rank[edges["center"]]).sort_values("rank", kind="stable")
+    edges = edges.drop_duplicates("node")
+    center = np.full(n, -1)
+    center[edges["node"].to_numpy()] = edges["center"].to_numpy()
+    center[np.unique(edges["center"].to_numpy())] = np.unique(edges["center"].to_numpy())
+    grouped = center >= 0
+    # Numbered by smallest member
+    smallest = np.full(n, n)
+    np.minimum.at(smallest, center[grouped], np.flatnonzero(grouped))
+    _, ids = np.unique(smallest[center[grouped]], return_inverse=True)
+    return grouped, ids
+
+
+def find_near_duplicates(df, text="text", date="review_date", threshold=THRESHOLD, priority=None, tiebreak=None):
+    """Cluster id per row (-1 when the row has no near duplicate), aligned to df.index.
+
+    priority and tiebreak (aligned to df) rank the rows as resolve_clusters() will, so each
+    cluster is centered on the row that survives it.
+    """
+    clusters = pd.Series(-1, index=df.index, dtype="int64")
+    eligible = long_enough(df[text])
+    subset = df[eligible]
+    if len(subset) < 2:
+        return clusters
+
+    signatures = minhash_signatures(subset[text])
+    a, b = _candidate_pairs(signatures)
+
+    if date in subset:
+        days = subset[date].to_numpy("datetime64[ns]")
+        close = close_in_time(days[a], days[b])
+        a, b = a[close], b[close]
+
+    match = near_match(subset[text], a, b, threshold)
+    a, b = a[match], b[match]
+    rank = None
+    if priority is not None:
+        rank = preference(np.asarray(priority)[eligible], None if tiebreak is None else np.asarray(tiebreak)[eligible])
+    grouped, ids = cluster_ids(len(subset), a, b, rank)
+    clusters.loc[subset.index[grouped]] = ids
+    return clusters
+
+
+def resolve_clusters(clusters, priority, tiebreak=None):
+    """Keep mask: in each cluster only the row with the highest priority (then tiebreak) survives."""
+    order = pd.DataFrame({"cluster": clusters, "priority": priority,
+                          "tiebreak": 0 if tiebreak is None else tiebreak})
+    order = order[order["cluster"] >= 0].sort_values(["priority", "tiebreak"], ascending=False, kind="stable")
+    losers = order.index[order["cluster"].duplicated()]
+    return ~clusters.index.isin(losers)
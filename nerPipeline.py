@@ -0,0 +1,76 @@
+# Single-pass named entity extraction for customerInsights.py
+#
+# Loads only the NER component, runs every distinct text through one nlp.pipe call (optionally
+# over several processes), and keeps the entity spans in DocBin shards keyed by text hash so
+# later runs only parse texts they have not seen. spaCy itself is imported on first use, so
+# importing this module stays cheap.
+
+import glob
+import hashlib
+import multiprocessing
+import os
+import time
+
+MODEL = "en_core_web_sm"
+CACHE_DIR = "ner_cache"
+
+
+def load_ner(model=MODEL):
+    import spacy
+
+    # en_core_web_sm's ner has its own embedding layer, so tok2vec/tagger/parser/lemmatizer can go
+    return spacy.load(model, enable=["ner"])
+
+
+def default_processes():
+    # Spawned workers re-run the calling script (customerInsights.py has no main guard), so
+    # only use several processes where workers are forked
+    if multiprocessing.get_start_method() != "fork":
+        return 1
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _shard_dir(nlp, cache_dir):
+    meta = nlp.meta
+    return os.path.join(cache_dir, f"{meta.get('lang', 'xx')}_{meta.get('name', 'model')}-{meta.get('version', '0')}")
+
+
+def load_cached(nlp, cache_dir=CACHE_DIR):
+    """{text key: [(entity text, label), ...]} from every shard written for this model version."""
+    from spacy.tokens import DocBin
+
+    cached = {}
+    for path in sorted(glob.glob(os.path.join(_shard_dir(nlp, cache_dir), "*.spacy"))):
+        for doc in DocBin().from_disk(path).get_docs(nlp.vocab):
+            cached[doc.user_data["key"]] = [(ent.text, ent.label_) for ent in doc.ents]
+    return cached
+
+
+def extract_entities(texts, nlp, cache_dir=CACHE_DIR, n_process=None, batch_size=256):
+    """Entity lists aligned to texts. Returns (entities, stats) with cached/parsed counts."""
+    texts = list(texts)
+    cached = load_cached(nlp, cache_dir) if cache_dir else {}
+    keys = {text: text_key(text) for text in set(texts)}
+    missing = [text for text, key in keys.items() if key not in cached]
+
+    start = time.perf_counter()
+    n_process = n_process or default_processes()
+    if missing:
+        from spacy.tokens import DocBin
+
+        shard = DocBin(attrs=["ENT_IOB", "ENT_TYPE"], store_user_data=True)
+        for text, doc in zip(missing, nlp.pipe(missing, n_process=n_process, batch_size=batch_size)):
+            doc.user_data["key"] = keys[text]
+            cached[keys[text]] = [(ent.text, ent.label_) for ent in doc.ents]
+            shard.add(doc)
+        if cache_dir:
+            os.makedirs(_shard_dir(nlp, cache_dir), exist_ok=True)
+            shard.to_disk(os.path.join(_shard_dir(nlp, cache_dir), f"{time.time_ns()}.spacy"))
+
+    stats = {"texts": len(texts), "distinct": len(keys), "cached": len(keys) - len(missing),
+             "parsed": len(missing), "seconds": time.perf_counter() - start}
+    return [cached[keys[text]] for text in texts], stats
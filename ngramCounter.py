@@ -0,0 +1,103 @@
+# Streaming top-k phrase counts for customerInsights.py
+#
+# Texts are analyzed chunk by chunk with CountVectorizer's analyzer (same tokens, stop words and
+# n-grams as before) into a sparse chunk matrix that is immediately summed per group cell
+# (source x traveler type x sentiment bucket). Only the per-cell sparse counts are kept, never a
+# document-term matrix for the whole corpus, and top-k lists are taken with a heap per row.
+
+import heapq
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+CHUNK = 20_000        # documents per sparse chunk matrix
+MERGE_EVERY = 8       # chunk results summed into one matrix after this many chunks
+MISSING = "Unknown"   # group value for missing keys, as dataCleaner fills traveler_type
+
+
+class NgramCounter:
+    """Exact n-gram counts per group cell, accumulated one chunk at a time."""
+
+    def __init__(self, ngram_range=(2, 3), stop_words="english", by=(), chunk_size=CHUNK):
+        self.analyzer = CountVectorizer(ngram_range=ngram_range, stop_words=stop_words).build_analyzer()
+        self.by = list(by)
+        self.chunk_size = chunk_size
+        self.vocabulary = {}   # n-gram -> column, in first-seen order
+        self.cells = {}        # group key tuple -> row, in first-seen order
+        self.documents = 0
+        self._parts = []
+
+    def _cell_rows(self, groups, n):
+        if not self.by:
+            keys = [()] * n
+        else:
+            columns = [groups[c].astype(object).where(groups[c].notna(), MISSING) for c in self.by]
+            keys = zip(*columns)
+        cells = self.cells
+        return np.fromiter((cells.setdefault(key, len(cells)) for key in keys), dtype=np.int64, count=n)
+
+    def update(self, texts, groups=None):
+        """Count one chunk of texts; groups holds the `by` columns row-aligned to texts."""
+        vocabulary, analyzer = self.vocabulary, self.analyzer
+        indptr, indices = [0], []
+        for text in texts:
+            indices.extend(vocabulary.setdefault(gram, len(vocabulary)) for gram in analyzer(text))
+            indptr.append(len(indices))
+        n = len(indptr) - 1
+        rows = self._cell_rows(groups, n)
+
+        chunk = sparse.csr_matrix((np.ones(len(indices), dtype=np.int64), indices, indptr),
+                                  shape=(n, len(vocabulary)))
+        membership = sparse.csr_matrix((np.ones(n, dtype=np.int64), (rows, np.arange(n))),
+                                       shape=(len(self.cells), n))
+        self._parts.append(membership @ chunk)
+        self.documents += n
+        if len(self._parts) >= MERGE_EVERY:
+            self._merge()
+        return self
+
+    def fit(self, texts, groups=None):
+        """Count a whole corpus in chunks of chunk_size."""
+        texts = pd.Series(texts)
+        for lo in range(0, len(texts), self.chunk_size):
+            self.update(texts.iloc[lo:lo + self.chunk_size],
+                        None if groups is None else groups.iloc[lo:lo + self.chunk_size])
+        return self
+
+    def _merge(self):
+        shape = (len(self.cells), len(self.vocabulary))
+        total = sparse.csr_matrix(shape, dtype=np.int64)
+        for part in self._parts:
+            part.resize(shape)
+            total = total + part
+        self._parts = [total]
+
+    @property
+    def counts(self):
+        """(cells, n-grams) sparse counts; rows follow `cells`, columns follow `vocabulary`."""
+        self._merge()
+        return self._parts[0]
+
+    def top(self, k=20, by=None):
+        """The k most frequent n-grams overall, or per value of the `by` columns (a subset of self.by)."""
+        by = [] if by is None else list(by)
+        counts = self.counts
+        cells = pd.DataFrame(list(self.cells), columns=self.by, index=range(len(self.cells)))
+        if by:
+            codes, keys = pd.MultiIndex.from_frame(cells[by]).factorize()
+        else:
+            codes, keys = np.zeros(len(cells), dtype=np.int64), [()]
+        rollup = sparse.csr_matrix((np.ones(len(codes), dtype=np.int64), (codes, np.arange(len(codes)))),
+                                   shape=(len(keys), len(cells))) @ counts
+        names = np.array(list(self.vocabulary), dtype=object)
+
+        rows = []
+        for g, key in enumerate(keys):
+            lo, hi = rollup.indptr[g], rollup.indptr[g + 1]
+            # Ties go to the n-gram seen first
+            best = heapq.nlargest(k, zip(rollup.data[lo:hi].tolist(), (-rollup.indices[lo:hi]).tolist()))
+            key = key if isinstance(key, tuple) else (key,)
+            rows.extend((*key, names[-column], count) for count, column in best)
+        return pd.DataFrame(rows, columns=[*by, "ngram", "count"])
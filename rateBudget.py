@@ -0,0 +1,75 @@
+# Token-bucket request budget per key (a scraped domain, a translation backend)
+#
+# Shared by scrapeScheduler.py and translationExecutor.py. scrapeScheduler.py serves its budget
+# to the browser scraper processes it starts (BUDGET_ENV), so their page loads and clicks draw
+# from the same per-domain tokens as every other job on that domain.
+
+import os
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.managers import BaseManager
+
+BUDGET_ENV = "SCRAPE_BUDGET"   # host:port:authkey:domain of a served budget
+
+
+class DomainBudget:
+    """At most `rate` requests per `per` seconds and `max_concurrent` running jobs per domain."""
+
+    def __init__(self, rate=30, per=60.0, max_concurrent=1):
+        self.rate = rate
+        self.per = per
+        self.max_concurrent = max_concurrent
+        self.lock = threading.Lock()
+        self.tokens = defaultdict(lambda: float(rate))
+        self.updated = defaultdict(time.monotonic)
+        self.running = defaultdict(int)
+        self.requests = defaultdict(int)
+        self.address = None
+
+    def acquire(self, domain):
+        """Block until a request token is available for domain."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens[domain] = min(self.rate, self.tokens[domain] + (now - self.updated[domain]) * self.rate / self.per)
+                self.updated[domain] = now
+                if self.tokens[domain] >= 1:
+                    self.tokens[domain] -= 1
+                    self.requests[domain] += 1
+                    return
+                wait = (1 - self.tokens[domain]) * self.per / self.rate
+            time.sleep(wait)
+
+    def has_slot(self, domain):
+        return self.running[domain] < self.max_concurrent
+
+    def serve(self):
+        """Serve this budget to other processes (once, from a daemon thread). Returns host:port:authkey."""
+        with self.lock:
+            if self.address is None:
+                class Manager(BaseManager):
+                    pass
+
+                authkey = os.urandom(16)
+                Manager.register("budget", callable=lambda: self)
+                server = Manager(address=("127.0.0.1", 0), authkey=authkey).get_server()
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                self.address = f"{server.address[0]}:{server.address[1]}:{authkey.hex()}"
+            return self.address
+
+
+def served_budget():
+    """(budget proxy, domain) named by BUDGET_ENV, or (None, None) when the process runs on its own."""
+    value = os.environ.get(BUDGET_ENV)
+    if not value:
+        return None, None
+    host, port, authkey, domain = value.split(":", 3)
+
+    class Manager(BaseManager):
+        pass
+
+    Manager.register("budget")
+    manager = Manager(address=(host, int(port)), authkey=bytes.fromhex(authkey))
+    manager.connect()
+    return manager.budget(), domain
@@ -0,0 +1,303 @@
+# Structured-data capture: read the JSON review payloads a page loads (Chrome DevTools
+# network log) and map them straight into the scrapers' row schema, skipping DOM scraping.
+#
+# Each platform's payload field paths live in PAYLOAD_SPECS; update them there when an API changes.
+# Usage (offline replay of recorded payloads through a local stub server):
+#   python reviewCapture.py --selftest [payload_dir]
+
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _get(obj, path):
+    for part in path.split("."):
+        if isinstance(obj, dict):
+            obj = obj.get(part)
+        elif isinstance(obj, list) and part.isdigit() and int(part) < len(obj):
+            obj = obj[int(part)]
+        else:
+            return None
+    return obj
+
+
+def _first(obj, paths):
+    for path in paths:
+        value = _get(obj, path)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _as_text(value):
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value if v) or None
+    return str(value).strip()
+
+
+def _epoch_date(value):
+    # Booking sends epoch seconds; render it like the HTML "Reviewed: March 5, 2024" text
+    if isinstance(value, (int, float)):
+        d = datetime.fromtimestamp(value, tz=timezone.utc)
+        return f"{d:%B} {d.day}, {d.year}"
+    return _as_text(value)
+
+
+BOOKING_TRAVELER_TYPES = {
+    "COUPLES": "Couple",
+    "FAMILIES": "Family",
+    "GROUP_OF_FRIENDS": "Group",
+    "SOLO_TRAVELLERS": "Solo traveler",
+    "BUSINESS_TRAVELLERS": "Solo traveler",
+}
+
+TRIPADVISOR_TRIP_TYPES = {
+    "COUPLES": "Couples",
+    "FAMILY": "Family",
+    "FRIENDS": "Group",
+    "BUSINESS": "Solo",
+    "SOLO": "Solo",
+}
+
+
+def _booking_row(v):
+    review_text = ((_as_text(v["positive"]) or "") + " " + (_as_text(v["negative"]) or "")).strip()
+    try:
+        rating = float(v["rating"])
+    except (TypeError, ValueError):
+        rating = None
+    try:
+        length_of_stay = int(v["stay"])
+    except (TypeError, ValueError):
+        length_of_stay = None
+    traveler_type = _as_text(v["traveler_type"])
+    return {
+        'review_text': review_text,
+        'review_rating': rating,
+        'traveler_name': _as_text(v["name"]),
+        'review_date': _epoch_date(v["date"]),
+        'length_of_stay': length_of_stay,
+        'traveler_type': BOOKING_TRAVELER_TYPES.get(traveler_type, traveler_type)
+    }
+
+
+def _expedia_row(v):
+    try:
+        rating = float(str(v["rating"]).split('/')[0])
+    except (TypeError, ValueError):
+        rating = None
+    stay = _as_text(v["stay"])
+    match = re.search(r"Stayed (\d+) night", stay) if stay else None
+    return {
+        'review_text': _as_text(v["text"]),
+        'review_rating': rating,
+        'traveler_name': _as_text(v["name"]),
+        'review_date': _as_text(v["date"]),
+        'length_of_stay': int(match.group(1)) if match else None,
+        'traveler_type': _as_text(v["traveler_type"])
+    }
+
+
+def _tripadvisor_row(v):
+    try:
+        rating = float(v["rating"]) * 2
+    except (TypeError, ValueError):
+        rating = None
+    trip_type = _as_text(v["trip_type"])
+    return {
+        "review_text": _as_text(v["text"]),
+        "review_rating": rating,
+        "traveler_name": _as_text(v["name"]),
+        "review_title": _as_text(v["title"]),
+        "review_date": _as_text(v["date"]),
+        "date_visited": _as_text(v["date_visited"]),
+        "traveler_type": TRIPADVISOR_TRIP_TYPES.get((trip_type or "").upper(), trip_type)
+    }
+
+
+PAYLOAD_SPECS = {
+    "booking": {
+        "url": re.compile(r"booking\.com/(dml/graphql|reviewlist)", re.I),
+        "marker": ["textDetails", "reviewScore"],
+        "fields": {
+            "positive": ["textDetails.positiveText"],
+            "negative": ["textDetails.negativeText"],
+            "rating": ["reviewScore"],
+            "name": ["guestDetails.username"],
+            "date": ["reviewedDate"],
+            "stay": ["bookingDetails.numNights"],
+            "traveler_type": ["bookingDetails.customerType"],
+        },
+        "row": _booking_row,
+    },
+    "expedia": {
+        "url": re.compile(r"expedia\.com/graphql", re.I),
+        "marker": ["reviewScoreWithDescription"],
+        "fields": {
+            "text": ["text"],
+            "rating": ["reviewScoreWithDescription.value"],
+            "name": ["reviewAuthorAttribution.text"],
+            "date": ["submissionTimeLocalized"],
+            "traveler_type": ["travelers"],
+            "stay": ["stayDuration"],
+        },
+        "row": _expedia_row,
+    },
+    "tripadvisor": {
+        "url": re.compile(r"tripadvisor\.com/data/graphql", re.I),
+        "marker": ["publishedDate", "userProfile"],
+        "fields": {
+            "text": ["text"],
+            "rating": ["rating"],
+            "name": ["userProfile.displayName"],
+            "title": ["title"],
+            "date": ["publishedDate"],
+            "date_visited": ["tripInfo.stayDate"],
+            "trip_type": ["tripInfo.tripType"],
+        },
+        "row": _tripadvisor_row,
+    },
+}
+
+
+def rows_from_payload(payload, platform):
+    """Walk a decoded JSON payload and map every review-shaped object into a row."""
+    spec = PAYLOAD_SPECS[platform]
+    rows = []
+    stack = [payload]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            if all(key in obj for key in spec["marker"]):
+                rows.append(spec["row"]({name: _first(obj, paths) for name, paths in spec["fields"].items()}))
+                continue
+            stack.extend(reversed(list(obj.values())))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+    return rows
+
+
+# --- Chrome DevTools network log ---
+def enable_network_capture(options):
+    """Turn on the performance log so responses can be read back with Network.getResponseBody."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def captured_payloads(driver, platform):
+    """Drain the performance log and return decoded JSON bodies of matching responses."""
+    url_pattern = PAYLOAD_SPECS[platform]["url"]
+    payloads = []
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message.get("method") != "Network.responseReceived":
+            continue
+        response = message["params"]["response"]
+        if "json" not in response.get("mimeType", "") or not url_pattern.search(response.get("url", "")):
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": message["params"]["requestId"]})
+            payloads.append(json.loads(body["body"]))
+        except Exception:
+            continue  # Body evicted or not JSON
+    return payloads
+
+
+def save_payloads(payloads, record_dir, platform):
+    os.makedirs(record_dir, exist_ok=True)
+    start = len(glob.glob(os.path.join(record_dir, f"{platform}_*.json")))
+    for i, payload in enumerate(payloads):
+        with open(os.path.join(record_dir, f"{platform}_{start + i:04d}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+
+def capture_reviews(driver, platform, record_dir=None):
+    """Rows from the payloads loaded since the last call. An empty list means fall back to HTML."""
+    payloads = captured_payloads(driver, platform)
+    if record_dir and payloads:
+        save_payloads(payloads, record_dir, platform)
+    return [row for payload in payloads for row in rows_from_payload(payload, platform)]
+
+
+# --- Offline replay through a local stub server ---
+def start_payload_server(payload_dir):
+    """Serve <payload_dir>/<name>.json at /api/<name>. Returns (server, base_url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = os.path.join(payload_dir, os.path.basename(self.path.rstrip("/")) + ".json")
+            if not self.path.startswith("/api/") or not os.path.exists(path):
+                self.send_error(404)
+                return
+            with open(path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def replay(payload_dir, platform):
+    """Fetch every recorded payload for platform from the stub server and map it into rows."""
+    server, base = start_payload_server(payload_dir)
+    rows = []
+    try:
+        for path in sorted(glob.glob(os.path.join(payload_dir, f"{platform}_*.json"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            with urllib.request.urlopen(f"{base}/api/{name}", timeout=10) as resp:
+                rows.extend(rows_from_payload(json.loads(resp.read()), platform))
+    finally:
+        server.shutdown()
+    return rows
+
+
+def _sample_payloads():
+    # Minimal payloads shaped like the recorded ones, used when no recording directory is given
+    return {
+        "booking": {"data": {"reviewListFrontend": {"reviewCard": [
+            {"textDetails": {"positiveText": "Great location", "negativeText": "Noisy"}, "reviewScore": 8,
+             "guestDetails": {"username": "Ana"}, "reviewedDate": 1709596800,
+             "bookingDetails": {"numNights": 3, "customerType": "COUPLES"}},
+        ]}}},
+        "expedia": {"data": {"propertyReviews": {"reviews": [
+            {"text": "Room was fine.", "reviewScoreWithDescription": {"value": "10/10 Excellent"},
+             "reviewAuthorAttribution": {"text": "Bo"}, "submissionTimeLocalized": "Mar 5, 2024",
+             "travelers": ["Traveled with partner"], "stayDuration": "Stayed 2 nights in Mar 2024"},
+        ]}}},
+        "tripadvisor": [{"data": {"locations": [{"reviewListPage": {"reviews": [
+            {"text": "Nice view.", "rating": 4, "title": "Lovely", "publishedDate": "2024-03-05",
+             "userProfile": {"displayName": "Cy"}, "tripInfo": {"stayDate": "2024-03-31", "tripType": "FRIENDS"}},
+        ]}}]}}],
+    }
+
+
+if __name__ == "__main__" and "--selftest" in sys.argv:
+    import tempfile
+
+    args = [a for a in sys.argv[1:] if a != "--selftest"]
+    payload_dir = args[0] if args else tempfile.mkdtemp()
+    if not args:
+        for platform, payload in _sample_payloads().items():
+            save_payloads([payload], payload_dir, platform)
+    for platform in PAYLOAD_SPECS:
+        rows = replay(payload_dir, platform)
+        print(f"{platform:12s} {len(rows)} rows")
+        for row in rows[:3]:
+            print("   ", row)
+        assert rows or args, f"{platform}: no rows mapped from sample payload"
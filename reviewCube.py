@@ -0,0 +1,141 @@
+# Materialized review aggregates for dataAnalyzer.py and the Power BI report
+#
+# One row per source x year x month x traveler_type x stay bucket x rating bin, holding the
+# review count and count, sum and sum of squares of the rating (and of sentiment once customerInsights.py has scored
+# the reviews). dataCleaner.py adds new rows to it, so reading it costs the same however many
+# reviews there are; means, variances and confidence intervals for any roll-up come from the sums.
+# Usage:
+#   python reviewCube.py --rebuild       # rebuild review_cube.parquet from the review store
+#   python reviewCube.py --export        # write review_cube_powerbi.csv for Reviews_Report.pbix
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from trendStats import mean_ci
+
+CUBE_FILE = "review_cube.parquet"
+EXPORT_FILE = "review_cube_powerbi.csv"
+DIMENSIONS = ["source", "year", "month", "traveler_type", "stay_bucket", "rating_bin"]
+RATING_MEASURES = ["rating_count", "rating_sum", "rating_sum_sq"]
+SENTIMENT_MEASURES = ["sentiment_count", "sentiment_sum", "sentiment_sum_sq"]
+MEASURES = ["reviews"] + RATING_MEASURES + SENTIMENT_MEASURES
+
+# length_of_stay is 0 when unknown (dataCleaner fills it)
+STAY_EDGES = [0, 1, 2, 3, 4, 7, 14, np.inf]
+STAY_BUCKETS = ["Unknown", "1", "2", "3", "4-6", "7-13", "14+"]
+RATING_BIN = 0.5   # histogram resolution of the rating scale (0-10)
+
+
+def stay_bucket(length_of_stay):
+    nights = pd.Series(length_of_stay).astype("float64").fillna(0).to_numpy()
+    return pd.Categorical.from_codes(np.searchsorted(STAY_EDGES, nights, side="right") - 1, STAY_BUCKETS)
+
+
+def rating_bin(rating):
+    return np.clip(np.floor(np.asarray(rating, dtype=float) / RATING_BIN) * RATING_BIN, 0, 10 - RATING_BIN)
+
+
+def _cells(df):
+    dates = pd.DatetimeIndex(df["review_date"])
+    return pd.DataFrame({
+        "source": df["source"].astype(str).to_numpy(),
+        "year": dates.year.astype("int16"),
+        "month": dates.month.astype("int8"),
+        "traveler_type": df["traveler_type"].astype(object).fillna("Unknown").astype(str).to_numpy(),
+        "stay_bucket": np.asarray(stay_bucket(df["length_of_stay"]), dtype=object),
+        "rating_bin": rating_bin(df["review_rating"]),
+    })
+
+
+def build_cube(df):
+    """Aggregates of a cleaned review frame (any subset of rows); sentiment is used when present."""
+    cells = _cells(df)
+    rating = df["review_rating"].astype("float64").to_numpy()
+    cells["reviews"] = 1
+    cells["rating_count"] = (~np.isnan(rating)).astype(np.int64)
+    cells["rating_sum"] = np.nan_to_num(rating)
+    cells["rating_sum_sq"] = np.nan_to_num(rating) ** 2
+    sentiment = df["sentiment"].astype("float64").to_numpy() if "sentiment" in df else np.full(len(df), np.nan)
+    cells["sentiment_count"] = (~np.isnan(sentiment)).astype(np.int64)
+    cells["sentiment_sum"] = np.nan_to_num(sentiment)
+    cells["sentiment_sum_sq"] = np.nan_to_num(sentiment) ** 2
+    # dropna=False keeps unrated reviews (rating_bin NaN) in the review counts
+    return cells.groupby(DIMENSIONS, sort=True, dropna=False)[MEASURES].sum().reset_index()
+
+
+def merge_cubes(*cubes):
+    """Add cubes built from disjoint sets of reviews."""
+    cubes = [c for c in cubes if len(c)]
+    if not cubes:
+        return pd.DataFrame(columns=DIMENSIONS + MEASURES)
+    cube = pd.concat(cubes, ignore_index=True)
+    return cube.groupby(DIMENSIONS, sort=True, dropna=False)[MEASURES].sum().reset_index()
+
+
+def load_cube(path=CUBE_FILE):
+    return pd.read_parquet(path)
+
+
+def save_cube(cube, path=CUBE_FILE):
+    cube.to_parquet(path, index=False)
+
+
+def update_cube(new_reviews, path=CUBE_FILE):
+    """Fold newly cleaned reviews into the saved cube (created if missing)."""
+    cube = build_cube(new_reviews)
+    if os.path.exists(path):
+        cube = merge_cubes(load_cube(path), cube)
+    save_cube(cube, path)
+    return cube
+
+
+def set_sentiment(scored_reviews, path=CUBE_FILE):
+    """Replace the cube's sentiment measures with those of scored_reviews (all reviews, with 'sentiment')."""
+    scored = build_cube(scored_reviews)
+    cube = load_cube(path).drop(columns=SENTIMENT_MEASURES)
+    cube = cube.merge(scored[DIMENSIONS + SENTIMENT_MEASURES], on=DIMENSIONS, how="outer")
+    cube[MEASURES] = cube[MEASURES].fillna(0)
+    cube = cube.astype({c: np.int64 for c in ["reviews", "rating_count", "sentiment_count"]})[DIMENSIONS + MEASURES]
+    save_cube(cube, path)
+    return cube
+
+
+def summarize(cube, by, measure="rating", confidence=0.95):
+    """count, mean, std and a t confidence interval of rating or sentiment per group of `by`."""
+    totals = cube.groupby(list(by), sort=True)[[f"{measure}_count", f"{measure}_sum", f"{measure}_sum_sq"]].sum()
+    mean, std, low, high = mean_ci(totals[f"{measure}_count"], totals[f"{measure}_sum"],
+                                   totals[f"{measure}_sum_sq"], confidence)
+    return pd.DataFrame({"count": totals[f"{measure}_count"].to_numpy(), "mean": mean, "std": std,
+                         "ci_low": low, "ci_high": high}, index=totals.index)
+
+
+def export_powerbi(cube, path=EXPORT_FILE):
+    """Flat CSV for Reviews_Report.pbix: dimensions, a month date, additive measures and cell means."""
+    out = cube.copy()
+    out.insert(0, "month_start", pd.to_datetime(pd.DataFrame({"year": out["year"], "month": out["month"], "day": 1})))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["avg_rating"] = out["rating_sum"] / out["rating_count"]
+        out["avg_sentiment"] = out["sentiment_sum"] / out["sentiment_count"]
+    out.to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rebuild", action="store_true", help="Rebuild the cube from every review in the store")
+    ap.add_argument("--export", action="store_true", help=f"Write {EXPORT_FILE} for Power BI")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        from reviewStore import read_reviews
+
+        reviews = read_reviews(columns=["source", "review_date", "review_rating", "traveler_type", "length_of_stay"])
+        save_cube(build_cube(reviews))
+    cube = load_cube()
+    if args.export:
+        print(f"Wrote {export_powerbi(cube)}")
+    print(f"{len(cube)} cells, {cube['reviews'].sum()} reviews, {cube['rating_count'].sum()} rated, "
+          f"{cube['sentiment_count'].sum()} with sentiment")
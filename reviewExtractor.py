@@ -0,0 +1,334 @@
+# Shared review extraction engine for the Booking, Expedia and TripAdvisor scrapers
+
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+# --- Declarative field spec ---
+# mode:  "text"   -> el.text.strip()
+#        "strip"  -> el.get_text(strip=True)
+#        "spaced" -> el.get_text(separator=" ", strip=True)
+#        "attr"   -> el[attr]
+#        "raw"    -> el.text (unstripped)
+# index: None picks the first match (select_one), an int picks the nth match (select()[n])
+Field = namedtuple("Field", ["selector", "mode", "attr", "index"], defaults=["text", None, None])
+
+
+def _booking_rating(raw):
+    try:
+        return float(raw.split('/')[0])
+    except Exception:
+        return None
+
+
+def _booking_row(v):
+    review_text = ((v["positive"] or "") + " " + (v["negative"] or "")).strip()
+    review_date = v["date"].replace("Reviewed:", "").strip() if v["date"] is not None else None
+    match = re.search(r"(\d+)\s+nights?", v["stay"]) if v["stay"] is not None else None
+    return {
+        'review_text': review_text,
+        'review_rating': _booking_rating(v["rating"]),
+        'traveler_name': v["name"],
+        'review_date': review_date,
+        'length_of_stay': int(match.group(1)) if match else None,
+        'traveler_type': v["traveler_type"]
+    }
+
+
+def _expedia_row(v):
+    match = re.search(r"Stayed (\d+) night", v["stay"]) if v["stay"] is not None else None
+    return {
+        'review_text': v["text"],
+        'review_rating': _booking_rating(v["rating"]),
+        'traveler_name': v["name"],
+        'review_date': v["date"],
+        'length_of_stay': int(match.group(1)) if match else None,
+        'traveler_type': v["traveler_type"]
+    }
+
+
+def _tripadvisor_row(v):
+    rating = None
+    if v["rating"] is not None:
+        m = re.search(r"(\d(?:\.\d)?) of 5 bubbles", v["rating"])
+        if m:
+            rating = float(m.group(1)) * 2
+
+    trip_type_raw = v["trip_type"]
+    if trip_type_raw == "Friends":
+        traveler_type = "Group"
+    elif trip_type_raw == "Business":
+        traveler_type = "Solo"
+    else:
+        traveler_type = trip_type_raw
+
+    return {
+        "review_text": v["text"],
+        "review_rating": rating,
+        "traveler_name": v["name"],
+        "review_title": v["title"],
+        "review_date": v["date"],
+        "date_visited": v["date_visited"],
+        "traveler_type": traveler_type
+    }
+
+
+def _booking_header(v):
+    return {"total_rating": v["total_rating"], "total_reviews": v["total_reviews"]}
+
+
+def _expedia_header(v):
+    try:
+        total_rating = float(v["total_rating"].split('/')[0])
+    except Exception:
+        return {"total_rating": None, "total_reviews": None}
+    return {"total_rating": total_rating, "total_reviews": v["total_reviews"]}
+
+
+def _tripadvisor_header(v):
+    total_rating = None
+    if v["total_rating"] is not None:
+        try:
+            total_rating = round(float(v["total_rating"]) * 2, 1)  # Convert to 10 scale
+        except ValueError:
+            total_rating = None
+    total_reviews = None
+    if v["total_reviews"] is not None:
+        match = re.search(r"([\d,]+)", v["total_reviews"])
+        if match:
+            total_reviews = int(match.group(1).replace(",", ""))
+    return {"total_rating": total_rating, "total_reviews": total_reviews}
+
+
+SPECS = {
+    "booking": {
+        "card": "div[data-testid='review-card']",
+        "fields": {
+            "positive": Field('div[data-testid="review-positive-text"]', "spaced"),
+            "negative": Field('div[data-testid="review-negative-text"]', "spaced"),
+            "rating": Field("div.f63b14ab7a.dff2e52086"),
+            "name": Field("div.b08850ce41.f546354b44"),
+            "date": Field("span[data-testid='review-date']"),
+            "stay": Field("span[data-testid='review-num-nights']"),
+            "traveler_type": Field("span[data-testid='review-traveler-type']"),
+        },
+        # Fields that identify a card across page loads, read in the browser
+        "key": [
+            "div.b08850ce41.f546354b44",
+            "span[data-testid='review-date']",
+            'div[data-testid="review-positive-text"]',
+            'div[data-testid="review-negative-text"]',
+        ],
+        "row": _booking_row,
+        "header": {
+            "total_rating": Field("div.f63b14ab7a.dff2e52086"),
+            "total_reviews": Field("div.fff1944c52.fb14de7f14.eaa8455879"),
+        },
+        "header_row": _booking_header,
+    },
+    "expedia": {
+        "card": 'article[itemprop="review"]',
+        "fields": {
+            "text": Field("span[itemprop='description']"),
+            "rating": Field("span[itemprop='ratingValue']"),
+            "name": Field("h4.uitk-heading.uitk-heading-7"),
+            "date": Field("span[itemprop='datePublished']"),
+            "traveler_type": Field("div.uitk-text.uitk-type-300.uitk-text-standard-theme"),
+            "stay": Field("div.uitk-text.uitk-type-200.uitk-text-standard-theme.uitk-layout-flex-item"),
+        },
+        "key": [
+            "h4.uitk-heading.uitk-heading-7",
+            "span[itemprop='datePublished']",
+            "span[itemprop='description']",
+        ],
+        "row": _expedia_row,
+        "header": {
+            "total_rating": Field("div.uitk-text.uitk-type-500.uitk-type-bold.uitk-text-default-theme"),
+            "total_reviews": Field("button.uitk-more-info-trigger > span"),
+        },
+        "header_row": _expedia_header,
+    },
+    "tripadvisor": {
+        "card": "div[class*='JVaPo']",
+        "fields": {
+            "text": Field("span._d._c[data-automation^='reviewText']", "strip"),
+            "rating": Field("svg[data-automation='bubbleRatingImage'] title"),
+            "name": Field("a.BMQDV._F.Gv.wSSLS.SwZTJ.FGwzt.ukgoS", "strip"),
+            "title": Field("div[data-test-target='review-title'] > div > a", "strip"),
+            "date": Field("div.hDWtV span[title]", "attr", "title"),
+            "date_visited": Field("div.TgEgi div.biGQs._P.fiohW.fOtGX", "strip", index=0),
+            "trip_type": Field("div.TgEgi div.biGQs._P.fiohW.fOtGX", "strip", index=1),
+        },
+        "key": [
+            "a.BMQDV._F.Gv.wSSLS.SwZTJ.FGwzt.ukgoS",
+            "div.hDWtV span[title]",
+            "span._d._c[data-automation^='reviewText']",
+        ],
+        "row": _tripadvisor_row,
+        "header": {
+            "total_rating": Field("div[data-automation='bubbleRatingValue']"),
+            "total_reviews": Field("div[data-automation='bubbleReviewCount']", "raw"),
+        },
+        "header_row": _tripadvisor_header,
+    },
+}
+
+
+# --- Compiled lxml backend ---
+# BeautifulSoup's get_text() leaves out the contents of these elements (and comments, which
+# itertext() already skips)
+HIDDEN_TEXT = ("script", "style", "template")
+_has_hidden = etree.XPath("boolean(" + " | ".join(f".//{tag}" for tag in HIDDEN_TEXT) + ")")
+
+
+def _visible_text(el):
+    if el.text:
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in HIDDEN_TEXT:
+            yield from _visible_text(child)
+        if child.tail:
+            yield child.tail
+
+
+def itertext(el):
+    """el's text pieces in document order, as BeautifulSoup's get_text() sees them."""
+    return _visible_text(el) if _has_hidden(el) else el.itertext()
+
+
+class CompiledSpec:
+    def __init__(self, spec):
+        self.card = CSSSelector(spec["card"], translator="html")
+        self.fields = [(name, CSSSelector(f.selector, translator="html"), f) for name, f in spec["fields"].items()]
+        self.header = [(name, CSSSelector(f.selector, translator="html"), f) for name, f in spec["header"].items()]
+        self.row = spec["row"]
+        self.header_row = spec["header_row"]
+
+    @staticmethod
+    def _value(root, selector, field):
+        matches = selector(root)
+        i = field.index or 0
+        if len(matches) <= i:
+            return None
+        el = matches[i]
+        if field.mode == "attr":
+            return el.get(field.attr)
+        if field.mode == "raw":
+            return "".join(itertext(el))
+        if field.mode == "strip":
+            return "".join(s.strip() for s in itertext(el) if s.strip())
+        if field.mode == "spaced":
+            return " ".join(s.strip() for s in itertext(el) if s.strip())
+        return "".join(itertext(el)).strip()
+
+    def rows(self, root):
+        return [
+            self.row({name: self._value(card, sel, f) for name, sel, f in self.fields})
+            for card in self.card(root)
+        ]
+
+    def header_fields(self, root):
+        return self.header_row({name: self._value(root, sel, f) for name, sel, f in self.header})
+
+
+# Compiled lazily so that process pool workers build their own copy once
+_compiled = {}
+
+
+def compile_spec(platform):
+    if platform not in _compiled:
+        _compiled[platform] = CompiledSpec(SPECS[platform])
+    return _compiled[platform]
+
+
+def parse_html(html):
+    return lxml.html.fromstring(html) if html.strip() else None
+
+
+def extract_reviews(html, platform):
+    root = parse_html(html)
+    return compile_spec(platform).rows(root) if root is not None else []
+
+
+def extract_header(html, platform):
+    spec = compile_spec(platform)
+    root = parse_html(html)
+    if root is None:
+        return spec.header_row({name: None for name, _, _ in spec.header})
+    return spec.header_fields(root)
+
+
+def extract_page(html, platform):
+    spec = compile_spec(platform)
+    root = parse_html(html)
+    if root is None:
+        return spec.header_row({name: None for name, _, _ in spec.header}), []
+    return spec.header_fields(root), spec.rows(root)
+
+
+def extract_cards(fragments, platform):
+    """Parse a list of review card outerHTML strings in a single lxml pass."""
+    if not fragments:
+        return []
+    return extract_reviews("<div>" + "".join(fragments) + "</div>", platform)
+
+
+# --- Browser-side container extraction ---
+# Returns only cards not returned before: each returned card is marked with its identity key
+# (data-extracted), so a call transfers just the new cards whatever was read earlier. A card
+# node the page reuses for another review gets a new key and is returned again.
+NEW_CARDS_JS = """
+const container = arguments[0], cardSelector = arguments[1], keySelectors = arguments[2];
+const out = [];
+for (const card of container.querySelectorAll(cardSelector)) {
+    const key = keySelectors.map(sel => {
+        const el = card.querySelector(sel);
+        return el ? el.textContent.trim().slice(0, 200) : "";
+    }).join("|");
+    if (card.getAttribute("data-extracted") === key) continue;
+    out.push([key, card.outerHTML]);
+    card.setAttribute("data-extracted", key);
+}
+return out;
+"""
+
+
+def fetch_new_cards(driver, container, platform, seen):
+    """Pull review cards not fetched before from a live container element; seen collects their keys.
+
+    Cards whose key an earlier call returned (the same review on another page) are dropped.
+    Cards sharing a key within one call are different reviews and are all kept.
+    """
+    spec = SPECS[platform]
+    new_cards = driver.execute_script(NEW_CARDS_JS, container, spec["card"], spec["key"])
+    fresh = [html for key, html in new_cards if key not in seen]
+    if len(fresh) < len(new_cards):
+        print(f"Skipped {len(new_cards) - len(fresh)} {platform} cards already read on an earlier page")
+    seen.update(key for key, _ in new_cards)
+    return fresh
+
+
+# --- Saved page snapshots ---
+def _extract_file(args):
+    path, platform = args
+    with open(path, encoding="utf-8") as f:
+        return extract_page(f.read(), platform)
+
+
+def extract_snapshots(paths, platform, workers=None):
+    """Parse saved page_source snapshots in a process pool, returning (header, rows) per file in order."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_extract_file, [(p, platform) for p in paths], chunksize=4))
+
+
+def save_snapshot(html, snapshot_dir, platform, page):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, f"{platform}_page_{page:04d}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
@@ -0,0 +1,76 @@
+# Review table schema shared by dataCleaner, reviewStore, dataAnalyzer and customerInsights.
+#
+# apply_schema() casts a frame to the compact dtypes; validate() raises SchemaError when a
+# frame does not match. The cleaner validates before writing, the store after reading.
+
+import pandas as pd
+import pyarrow as pa
+
+SOURCES = ["Booking", "Expedia", "Tripadvisor"]
+
+STRING = pd.ArrowDtype(pa.string())
+
+REVIEW_DTYPES = {
+    "text": STRING,
+    "review_rating": "float32",
+    "name": STRING,
+    "review_date": "datetime64[ns]",
+    "length_of_stay": "Int16",
+    "traveler_type": "category",
+    "total_rating": "float32",
+    "total_reviews": "Int32",
+    "source": pd.CategoricalDtype(SOURCES),
+}
+
+RATING_RANGE = (0, 10)
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def apply_schema(df):
+    """Cast every schema column present in df; other columns are left alone."""
+    df = df.copy()
+    for col, dtype in REVIEW_DTYPES.items():
+        if col not in df:
+            continue
+        values = df[col]
+        if col == "review_date":
+            values = pd.to_datetime(values, errors="coerce")
+        elif dtype in ("float32", "Int16", "Int32"):
+            values = pd.to_numeric(values, errors="coerce")
+            if dtype != "float32":
+                values = values.round()
+        df[col] = values.astype(dtype)
+    return df
+
+
+def validate(df, required=None):
+    """Raise SchemaError listing every column with a missing, mistyped or out-of-range value set."""
+    problems = []
+    for col in required or []:
+        if col not in df:
+            problems.append(f"{col}: missing")
+    for col, dtype in REVIEW_DTYPES.items():
+        if col not in df:
+            continue
+        actual = df[col].dtype
+        if isinstance(dtype, str) and dtype == "category":
+            ok = isinstance(actual, pd.CategoricalDtype)
+        else:
+            ok = actual == pd.api.types.pandas_dtype(dtype)
+        if not ok:
+            problems.append(f"{col}: expected {dtype}, got {actual}")
+    if "source" in df and isinstance(df["source"].dtype, pd.CategoricalDtype):
+        unknown = df["source"].isna().sum()
+        if unknown:
+            problems.append(f"source: {unknown} rows outside {SOURCES}")
+    if "review_rating" in df and pd.api.types.is_numeric_dtype(df["review_rating"]):
+        low, high = RATING_RANGE
+        outside = (~df["review_rating"].between(low, high) & df["review_rating"].notna()).sum()
+        if outside:
+            problems.append(f"review_rating: {outside} values outside {low}-{high}")
+    if problems:
+        raise SchemaError("review schema mismatch:\n  " + "\n  ".join(problems))
+    return df
@@ -0,0 +1,200 @@
+# Full-text search over review text and translations (SQLite FTS5, BM25 ranking)
+#
+# review_search.sqlite keeps one row per cleaned review, keyed by its dedup key
+# (dedupIndex.review_keys). The row holds the filter columns and both texts. An FTS5 index
+# over text and translated_text reads its content from that table. dataCleaner.py adds each
+# run's new reviews; customerInsights.py stores the translations and slices review subsets
+# with ReviewSearch.slice().
+# Usage:
+#   python reviewSearch.py noise breakfast [--source Booking] [--since 2023-01-01] [--max-rating 6] [--limit 10]
+#   python reviewSearch.py --rebuild        # index every review in the store (translations come from customerInsights.py)
+
+import argparse
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+from dedupIndex import review_keys
+
+SEARCH_FILE = "review_search.sqlite"
+SEARCH_LIMIT = 50
+CACHE_MB = 256    # SQLite page cache, filled as needed: filtered searches read one row per match
+TEXT_WEIGHT, TRANSLATED_WEIGHT = 1.0, 1.0   # bm25() column weights
+# Porter stems English words ("rooms" finds "room"); unicode61 folds case and accents for every language
+TOKENIZER = "porter unicode61 remove_diacritics 2"
+FIELDS = ["source", "review_date", "review_rating", "traveler_type", "text", "translated_text"]
+
+_TERM = re.compile(r"\w+\*?")
+
+
+def match_expression(query):
+    """FTS5 query matching every word of a plain query (a trailing * keeps a prefix search)."""
+    terms = _TERM.findall(query)
+    if not terms:
+        raise ValueError(f"no search terms in {query!r}")
+    return " ".join(f'"{t.rstrip("*")}"*' if t.endswith("*") else f'"{t}"' for t in terms)
+
+
+def _column(values):
+    values = values.astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def _translations(df):
+    """translated_text where it differs from text (English reviews pass through untranslated), else None."""
+    if "translated_text" not in df:
+        return [None] * len(df)
+    translated = df["translated_text"].astype(object)
+    return _column(translated.where(translated != df["text"].astype(object)))
+
+
+class ReviewSearch:
+    def __init__(self, path=SEARCH_FILE, cache_mb=CACHE_MB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(f"""
+            PRAGMA cache_size = -{cache_mb * 1024};
+            CREATE TABLE IF NOT EXISTS reviews (
+                id INTEGER PRIMARY KEY, key INTEGER NOT NULL UNIQUE, source TEXT NOT NULL,
+                review_date TEXT NOT NULL, review_rating REAL, traveler_type TEXT,
+                text TEXT, translated_text TEXT);
+            CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+                text, translated_text, content='reviews', content_rowid='id', tokenize='{TOKENIZER}');
+        """)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def add(self, df):
+        """Index the reviews of df (cleaned rows, any subset) not indexed yet. Returns how many were added."""
+        rows = zip(review_keys(df).tolist(), df["source"].astype(str).tolist(),
+                   df["review_date"].dt.strftime("%Y-%m-%d").tolist(), _column(df["review_rating"].astype("float64")),
+                   _column(df["traveler_type"]), _column(df["text"]), _translations(df))
+        with self.conn:
+            last = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM reviews").fetchone()[0]
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO reviews (key, source, review_date, review_rating, "
+                                  "traveler_type, text, translated_text) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            added = self.conn.total_changes - before
+            # New rows get ids above the previous maximum
+            self.conn.execute("INSERT INTO reviews_fts (rowid, text, translated_text) "
+                              "SELECT id, text, translated_text FROM reviews WHERE id > ?", (last,))
+        return added
+
+    def set_translations(self, df):
+        """Store df's translated_text for its indexed reviews; only changed ones are re-indexed. Returns that count."""
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE incoming (key INTEGER PRIMARY KEY, translated_text TEXT)")
+            self.conn.executemany("INSERT OR REPLACE INTO incoming VALUES (?, ?)",
+                                  zip(review_keys(df).tolist(), _translations(df)))
+            self.conn.execute("CREATE TEMP TABLE changed AS SELECT r.id, i.translated_text FROM reviews r "
+                              "JOIN incoming i USING (key) WHERE r.translated_text IS NOT i.translated_text")
+            # An external-content index deletes a row by its old values, before the row changes
+            self.conn.execute("INSERT INTO reviews_fts (reviews_fts, rowid, text, translated_text) "
+                              "SELECT 'delete', id, text, translated_text FROM reviews WHERE id IN (SELECT id FROM changed)")
+            self.conn.execute("UPDATE reviews SET translated_text = (SELECT c.translated_text FROM changed c "
+                              "WHERE c.id = reviews.id) WHERE id IN (SELECT id FROM changed)")
+            self.conn.execute("INSERT INTO reviews_fts (rowid, text, translated_text) "
+                              "SELECT id, text, translated_text FROM reviews WHERE id IN (SELECT id FROM changed)")
+            changed = self.conn.execute("SELECT COUNT(*) FROM changed").fetchone()[0]
+            self.conn.execute("DROP TABLE incoming")
+            self.conn.execute("DROP TABLE changed")
+        return changed
+
+    def _select(self, fields, query, sources, since, until, min_rating, max_rating, limit, raw):
+        terms, params = ["reviews_fts MATCH ?"], [query if raw else match_expression(query)]
+        if sources is not None:
+            sources = list(sources)
+            terms.append(f"c.source IN ({','.join('?' * len(sources))})")
+            params += sources
+        for term, value in [("c.review_date >= ?", since), ("c.review_date <= ?", until)]:
+            if value is not None:
+                terms.append(term)
+                params.append(pd.Timestamp(value).strftime("%Y-%m-%d"))
+        for term, value in [("c.review_rating >= ?", min_rating), ("c.review_rating <= ?", max_rating)]:
+            if value is not None:
+                terms.append(term)
+                params.append(float(value))
+        # Matches are ranked on the index (joined with the filter columns only when filtering);
+        # stored fields are read for the best `limit` rows alone
+        filtered = " JOIN reviews c ON c.id = reviews_fts.rowid" if len(terms) > 1 else ""
+        sql = (f"WITH hits AS MATERIALIZED (SELECT reviews_fts.rowid AS id, "
+               f"bm25(reviews_fts, {TEXT_WEIGHT}, {TRANSLATED_WEIGHT}) AS cost FROM reviews_fts{filtered} "
+               f"WHERE {' AND '.join(terms)} ORDER BY cost")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        sql += (f") SELECT r.key, -hits.cost AS score{''.join(', r.' + f for f in fields)} "
+                f"FROM hits JOIN reviews r ON r.id = hits.id ORDER BY hits.cost")
+        return pd.DataFrame(self.conn.execute(sql, params).fetchall(), columns=["key", "score"] + fields)
+
+    def search(self, query, sources=None, since=None, until=None, min_rating=None, max_rating=None,
+               limit=SEARCH_LIMIT, raw=False):
+        """Matching reviews, best BM25 score first (higher is better), with their stored fields.
+
+        query is plain words that must all occur (in text or translated_text); raw=True passes
+        FTS5 syntax through (phrases, OR, NOT, NEAR). since/until are inclusive dates.
+        """
+        hits = self._select(FIELDS, query, sources, since, until, min_rating, max_rating, limit, raw)
+        hits["review_date"] = pd.to_datetime(hits["review_date"])
+        return hits
+
+    def keys(self, query, sources=None, since=None, until=None, min_rating=None, max_rating=None, raw=False):
+        """Dedup keys and scores of every match, best first."""
+        return self._select([], query, sources, since, until, min_rating, max_rating, None, raw)
+
+    def slice(self, df, query, **filters):
+        """Rows of df (reviews with text, name and review_date) matching query, best first, with a score column."""
+        hits = self.keys(query, **filters)
+        scores = pd.Series(hits["score"].to_numpy(), index=hits["key"].to_numpy())
+        keys = pd.Series(review_keys(df), index=df.index)
+        keys = keys[keys.isin(scores.index)]
+        subset = df.loc[keys.index].assign(score=scores.loc[keys.to_numpy()].to_numpy())
+        return subset.sort_values("score", ascending=False, kind="stable")
+
+    def optimize(self):
+        """Merge the index segments left by many incremental runs into one."""
+        with self.conn:
+            self.conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('optimize')")
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def remove(path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("query", nargs="*")
+    ap.add_argument("--raw", action="store_true", help="Pass the query through as FTS5 syntax")
+    ap.add_argument("--source", action="append", help="Repeat for several sources")
+    ap.add_argument("--since")
+    ap.add_argument("--until")
+    ap.add_argument("--min-rating", type=float)
+    ap.add_argument("--max-rating", type=float)
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--rebuild", action="store_true", help=f"Recreate {SEARCH_FILE} from the review store")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        from reviewStore import read_reviews
+
+        ReviewSearch.remove(SEARCH_FILE)
+        search = ReviewSearch()
+        search.add(read_reviews(columns=["text", "name", "review_date", "review_rating", "traveler_type", "source"]))
+        search.optimize()
+        print(f"Indexed {len(search)} reviews in {SEARCH_FILE}")
+    else:
+        search = ReviewSearch()
+    if args.query:
+        hits = search.search(" ".join(args.query), args.source, args.since, args.until, args.min_rating,
+                             args.max_rating, args.limit, args.raw)
+        for hit in hits.itertuples():
+            print(f"{hit.score:6.2f}  {hit.source:11s} {hit.review_date:%Y-%m-%d}  {hit.review_rating:4.1f}  "
+                  f"{(hit.translated_text or hit.text)[:100]}")
+    search.close()
@@ -0,0 +1,299 @@
+# Local HTTP query service over the cleaned review store, for dashboards and ad-hoc questions
+#
+# The store is loaded once into column arrays sorted by review date. Every request filters
+# those arrays (date range by binary search, the other filters by masks) instead of
+# rereading files. Encoded results go into an LRU cache keyed by the dataset version, a
+# digest of the store's file listing. The version is rechecked at most every POLL_SECONDS;
+# after a new cleaner run the data is reloaded and the cache is cleared.
+#
+#   GET /version                         -> dataset version, review count and cache counters
+#   GET /aggregate?by=source,year&...    -> reviews, rating count, mean, std and 95% t interval per group
+#   GET /reviews?page=N&per_page=K&...   -> one page of the matching reviews, newest first
+#
+# Filters (both query endpoints): source=Booking,Expedia  traveler_type=Couple,Solo
+#   since=YYYY-MM-DD  until=YYYY-MM-DD (inclusive)  min_rating=8  max_rating=10
+# Usage:
+#   python reviewService.py [--port 8750] [--store cleaned_reviews] [--cache-size 1024]
+#   (benchmarkService.py load-tests it at concurrency 50)
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from reviewCube import STAY_BUCKETS, rating_bin, stay_bucket
+from reviewStore import STORE_DIR, read_reviews
+from trendStats import mean_ci
+
+PORT = 8750
+CACHE_SIZE = 1024        # encoded results kept
+POLL_SECONDS = 2.0       # how often requests may recheck the store's version
+PER_PAGE = 20
+MAX_PER_PAGE = 200
+
+LOAD_COLUMNS = ["review_date", "source", "review_rating", "traveler_type", "length_of_stay", "name", "text"]
+GROUP_COLUMNS = ["source", "year", "month", "traveler_type", "stay_bucket", "rating_bin"]
+FILTERS = ["source", "traveler_type", "since", "until", "min_rating", "max_rating"]
+PARAMETERS = {"aggregate": FILTERS + ["by"], "reviews": FILTERS + ["page", "per_page"]}
+
+
+def store_version(path=STORE_DIR):
+    """Digest of the store's file names, sizes and mtimes; every write_reviews() changes it."""
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            entry = os.path.relpath(os.path.join(root, name), path)
+            digest.update(f"{entry}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Thread-safe LRU of encoded results."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ReviewData:
+    """One version of the store as column arrays sorted by review date.
+
+    Group and filter columns are kept as integer codes into sorted labels, so filters are
+    lookups of the codes in small boolean tables and aggregates are np.bincount over the
+    combined group code.
+    """
+
+    def __init__(self, df, version):
+        df = df.sort_values("review_date", kind="stable", ignore_index=True)
+        self.version = version
+        self.reviews = df
+        # Day resolution spans any date a query may name; nanoseconds overflow outside 1677-2262
+        self.days = df["review_date"].to_numpy("datetime64[ns]").astype("datetime64[D]")
+        self.rating = df["review_rating"].to_numpy("float64", na_value=np.nan)
+        dates = pd.DatetimeIndex(df["review_date"])
+        self.codes, self.labels = {}, {}
+        for col, values in [("source", df["source"].astype(object)),
+                            ("year", pd.Series(dates.year)),
+                            ("month", pd.Series(dates.month)),
+                            ("traveler_type", df["traveler_type"].astype(object).fillna("Unknown")),
+                            ("rating_bin", pd.Series(rating_bin(self.rating)))]:
+            codes, labels = pd.factorize(values, sort=True, use_na_sentinel=False)
+            self.codes[col], self.labels[col] = codes, list(labels)
+        self.codes["stay_bucket"], self.labels["stay_bucket"] = stay_bucket(df["length_of_stay"]).codes, STAY_BUCKETS
+
+    def select(self, query):
+        """Row positions matching the query's filters, in date order."""
+        lo, hi = 0, len(self.days)
+        if "since" in query:
+            lo = np.searchsorted(self.days, np.datetime64(query["since"], "D"), side="left")
+        if "until" in query:
+            hi = np.searchsorted(self.days, np.datetime64(query["until"], "D"), side="right")
+        mask = np.ones(max(hi - lo, 0), dtype=bool)
+        for col in ["source", "traveler_type"]:
+            if col in query:
+                wanted = np.array([label in query[col] for label in self.labels[col]])
+                mask &= wanted[self.codes[col][lo:hi]]
+        if "min_rating" in query:
+            mask &= self.rating[lo:hi] >= query["min_rating"]
+        if "max_rating" in query:
+            mask &= self.rating[lo:hi] <= query["max_rating"]
+        return lo + np.flatnonzero(mask)
+
+    def aggregate(self, query):
+        rows = self.select(query)
+        by = list(query.get("by", ()))
+        shape = [len(self.labels[col]) for col in by]
+        cell = np.ravel_multi_index([self.codes[col][rows] for col in by], shape) if by else np.zeros(len(rows), int)
+        size = int(np.prod(shape))
+        rating = self.rating[rows]
+        rated = ~np.isnan(rating)
+        reviews = np.bincount(cell, minlength=size)
+        count = np.bincount(cell, weights=rated, minlength=size)
+        total = np.bincount(cell, weights=np.where(rated, rating, 0), minlength=size)
+        total_sq = np.bincount(cell, weights=np.where(rated, rating, 0) ** 2, minlength=size)
+
+        cells = np.flatnonzero(reviews)
+        mean, std, low, high = mean_ci(count[cells], total[cells], total_sq[cells])
+        keys = np.unravel_index(cells, shape) if by else []
+        groups = []
+        for i, c in enumerate(cells):
+            group = {col: _plain(self.labels[col][key[i]]) for col, key in zip(by, keys)}
+            group.update(reviews=int(reviews[c]), rating_count=int(count[c]), mean=_plain(mean[i]),
+                         std=_plain(std[i]), ci_low=_plain(low[i]), ci_high=_plain(high[i]))
+            groups.append(group)
+        return {"version": self.version, "matched": len(rows), "by": by, "groups": groups}
+
+    def page(self, query):
+        rows = self.select(query)[::-1]
+        page, per_page = query["page"], query["per_page"]
+        part = self.reviews.iloc[rows[(page - 1) * per_page:page * per_page]].copy()
+        part["review_date"] = part["review_date"].dt.strftime("%Y-%m-%d")
+        records = part.astype(object).where(part.notna(), None).to_dict("records")
+        return {"version": self.version, "matched": len(rows), "page": page, "per_page": per_page,
+                "pages": -(-len(rows) // per_page), "reviews": records}
+
+
+def parse_query(endpoint, params):
+    """Normalized query dict from parse_qs() parameters; ValueError names anything unknown or malformed."""
+    unknown = sorted(set(params) - set(PARAMETERS[endpoint]))
+    if unknown:
+        raise ValueError(f"unknown parameter: {', '.join(unknown)}")
+    query = {"page": 1, "per_page": PER_PAGE} if endpoint == "reviews" else {}
+    for name, values in params.items():
+        value = values[-1].strip()
+        if not value:
+            raise ValueError(f"{name}: empty value")
+        if name in ("source", "traveler_type"):
+            query[name] = tuple(sorted({v.strip() for v in value.split(",") if v.strip()}))
+        elif name in ("since", "until"):
+            day = pd.Timestamp(value)
+            if pd.isna(day):
+                raise ValueError(f"{name}: expected a date YYYY-MM-DD")
+            query[name] = day.strftime("%Y-%m-%d")
+        elif name in ("min_rating", "max_rating"):
+            query[name] = float(value)
+        elif name == "by":
+            query[name] = tuple(col for col in value.split(",") if col)
+            bad = [col for col in query[name] if col not in GROUP_COLUMNS]
+            if bad or len(set(query[name])) < len(query[name]):
+                raise ValueError(f"by: expected distinct columns of {', '.join(GROUP_COLUMNS)}")
+        else:
+            query[name] = int(value)
+            if query[name] < 1 or (name == "per_page" and query[name] > MAX_PER_PAGE):
+                raise ValueError(f"{name}: out of range")
+    return query
+
+
+def _plain(value):
+    """JSON-ready scalar: numpy values as Python ones, NaN (e.g. the interval of a single rating) as None."""
+    value = value.item() if hasattr(value, "item") else value
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+
+def _encode(result):
+    return json.dumps(result, default=_plain, allow_nan=False).encode("utf-8")
+
+
+class ReviewService:
+    """Loaded store plus result cache; query() is safe to call from many threads."""
+
+    def __init__(self, store=STORE_DIR, cache_size=CACHE_SIZE, poll=POLL_SECONDS):
+        self.store, self.poll = store, poll
+        self.cache = ResultCache(cache_size)
+        self.lock, self.compute = threading.Lock(), threading.Lock()
+        self.data, self.checked = None, 0.0
+        self.current()
+
+    def current(self):
+        """The loaded data, reloaded first if the store's version changed since the last check."""
+        with self.lock:
+            now = time.monotonic()
+            if self.data is None or now - self.checked >= self.poll:
+                self.checked = now
+                # Read after taking the version: a write during the load shows up as a new version next time
+                version = store_version(self.store)
+                if self.data is None or version != self.data.version:
+                    self.data = ReviewData(read_reviews(self.store, columns=LOAD_COLUMNS), version)
+                    self.cache.clear()
+            return self.data
+
+    def query(self, endpoint, params):
+        """Encoded JSON answer for /version, /aggregate or /reviews."""
+        data = self.current()
+        if endpoint == "version":
+            return _encode({"version": data.version, "reviews": len(data.days),
+                            "cache_hits": self.cache.hits, "cache_misses": self.cache.misses})
+        query = parse_query(endpoint, params)
+        key = (data.version, endpoint, tuple(sorted(query.items())))
+        body = self.cache.get(key)
+        if body is None:
+            # Misses are computed one at a time: interleaved on the GIL they would all finish late
+            with self.compute:
+                body = _encode(data.aggregate(query) if endpoint == "aggregate" else data.page(query))
+                self.cache.put(key, body)
+        return body
+
+
+class ReviewServer(ThreadingHTTPServer):
+    request_queue_size = 128   # socketserver's default of 5 resets connections when many clients open at once
+
+
+def start_service(service, port=PORT):
+    """Serve service on localhost (port 0 picks a free one) from a daemon thread. Returns (server, base_url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle each kept-alive response waits for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            endpoint = parsed.path.strip("/")
+            if endpoint not in ("version", "aggregate", "reviews"):
+                self.send_error(404)
+                return
+            try:
+                body = service.query(endpoint, parse_qs(parsed.query, keep_blank_values=True))
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ReviewServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=PORT, help="0 picks a free port")
+    ap.add_argument("--store", default=STORE_DIR)
+    ap.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = ap.parse_args()
+
+    service = ReviewService(args.store, args.cache_size)
+    server, url = start_service(service, args.port)
+    print(f"Serving {len(service.data.days)} reviews (version {service.data.version}) on {url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
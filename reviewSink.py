@@ -0,0 +1,126 @@
+# Streaming, crash-safe review sink: one Arrow IPC record batch per scraped page
+#
+# The IPC stream format is used instead of Parquet because a killed Parquet writer leaves no
+# footer, while a stream can always be read back up to its last complete batch.
+# Messages are written one by one (the same bytes pa.ipc.new_stream would write), so resuming
+# cuts the file back to the end of its last kept batch instead of rewriting the kept rows.
+# Hotel-level fields (total_rating, total_reviews) go in a small "<path>.meta.json" record.
+
+import json
+import os
+
+import pyarrow as pa
+
+COLUMNS = {
+    "booking": ["review_text", "review_rating", "traveler_name", "review_date", "length_of_stay", "traveler_type"],
+    "expedia": ["review_text", "review_rating", "traveler_name", "review_date", "length_of_stay", "traveler_type"],
+    "tripadvisor": ["review_text", "review_rating", "traveler_name", "review_title", "review_date", "date_visited",
+                    "traveler_type"],
+}
+
+COLUMN_TYPES = {
+    "review_rating": pa.float64(),
+    "length_of_stay": pa.int64(),
+}
+
+
+def sink_schema(platform):
+    return pa.schema([(name, COLUMN_TYPES.get(name, pa.string())) for name in COLUMNS[platform]])
+
+
+def read_sink(path, platform):
+    """Read every complete batch, ignoring a torn batch at the end of a killed write."""
+    schema = sink_schema(platform)
+    batches = []
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "rb") as f:
+            try:
+                reader = pa.ipc.open_stream(f)
+                while True:
+                    batches.append(reader.read_next_batch())
+            except (StopIteration, pa.ArrowInvalid, OSError):
+                pass
+    return pa.Table.from_batches(batches, schema=schema).to_pandas()
+
+
+def read_metadata(path):
+    meta_path = path + ".meta.json"
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def batch_ends(path, schema):
+    """(rows so far, byte offset) at the end of every complete batch of the stream at path."""
+    ends, rows = [], 0
+    with open(path, "rb") as f:
+        reader = pa.ipc.MessageReader.open_stream(f)
+        offset = 0
+        try:
+            while True:
+                message = reader.read_next_message()
+                offset += message.serialize().size
+                if message.type == "record batch":
+                    rows += pa.ipc.read_record_batch(message, schema).num_rows
+                    ends.append((rows, offset))
+        except (StopIteration, pa.ArrowInvalid, OSError):
+            pass
+    return ends
+
+
+EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+class ReviewSink:
+    """Append-only writer. keep_rows re-opens an existing sink keeping only its first keep_rows rows."""
+
+    def __init__(self, path, platform, keep_rows=0):
+        self.path = path
+        self.platform = platform
+        self.schema = sink_schema(platform)
+        self.rows = 0
+        if keep_rows and os.path.exists(path) and os.path.getsize(path) > 0:
+            ends = [(rows, offset) for rows, offset in batch_ends(path, self.schema) if rows <= keep_rows]
+            self.rows, cut = ends[-1] if ends else (0, len(self.schema.serialize()))
+            partial = read_sink(path, platform).iloc[self.rows:keep_rows] if self.rows < keep_rows else None
+            # Truncating only drops bytes after the kept batches: a crash here still leaves a readable prefix
+            self.file = open(path, "r+b")
+            self.file.truncate(cut)
+            self.file.seek(cut)
+            if partial is not None and len(partial):
+                self._write(pa.Table.from_pandas(partial, schema=self.schema, preserve_index=False).to_batches())
+        else:
+            self.file = open(path, "wb")
+            self.file.write(self.schema.serialize())
+
+    def _write(self, batches):
+        for batch in batches:
+            self.file.write(batch.serialize())
+            self.rows += batch.num_rows
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def write_page(self, rows):
+        if not rows:
+            return
+        columns = {name: [row.get(name) for row in rows] for name in self.schema.names}
+        self._write([pa.RecordBatch.from_pydict(columns, schema=self.schema)])
+
+    def set_metadata(self, **meta):
+        meta_path = self.path + ".meta.json"
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def close(self):
+        self.file.write(EOS)
+        self.file.close()
+
+    def export_csv(self, csv_path):
+        """Write the legacy CSV layout (hotel totals repeated per row) for dataCleaner.py."""
+        df = read_sink(self.path, self.platform)
+        for key, value in read_metadata(self.path).items():
+            df[key] = value
+        df.to_csv(csv_path, index=False)
+        return len(df)
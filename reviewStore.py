@@ -0,0 +1,52 @@
+# Cleaned review store: Parquet dataset partitioned by source and year (hive layout,
+# e.g. cleaned_reviews/source=Booking/year=2023/part-0.parquet).
+#
+# Readers name the columns they need and an optional start date; pyarrow only opens the
+# matching partitions and only decodes the requested columns.
+
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from reviewSchema import apply_schema, validate
+
+STORE_DIR = "cleaned_reviews"
+PARTITION_COLUMNS = ["source", "year"]
+
+PARTITIONING = ds.partitioning(pa.schema([("source", pa.string()), ("year", pa.int32())]), flavor="hive")
+
+
+def write_reviews(df, path=STORE_DIR, append=False):
+    """Write df (already in the review schema) to the store. append=True adds new files next to the existing ones."""
+    validate(df, required=["source", "review_date"])
+    if not append and os.path.exists(path):
+        shutil.rmtree(path)
+    if df.empty:
+        return
+    df = df.assign(year=df["review_date"].dt.year.astype("int32"), source=df["source"].astype(str))
+    ds.write_dataset(pa.Table.from_pandas(df, preserve_index=False), path, format="parquet",
+                     partitioning=PARTITIONING, existing_data_behavior="overwrite_or_ignore",
+                     basename_template=f"part-{time.time_ns()}-{{i}}.parquet")
+
+
+def review_filter(since=None, sources=None):
+    """Dataset filter; the year and source terms prune partitions before any file is read."""
+    expr = None
+    if since is not None:
+        since = pd.Timestamp(since)
+        expr = (ds.field("year") >= since.year) & (ds.field("review_date") >= pa.scalar(since.to_pydatetime()))
+    if sources is not None:
+        term = ds.field("source").isin(list(sources))
+        expr = term if expr is None else expr & term
+    return expr
+
+
+def read_reviews(path=STORE_DIR, columns=None, since=None, sources=None):
+    """Load only `columns` (all when None) from the partitions that can match since/sources."""
+    dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=review_filter(since, sources))
+    return validate(apply_schema(table.to_pandas()))
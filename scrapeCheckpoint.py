@@ -0,0 +1,32 @@
+# Durable scrape checkpoints: a small JSON state file written atomically after each page
+#
+# The parsed rows themselves live in the run's ReviewSink; the state records how many were
+# committed, so rows appended after the last checkpoint are dropped on resume.
+
+import json
+import os
+
+
+def _fsync_write(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(state_path):
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(state_path, state):
+    _fsync_write(state_path, json.dumps(state))
+
+
+def clear_checkpoint(state_path):
+    if os.path.exists(state_path):
+        os.remove(state_path)
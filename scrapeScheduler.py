@@ -0,0 +1,202 @@
+# Parallel multi-hotel scrape scheduler with per-domain request budgets
+#
+# Usage:
+#   python scrapeScheduler.py jobs.csv --workers 3     # jobs.csv columns: platform,url[,output]
+#   python scrapeScheduler.py --selftest               # run against local fixture servers
+
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+from urllib.parse import urljoin, urlparse
+
+import lxml.html
+import pandas as pd
+
+from rateBudget import BUDGET_ENV, DomainBudget
+from reviewExtractor import extract_page
+
+Job = namedtuple("Job", ["platform", "url", "output"])
+
+SCRAPERS = {
+    "booking": "bookingScraper.py",
+    "expedia": "expediaScraper.py",
+    "tripadvisor": "tripAdvisorScraper.py",
+}
+
+
+def default_output(platform, url):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", urlparse(url).path).strip("_")[-60:] or "hotel"
+    return f"{platform}_reviews_{slug}.csv"
+
+
+def load_jobs(path):
+    df = pd.read_csv(path)
+    if "output" not in df.columns:
+        df["output"] = None
+    return [
+        Job(row.platform, row.url, row.output if isinstance(row.output, str) else default_output(row.platform, row.url))
+        for row in df.itertuples()
+    ]
+
+
+# --- Runners: do one job, return the number of rows written ---
+def browser_runner(job, worker_id, budget):
+    """Run the platform's Selenium scraper in its own process with a per-worker Chrome profile.
+
+    The budget is served to the scraper, which charges each page load and navigation click
+    (scrapeWaits.Politeness.request) to the job's domain.
+    """
+    env = dict(os.environ, SELENIUM_PROFILE=f"/tmp/selenium_profile_w{worker_id}",
+               **{BUDGET_ENV: f"{budget.serve()}:{urlparse(job.url).netloc}"})
+    subprocess.run([sys.executable, SCRAPERS[job.platform], job.url, job.output], env=env, check=True)
+    return len(pd.read_csv(job.output))
+
+
+def http_runner(job, worker_id, budget):
+    """Fetch server-rendered pages and follow rel=next links (used against the local fixture server).
+
+    The budget is charged once per page fetched.
+    """
+    domain = urlparse(job.url).netloc
+    url, review_list, header = job.url, [], None
+    while url:
+        budget.acquire(domain)
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            html = resp.read().decode("utf-8")
+        page_header, reviews = extract_page(html, job.platform)
+        header = header or page_header
+        review_list.extend(reviews)
+        next_link = lxml.html.fromstring(html).cssselect("a[rel='next']")
+        url = urljoin(url, next_link[0].get("href")) if next_link else None
+
+    df = pd.DataFrame(review_list)
+    df['total_rating'] = header["total_rating"]
+    df['total_reviews'] = header["total_reviews"]
+    df.to_csv(job.output, index=False)
+    return len(df)
+
+
+# --- Scheduler ---
+def run_jobs(jobs, runner=browser_runner, workers=3, budget=None, retries=3, backoff=5.0):
+    budget = budget or DomainBudget()
+    pending = [(0.0, 0, job) for job in jobs]  # (not_before, attempt, job)
+    results = []
+    cond = threading.Condition()
+    active = [0]
+    start = time.monotonic()
+
+    def next_job():
+        with cond:
+            while True:
+                now = time.monotonic()
+                for i, (not_before, attempt, job) in enumerate(pending):
+                    domain = urlparse(job.url).netloc
+                    if not_before <= now and budget.has_slot(domain):
+                        pending.pop(i)
+                        budget.running[domain] += 1
+                        active[0] += 1
+                        return attempt, job
+                if not pending and active[0] == 0:
+                    return None
+                waits = [nb - now for nb, _, _ in pending if nb > now]
+                cond.wait(timeout=min(waits) if waits else 1.0)
+
+    def worker(worker_id):
+        while True:
+            item = next_job()
+            if item is None:
+                return
+            attempt, job = item
+            domain = urlparse(job.url).netloc
+            t0 = time.monotonic()
+            try:
+                rows = runner(job, worker_id, budget)
+                outcome = dict(job=job, ok=True, rows=rows, attempts=attempt + 1, error=None)
+            except Exception as e:
+                outcome = dict(job=job, ok=False, rows=0, attempts=attempt + 1, error=repr(e))
+            outcome["seconds"] = time.monotonic() - t0
+            with cond:
+                budget.running[domain] -= 1
+                active[0] -= 1
+                if not outcome["ok"] and attempt + 1 < retries:
+                    delay = backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                    print(f"[worker {worker_id}] {job.platform} {job.url} failed ({outcome['error']}), retry in {delay:.1f}s")
+                    pending.append((time.monotonic() + delay, attempt + 1, job))
+                else:
+                    results.append(outcome)
+                    status = f"{outcome['rows']} rows" if outcome["ok"] else f"FAILED: {outcome['error']}"
+                    print(f"[worker {worker_id}] {job.platform} {job.url} -> {status} in {outcome['seconds']:.1f}s")
+                cond.notify_all()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    elapsed = time.monotonic() - start
+    return {
+        "jobs": len(jobs),
+        "succeeded": sum(r["ok"] for r in results),
+        "failed": sum(not r["ok"] for r in results),
+        "rows": sum(r["rows"] for r in results),
+        "elapsed": elapsed,
+        "jobs_per_min": len(results) / elapsed * 60 if elapsed else 0.0,
+        "rows_per_sec": sum(r["rows"] for r in results) / elapsed if elapsed else 0.0,
+        "requests_per_domain": dict(budget.requests),
+        "results": results,
+    }
+
+
+def print_report(report):
+    print("\n--- Throughput report ---")
+    print(f"Jobs: {report['jobs']}  succeeded: {report['succeeded']}  failed: {report['failed']}")
+    print(f"Rows: {report['rows']}  elapsed: {report['elapsed']:.1f}s")
+    print(f"Throughput: {report['jobs_per_min']:.2f} jobs/min, {report['rows_per_sec']:.1f} rows/s")
+    for domain, n in report["requests_per_domain"].items():
+        print(f"  {domain}: {n} requests")
+
+
+def selftest(workers, out_dir="scheduler_selftest"):
+    from fixtureServer import start_fixture_server
+
+    os.makedirs(out_dir, exist_ok=True)
+    servers, jobs = [], []
+    for platform in SCRAPERS:
+        server, base = start_fixture_server(platform, pages=4, per_page=10, fail_rate=0.2, seed=len(servers) + 1)
+        servers.append(server)
+        for hotel in range(3):
+            jobs.append(Job(platform, f"{base}/hotel/h{hotel}", os.path.join(out_dir, f"{platform}_h{hotel}.csv")))
+
+    budget = DomainBudget(rate=20, per=1.0, max_concurrent=2)
+    report = run_jobs(jobs, runner=http_runner, workers=workers, budget=budget, retries=5, backoff=0.2)
+    for server in servers:
+        server.shutdown()
+    print_report(report)
+    assert report["failed"] == 0 and report["rows"] == len(jobs) * 40, "self-test failed"
+    return report
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("jobs", nargs="?", help="CSV with platform,url[,output] columns")
+    ap.add_argument("--workers", type=int, default=3, help="Number of concurrent browser workers")
+    ap.add_argument("--rate", type=int, default=30, help="Page loads and clicks allowed per domain per --per seconds")
+    ap.add_argument("--per", type=float, default=60.0)
+    ap.add_argument("--retries", type=int, default=3)
+    ap.add_argument("--selftest", action="store_true", help="Run against local fixture servers")
+    args = ap.parse_args()
+
+    if args.selftest:
+        selftest(args.workers)
+    else:
+        report = run_jobs(load_jobs(args.jobs), workers=args.workers,
+                          budget=DomainBudget(args.rate, args.per), retries=args.retries)
+        print_report(report)
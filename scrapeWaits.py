@@ -0,0 +1,152 @@
+# Event-driven waits for the scrapers, a separate politeness jitter budget, the per-domain request
+# budget of scrapeScheduler.py, and a time-accounting ledger
+
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from rateBudget import served_budget
+
+
+# --- Time accounting ---
+class TimeLedger:
+    """Wall-clock split of a scrape run into sleeping, page waits, parsing and I/O."""
+
+    CATEGORIES = ("sleeping", "page", "parsing", "io")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.totals = defaultdict(float)
+
+    @contextmanager
+    def track(self, category):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[category] += time.perf_counter() - t0
+
+    def sleep(self, seconds):
+        with self.track("sleeping"):
+            time.sleep(seconds)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.start
+        print("\n--- Time report ---")
+        for category in self.CATEGORIES:
+            t = self.totals[category]
+            print(f"{category:10s} {t:8.1f}s  {t / elapsed * 100 if elapsed else 0:5.1f}%")
+        other = max(elapsed - sum(self.totals.values()), 0.0)
+        print(f"{'other':10s} {other:8.1f}s  {other / elapsed * 100 if elapsed else 0:5.1f}%")
+        print(f"{'total':10s} {elapsed:8.1f}s")
+
+
+LEDGER = TimeLedger()
+
+
+# --- Politeness jitter and request budget ---
+class Politeness:
+    """Random pauses between actions, capped by an optional total budget in seconds.
+
+    request() charges a page load or navigation click to the per-domain request budget of the
+    scrapeScheduler.py run that started this scraper; run on its own, it does nothing.
+    """
+
+    def __init__(self, low=0.5, high=1.5, budget=None, ledger=LEDGER):
+        self.low = low
+        self.high = high
+        self.budget = budget
+        self.spent = 0.0
+        self.ledger = ledger
+        self.requests, self.domain = served_budget()
+
+    def request(self):
+        if self.requests is not None:
+            with self.ledger.track("sleeping"):
+                self.requests.acquire(self.domain)
+
+    def pause(self):
+        if self.high <= 0:
+            return
+        seconds = random.uniform(self.low, self.high)
+        if self.budget is not None:
+            seconds = min(seconds, self.budget - self.spent)
+            if seconds <= 0:
+                return
+        self.spent += seconds
+        self.ledger.sleep(seconds)
+
+
+# --- Readiness signals ---
+CARDS_SIGNATURE_JS = """
+const cards = document.querySelectorAll(arguments[0]);
+return [cards.length, cards.length ? cards[0].textContent.trim().slice(0, 200) : ""];
+"""
+
+MUTATION_QUIET_JS = """
+if (!window.__reviewMutations) {
+    window.__reviewMutations = {count: 0, last: performance.now()};
+    new MutationObserver(records => {
+        window.__reviewMutations.count += records.length;
+        window.__reviewMutations.last = performance.now();
+    }).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return performance.now() - window.__reviewMutations.last;
+"""
+
+RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length;"
+
+
+def cards_signature(driver, card_selector):
+    return tuple(driver.execute_script(CARDS_SIGNATURE_JS, card_selector))
+
+
+def wait_for_cards_change(driver, card_selector, before, timeout=15, ledger=LEDGER):
+    """Wait until the set of review cards differs from the `before` signature (new or replaced cards)."""
+    def changed(d):
+        signature = cards_signature(d, card_selector)
+        return signature[0] > 0 and signature != before
+
+    with ledger.track("page"):
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(changed)
+
+
+def wait_for_cards(driver, card_selector, timeout=15, ledger=LEDGER):
+    with ledger.track("page"):
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: cards_signature(d, card_selector)[0] > 0
+        )
+
+
+def wait_for_dom_settle(driver, quiet_ms=400, timeout=10, ledger=LEDGER):
+    """Wait until no DOM mutation has been observed for quiet_ms. Gives up quietly after timeout."""
+    driver.execute_script(MUTATION_QUIET_JS)
+    with ledger.track("page"):
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                lambda d: d.execute_script(MUTATION_QUIET_JS) >= quiet_ms
+            )
+        except Exception:
+            pass
+
+
+def wait_for_network_idle(driver, idle_ms=500, timeout=15, ledger=LEDGER):
+    """Wait until no new resource finished loading for idle_ms. Gives up quietly after timeout."""
+    state = {"count": -1, "since": time.monotonic()}
+
+    def idle(d):
+        count = d.execute_script(RESOURCE_COUNT_JS)
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return (now - state["since"]) * 1000 >= idle_ms
+
+    with ledger.track("page"):
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1).until(idle)
+        except Exception:
+            pass
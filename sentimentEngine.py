@@ -0,0 +1,178 @@
+# Batch lexicon sentiment: TextBlob's pattern polarity for a whole corpus at once
+#
+# The corpus is tokenized once into flat token arrays and a sparse document-term matrix over
+# the TextBlob lexicon. Plain lexicon hits are scored with one sparse mat-vec; TextBlob's
+# context rules (intensifier chains such as "really very good", negation such as "not good",
+# "!" boosts, emoticons) are resolved with shifted numpy arrays and added as a correction.
+# benchmarkSentiment.py checks the result against TextBlob and measures the speedup.
+
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from textblob._text import EMOTICONS
+from textblob.en import sentiment as _pattern
+
+TOLERANCE = 0.05   # documented max |polarity - TextBlob| on benchmarkSentiment's fixture corpus
+BOOST = 1.25       # "!" after a sentiment word
+NEGATED = -0.5     # "not good" = slightly bad
+
+_EMOTICONS = {e.lower(): p for (_, p), faces in EMOTICONS.items() for e in faces}
+_EMOTICON_RE = "|".join(re.escape(e) for e in sorted(_EMOTICONS, key=len, reverse=True))
+
+# Approximates pattern's find_tokens: apostrophes and edge punctuation are separate tokens,
+# word-internal "-", "/" and "." are kept, standalone emoticons and "(!)" are single tokens
+TOKEN = re.compile(rf"[^\W_]+(?:[-/.][^\W_]+)*\.?|(?:(?<=\s)|^)(?:{_EMOTICON_RE})(?=\s|$)|\(\s?!\s?\)|\.\.\.|[^\w\s]")
+DOC_BREAK = "\x01"
+
+
+class Lexicon:
+    """TextBlob's sentiment lexicon as arrays: polarity, intensity and whether a word can modify the next."""
+
+    def __init__(self):
+        _pattern.load()
+        words = sorted(dict.keys(_pattern))
+        scores = [dict.__getitem__(_pattern, w) for w in words]
+        self.index = pd.Index(words)
+        self.polarity = np.array([s[None][0] for s in scores], dtype=float)
+        self.intensity = np.array([s[None][2] for s in scores], dtype=float)
+        self.modifier = np.array([any(m in s for m in _pattern.modifiers) for s in scores])
+        self.negations = frozenset(_pattern.negations)
+
+
+_lexicon = None
+
+
+def lexicon():
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = Lexicon()
+    return _lexicon
+
+
+def tokenize(texts):
+    """Tokenize the corpus in one regex pass. Returns (codes, vocabulary, doc index per token, n_docs)."""
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str).str.replace(DOC_BREAK, " ", regex=False)
+    corpus = f" {DOC_BREAK} ".join(texts).lower()
+    tokens = np.array(TOKEN.findall(corpus), dtype=object)
+    breaks = tokens == DOC_BREAK
+    doc = np.cumsum(breaks)[~breaks]
+    codes, vocabulary = pd.factorize(tokens[~breaks])
+    # find_tokens keeps a trailing period only on abbreviations ("e.g.", "u.s."); drop it elsewhere
+    vocabulary = pd.Series(vocabulary, dtype=object)
+    vocabulary = vocabulary.where(~vocabulary.str.match(r"^[^\W_]{2,}\.$"), vocabulary.str[:-1])
+    return codes, vocabulary, doc, len(texts)
+
+
+def document_term_matrix(term, doc, n_docs, n_terms):
+    """Sparse (n_docs, n_terms) counts of the lexicon terms at the given token positions."""
+    return sparse.csr_matrix((np.ones(len(term)), (doc, term)), shape=(n_docs, n_terms))
+
+
+def _between(cum, lo, hi):
+    """Count of flagged tokens strictly between positions lo and hi (cum is the inclusive cumsum).
+
+    Only meaningful where lo >= 0; callers mask the rest.
+    """
+    return cum[hi - 1] - cum[np.maximum(lo, 0)]
+
+
+def _last_before(flag, doc_start):
+    """Position of the last flagged token before each position in the same document, else -1."""
+    idx = np.arange(len(flag))
+    last = np.maximum.accumulate(np.where(flag, idx, -1))
+    before = np.concatenate([[-1], last[:-1]])
+    return np.where(before >= doc_start, before, -1)
+
+
+def polarity(texts):
+    """TextBlob pattern polarity for every text, as a float array."""
+    lex = lexicon()
+    codes, vocabulary, doc, n_docs = tokenize(texts)
+    n = len(codes)
+    result = np.zeros(n_docs)
+    if n == 0:
+        return result
+
+    # Per-token attributes are computed once per distinct token, then gathered by code
+    v_term = lex.index.get_indexer(vocabulary)
+    v_known = v_term >= 0
+    v_length = vocabulary.str.len().to_numpy()
+    v_emoticon = vocabulary.map(_EMOTICONS)
+    term = v_term[codes]
+    known = v_known[codes]
+    pol = np.where(v_known, lex.polarity[v_term], 0.0)[codes]
+    inten = np.where(v_known, lex.intensity[v_term], 1.0)[codes]
+    is_mod = (v_known & lex.modifier[v_term])[codes]
+    length = v_length[codes]
+    stripped = vocabulary.str.strip("'").str.len().to_numpy()[codes]
+    ly = vocabulary.str.endswith("ly").to_numpy()[codes]
+    neg_tok = (~v_known & vocabulary.isin(lex.negations).to_numpy())[codes]
+    emo = (~v_known & v_emoticon.notna().to_numpy() & (v_length <= 5))[codes]
+    irony = (~v_known & vocabulary.str.match(r"^\(\s?!\s?\)$").to_numpy())[codes]
+    emo_pol = np.where(emo, v_emoticon.fillna(0.0).to_numpy(dtype=float)[codes], 0.0)
+    bang = (vocabulary == "!").to_numpy()[codes]
+
+    idx = np.arange(n)
+    doc_start = np.searchsorted(doc, doc, side="left")
+    prev_known = _last_before(known, doc_start)
+    j_ly = np.where(prev_known >= 0, ly[np.maximum(prev_known, 0)], False)
+    j_mod = np.where(prev_known >= 0, is_mod[np.maximum(prev_known, 0)], False)
+
+    # Modifier state: a known modifier stays active across unknown words of <= 2 letters; a
+    # negation right after an "-ly" modifier ("really not good") is absorbed into its entry
+    m_reset = ~known & (length > 2) & ~(neg_tok & j_ly)
+    m_cum = np.cumsum(m_reset)
+    m_active = j_mod & (_between(m_cum, prev_known, idx) == 0)
+    absorbed = neg_tok & j_mod & j_ly & m_active
+
+    # Negation state: set by "no/not/never", kept across 1-letter tokens, cleared by known words
+    n_reset = ~known & ~neg_tok & (stripped > 1)
+    n_cum = np.cumsum(n_reset)
+    last_neg = _last_before(neg_tok, doc_start)
+    negated = (last_neg > prev_known) & ~absorbed[np.maximum(last_neg, 0)] & (_between(n_cum, last_neg, idx) == 0)
+    negated &= known
+
+    # Entries: every known word not merged into a modifier chain, every emoticon and "(!)"
+    merged = known & m_active
+    head = (known & ~merged) | emo | irony
+    member = known | emo | irony
+    entry = np.cumsum(head) - 1
+    members = np.flatnonzero(member)
+    heads = np.flatnonzero(head)
+    entry_doc = doc[heads]
+
+    # Chain value: last member's polarity times the previous member's carried intensity
+    m_entry = entry[members]
+    is_last = np.append(m_entry[1:] != m_entry[:-1], True)
+    last = members[is_last]
+    chained = np.concatenate([[False], m_entry[1:] == m_entry[:-1]])[is_last]
+    prev = np.concatenate([[0], members[:-1]])[is_last]
+    carried = np.where(negated, 1.0 / np.where(inten == 0, 1.0, inten), inten)
+    carried[emo | irony] = 1.0
+    base = np.where(emo | irony, emo_pol, pol)
+    value = np.where(chained, np.clip(base[last] * carried[prev], -1.0, 1.0), base[heads])
+
+    # "!" after an entry's last member boosts it (boosts before a later merge are overwritten)
+    bang_entry = entry[bang]
+    ok = (bang_entry >= 0) & (bang_entry < len(heads))
+    bang_entry = bang_entry[ok]
+    bang_pos = idx[bang][ok]
+    after = (entry_doc[bang_entry] == doc[bang_pos]) & (bang_pos > last[bang_entry])
+    boosts = np.bincount(bang_entry[after], minlength=len(heads))
+    value = np.clip(value * BOOST ** boosts, -1.0, 1.0)
+
+    entry_negated = np.zeros(len(heads), dtype=bool)
+    entry_negated[entry[negated]] = True
+    entry_negated[entry[prev_known[absorbed]]] = True
+    value = np.where(entry_negated, value * NEGATED, value)
+
+    # Plain entries are a sparse mat-vec against the lexicon; context-adjusted ones a correction
+    plain_heads = heads[known[heads]]
+    dtm = document_term_matrix(term[plain_heads], doc[plain_heads], n_docs, len(lex.index))
+    total = dtm @ lex.polarity
+    total += np.bincount(entry_doc, weights=value - np.where(known[heads], pol[heads], 0.0), minlength=n_docs)
+    counts = np.bincount(entry_doc, minlength=n_docs)
+    np.divide(total, counts, out=result, where=counts > 0)
+    return result
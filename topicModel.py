@@ -0,0 +1,132 @@
+# Online topic modeling for customerInsights.py
+#
+# LatentDirichletAllocation is trained with partial_fit one chunk at a time (E-steps spread over
+# all cores), on a vocabulary frozen at the first fit. The vectorizer, the model, hashes of the
+# reviews it has seen and a per-chunk history (fit seconds, held-out perplexity) are saved to
+# topic_model.joblib, so later runs only train on new reviews and just assign topics to the rest.
+# Usage:
+#   python topicModel.py                 # print the saved model's topics and history
+#   python topicModel.py --selftest      # fit and update a model on a planted-topic corpus
+
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+
+MODEL_FILE = "topic_model.joblib"
+N_TOPICS = 10
+MAX_FEATURES = 5000
+VOCAB_SAMPLE = 100_000   # texts the frozen vocabulary is learned from
+CHUNK = 20_000           # texts per partial_fit call
+
+
+def text_hashes(texts):
+    return pd.util.hash_pandas_object(pd.Series(texts, dtype=object), index=False).to_numpy()
+
+
+class TopicModel:
+    """Frozen vocabulary + online LDA, updated chunk by chunk."""
+
+    def __init__(self, n_topics=N_TOPICS, max_features=MAX_FEATURES, n_jobs=-1, seed=0):
+        self.vectorizer = CountVectorizer(stop_words="english", max_features=max_features, min_df=2, max_df=0.5)
+        self.lda = LatentDirichletAllocation(n_components=n_topics, learning_method="online", batch_size=1024,
+                                             n_jobs=n_jobs, random_state=seed)
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.history = []   # one row per partial_fit chunk
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        return joblib.load(path)
+
+    @classmethod
+    def load_or_new(cls, path=MODEL_FILE, **kwargs):
+        return cls.load(path) if os.path.exists(path) else cls(**kwargs)
+
+    def save(self, path=MODEL_FILE):
+        joblib.dump(self, path)
+
+    @property
+    def fitted(self):
+        return hasattr(self.vectorizer, "vocabulary_")
+
+    def unseen(self, texts):
+        """The texts this model has not been trained on yet."""
+        texts = pd.Series(texts)
+        return texts[~np.isin(text_hashes(texts), self.seen)]
+
+    def update(self, texts, chunk_size=CHUNK):
+        """Train on texts in chunks; returns this call's history rows."""
+        texts = pd.Series(texts, dtype=object)
+        if len(texts) == 0:
+            return []
+        if not self.fitted:
+            self.vectorizer.fit(texts.iloc[:VOCAB_SAMPLE])
+
+        rows = []
+        for lo in range(0, len(texts), chunk_size):
+            chunk = texts.iloc[lo:lo + chunk_size]
+            X = self.vectorizer.transform(chunk)
+            # Perplexity on the chunk before training on it: held-out, comparable across runs
+            perplexity = self.lda.perplexity(X) if hasattr(self.lda, "components_") else np.nan
+            start = time.perf_counter()
+            self.lda.partial_fit(X)
+            rows.append({"chunk": len(self.history), "documents": len(chunk), "fit_seconds": time.perf_counter() - start,
+                         "perplexity": perplexity, "trained_at": pd.Timestamp.now()})
+            self.history.append(rows[-1])
+            self.seen = np.union1d(self.seen, text_hashes(chunk))
+        return rows
+
+    def assign(self, texts, chunk_size=CHUNK):
+        """(dominant topic, its weight) per text, without training."""
+        texts = pd.Series(texts, dtype=object)
+        weights = np.vstack([self.lda.transform(self.vectorizer.transform(texts.iloc[lo:lo + chunk_size]))
+                             for lo in range(0, len(texts), chunk_size)] or [np.empty((0, self.lda.n_components))])
+        return weights.argmax(axis=1), weights.max(axis=1)
+
+    def top_words(self, n=10):
+        words = self.vectorizer.get_feature_names_out()
+        return pd.DataFrame({
+            "topic": range(self.lda.n_components),
+            "words": [" ".join(words[np.argsort(row)[::-1][:n]]) for row in self.lda.components_],
+        })
+
+
+def print_history(rows):
+    for row in rows:
+        print(f"topics chunk {row['chunk']:3d}: {row['documents']:6d} docs  fit {row['fit_seconds']:6.2f}s  "
+              f"perplexity {row['perplexity']:9.1f}")
+
+
+if __name__ == "__main__" and "--selftest" in sys.argv:
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    planted = [["pool", "beach", "sunbed", "towel", "swim"], ["breakfast", "coffee", "buffet", "eggs", "bread"],
+               ["noise", "traffic", "street", "loud", "night"], ["checkin", "reception", "desk", "key", "queue"]]
+    truth = rng.integers(0, len(planted), size=12_000)
+    texts = [" ".join(rng.choice(planted[t], size=12)) + " hotel stay" for t in truth]
+    path = os.path.join(tempfile.mkdtemp(), MODEL_FILE)
+
+    model = TopicModel(n_topics=len(planted))
+    print_history(model.update(texts[:8000], chunk_size=2000))
+    model.save(path)
+
+    # A later run: only the new reviews are trained on, everything gets a topic
+    model = TopicModel.load(path)
+    new = model.unseen(texts)
+    assert len(new) == len(set(texts) - set(texts[:8000]))
+    print_history(model.update(new, chunk_size=2000))
+    topic, weight = model.assign(texts)
+    purity = pd.crosstab(topic, truth).max(axis=1).sum() / len(texts)
+    print(model.top_words(5).to_string(index=False))
+    print(f"purity={purity:.3f}  mean weight={weight.mean():.2f}")
+    assert purity > 0.95
+elif __name__ == "__main__":
+    model = TopicModel.load()
+    print(model.top_words().to_string(index=False))
+    print_history(model.history)
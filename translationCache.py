@@ -0,0 +1,146 @@
+# Persistent translation cache for customerInsights.py
+#
+# Reviews are keyed by a hash of their text, so a translation is fetched once and reused
+# across runs and hotels. A local stopword check sends English reviews straight through;
+# only non-English cache misses reach the translation backend.
+# Usage (offline, with the fake backend in fakeTranslator.py):
+#   python translationCache.py --selftest
+
+import hashlib
+import re
+import sqlite3
+import sys
+from collections import Counter
+
+CACHE_FILE = "translations.sqlite"
+TARGET = "en"
+MIN_LENGTH = 5   # shorter texts are not translated (None), as before
+
+# Function words that are common in English reviews and rare in the other review languages
+ENGLISH_WORDS = frozenset("""
+the and was were is are to of for with it this that we our very but not they had have has
+be would from my you there their which what when your been will could should just also
+only really great friendly stay stayed room staff would definitely everything again
+""".split())
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def is_english(text, threshold=0.2):
+    """Cheap language ID: enough English function words and almost no non-ASCII letters."""
+    words = _WORD.findall(text.lower())
+    if len(words) < 3:
+        return False
+    non_ascii = sum(not w.isascii() for w in words)
+    if non_ascii > len(words) * 0.05:
+        return False
+    return sum(w in ENGLISH_WORDS for w in words) >= threshold * len(words)
+
+
+def content_key(text, target=TARGET):
+    return hashlib.sha1(f"{target}\0{text.strip()}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, path=CACHE_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, translated TEXT NOT NULL)")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 900):
+            chunk = keys[i:i + 900]
+            query = f"SELECT key, translated FROM translations WHERE key IN ({','.join('?' * len(chunk))})"
+            found.update(self.conn.execute(query, chunk))
+        return found
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO translations (key, translated) VALUES (?, ?)", items)
+
+    def close(self):
+        self.conn.close()
+
+
+def translate_texts(texts, executor, cache, stats=None):
+    """Translations aligned to texts. English passes through; only uncached other text goes to executor.
+
+    Counts go to stats (a Counter): short, english, hits, misses, failed. Returns
+    (translations, stats, failures). A failed translation keeps the original text and is not
+    cached, so the next run retries it.
+    """
+    stats = Counter() if stats is None else stats
+    texts = list(texts)
+    keys = {}
+    for text in set(t for t in texts if isinstance(t, str) and len(t.strip()) > MIN_LENGTH):
+        if is_english(text):
+            stats["english"] += 1
+        else:
+            keys[text] = content_key(text)
+
+    cached = cache.get_many(keys.values())
+    translated = {text: cached[key] for text, key in keys.items() if key in cached}
+    stats["hits"] += len(translated)
+    misses = [(text, key) for text, key in keys.items() if key not in cached]
+    stats["misses"] += len(misses)
+
+    done, failures = executor.run([text for text, _ in misses]) if misses else ({}, [])
+    cache.put_many([(key, done[text]) for text, key in misses if text in done])
+    translated.update(done)
+    stats["failed"] += len(failures)
+
+    result = []
+    for text in texts:
+        if not isinstance(text, str) or len(text.strip()) <= MIN_LENGTH:
+            stats["short"] += 1
+            result.append(None)
+        else:
+            result.append(translated.get(text, text))
+    return result, stats, failures
+
+
+def print_stats(stats):
+    looked_up = stats["hits"] + stats["misses"]
+    rate = stats["hits"] / looked_up if looked_up else 0.0
+    print(f"Translation: {stats['english']} English skipped, {stats['hits']} cache hits, {stats['misses']} misses "
+          f"({rate:.0%} hit rate), {stats['failed']} failed, {stats['short']} too short")
+
+
+if __name__ == "__main__" and "--selftest" in sys.argv:
+    import os
+    import tempfile
+
+    from fakeTranslator import FakeBackend
+    from translationExecutor import TranslationExecutor
+
+    sample = [
+        "The room was clean and the staff were very friendly.",
+        "La habitación estaba limpia y el personal fue muy amable.",
+        "Das Frühstück war ausgezeichnet, aber das Zimmer war laut.",
+        "La chambre était propre mais le petit-déjeuner était cher.",
+        "La habitación estaba limpia y el personal fue muy amable.",
+        "Ok",
+        None,
+    ]
+    path = os.path.join(tempfile.mkdtemp(), "translations.sqlite")
+
+    backend = FakeBackend(fail_on=[sample[3]])
+    executor = TranslationExecutor(backend, name="fake", workers=2, retries=2, backoff=0.01, max_items=1)
+    first, stats, failures = translate_texts(sample, executor, TranslationCache(path))
+    print_stats(stats)
+    assert first[0] == sample[0] and first[1] == f"[en] {sample[1]}" and first[3] == sample[3]
+    assert first[5] is None and first[6] is None
+    assert backend.calls == 4 and stats["english"] == 1 and stats["failed"] == 1
+    assert failures[0].text == sample[3] and failures[0].attempts == 2
+
+    backend = FakeBackend()
+    executor = TranslationExecutor(backend, name="fake", workers=2)
+    second, stats, failures = translate_texts(sample, executor, TranslationCache(path))
+    print_stats(stats)
+    assert backend.calls == 1 and stats["hits"] == 2 and not failures, "only the failed text should be retried"
+    assert second[3] == f"[en] {sample[3]}"
+    print("selftest ok")
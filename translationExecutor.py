@@ -0,0 +1,109 @@
+# Concurrent batched translation for cache misses
+#
+# Texts are packed into batches bounded by characters and count, sent by a thread pool with a
+# bounded number of batches in flight, rate limited per backend (DomainBudget token bucket, one
+# token per backend call) and retried with jittered exponential backoff. Batches that still fail
+# become Failure records. Batching saves round trips only for backends that translate a list in
+# one request; google_backend does not (see there).
+
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rateBudget import DomainBudget
+
+Failure = namedtuple("Failure", ["text", "attempts", "error"])
+
+MAX_CHARS = 4500   # characters per batch, below the 5000 a single translation request may carry
+MAX_ITEMS = 50
+
+
+def make_batches(texts, max_chars=MAX_CHARS, max_items=MAX_ITEMS):
+    """Greedy packing in input order; a single text longer than max_chars gets its own batch."""
+    batches, batch, size = [], [], 0
+    for text in texts:
+        if batch and (size + len(text) > max_chars or len(batch) >= max_items):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def google_backend(target="en"):
+    """deep_translator's Google translator as a backend for one-text batches.
+
+    deep_translator has no batch endpoint: translate_batch() makes one HTTP request per text.
+    Run it with max_items=1, so each budget token is one request and the speedup comes from
+    the workers alone.
+    """
+    from deep_translator import GoogleTranslator
+
+    translator = GoogleTranslator(source="auto", target=target)
+    return translator.translate_batch
+
+
+class TranslationExecutor:
+    """Run a batch backend (list of texts -> list of translations) over many texts concurrently."""
+
+    def __init__(self, backend, name="google", workers=8, budget=None, retries=3, backoff=1.0,
+                 max_chars=MAX_CHARS, max_items=MAX_ITEMS):
+        self.backend = backend
+        self.name = name
+        self.workers = workers
+        self.budget = budget or DomainBudget(rate=300, per=60.0)  # backend calls (batches) per backend
+        self.retries = retries
+        self.backoff = backoff
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.report = {}
+
+    def _send(self, batch):
+        for attempt in range(self.retries):
+            self.budget.acquire(self.name)
+            try:
+                translated = self.backend(batch)
+                if len(translated) != len(batch):
+                    raise ValueError(f"backend returned {len(translated)} translations for {len(batch)} texts")
+                return dict(zip(batch, translated)), [], attempt
+            except Exception as e:
+                error = repr(e)
+                if attempt + 1 < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        return {}, [Failure(text, self.retries, error) for text in batch], self.retries - 1
+
+    def run(self, texts):
+        """Returns ({text: translation}, [Failure, ...]); report holds throughput figures."""
+        batches = make_batches(texts, self.max_chars, self.max_items)
+        translated, failures, retried = {}, [], 0
+        start = time.monotonic()
+        with ThreadPoolExecutor(self.workers) as pool:
+            queue, in_flight = iter(batches), set()
+            while True:
+                # Backpressure: never more than two batches per worker submitted at once
+                for batch in queue:
+                    in_flight.add(pool.submit(self._send, batch))
+                    if len(in_flight) >= self.workers * 2:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ok, failed, retries = future.result()
+                    translated.update(ok)
+                    failures.extend(failed)
+                    retried += retries
+        elapsed = time.monotonic() - start
+        self.report = {
+            "texts": len(texts),
+            "batches": len(batches),
+            "translated": len(translated),
+            "failed": len(failures),
+            "retries": retried,
+            "elapsed": elapsed,
+            "texts_per_sec": len(texts) / elapsed if elapsed else 0.0,
+        }
+        return translated, failures
@@ -0,0 +1,63 @@
+# Confidence bands for aggregated trends (dataAnalyzer.py's yearly rating line)
+#
+# mean_ci() gives the closed-form t interval from count, sum and sum of squares, which is all
+# the review cube and the entity aggregates keep. bootstrap_ci() is the optional resampling
+# alternative: it draws every bootstrap sample of every group at once as multinomial counts
+# over that group's rating histogram (count and mean rating per rating bin), so its cost
+# depends on the number of groups and bins, not on the number of reviews.
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+CONFIDENCE = 0.95
+N_BOOT = 2000
+
+
+def mean_ci(n, total, total_sq, confidence=CONFIDENCE):
+    """(mean, std, ci_low, ci_high) arrays from per-group count, sum and sum of squares."""
+    n = np.asarray(n, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.asarray(total, dtype=float) / n
+        # Sample variance from the running sums; clipped at 0 against rounding
+        var = np.clip((np.asarray(total_sq, dtype=float) - n * mean ** 2) / (n - 1), 0.0, None)
+        half = stats.t.ppf(0.5 + confidence / 2, n - 1) * np.sqrt(var / n)
+    return mean, np.sqrt(var), mean - half, mean + half
+
+
+def bootstrap_ci(counts, values, confidence=CONFIDENCE, n_boot=N_BOOT, seed=0):
+    """Percentile bootstrap of the mean per group.
+
+    counts and values are (groups, bins) arrays: how many observations fall in each bin and
+    their mean value. Returns (ci_low, ci_high) per group.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    n = counts.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = counts / n[:, None]
+    p = np.nan_to_num(p)
+    rng = np.random.default_rng(seed)
+    # (n_boot, groups, bins) resampled bin counts in one call, then the mean of each resample
+    draws = rng.multinomial(n, p, size=(n_boot, len(n)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (draws * values).sum(axis=2) / n
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail], axis=0)
+    return low, high
+
+
+def trend_bands(cube, by="year", method="analytic", confidence=CONFIDENCE, n_boot=N_BOOT, seed=0):
+    """Mean rating per `by` value with a confidence band, from the review cube (reviewCube.py)."""
+    totals = cube.groupby(by)[["rating_count", "rating_sum", "rating_sum_sq"]].sum()
+    totals = totals[totals["rating_count"] > 0]
+    mean, std, low, high = mean_ci(totals["rating_count"], totals["rating_sum"], totals["rating_sum_sq"], confidence)
+    if method == "bootstrap":
+        bins = cube.groupby([by, "rating_bin"])[["rating_count", "rating_sum"]].sum()
+        counts = bins["rating_count"].unstack(fill_value=0).reindex(totals.index)
+        sums = bins["rating_sum"].unstack(fill_value=0).reindex(totals.index)
+        low, high = bootstrap_ci(counts.to_numpy(), (sums / counts).to_numpy(), confidence, n_boot, seed)
+    elif method != "analytic":
+        raise ValueError(f"unknown confidence interval method: {method}")
+    return pd.DataFrame({"count": totals["rating_count"].to_numpy(), "mean": mean, "std": std,
+                         "ci_low": low, "ci_high": high}, index=totals.index)
@@ -4,16 +4,19 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
-
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException
 import time
 import random
-import pandas as pd
 import os
 import shutil
+import sys
 import ctypes
-import re
+
+from reviewCapture import capture_reviews, enable_network_capture
+from reviewExtractor import SPECS, extract_header, extract_reviews, save_snapshot
+from reviewSink import ReviewSink
+from scrapeCheckpoint import clear_checkpoint, load_checkpoint, save_checkpoint
+from scrapeWaits import LEDGER, Politeness, cards_signature, wait_for_cards, wait_for_cards_change, wait_for_dom_settle
 
 # Prevent Windows from sleeping
 ES_CONTINUOUS = 0x80000000
@@ -22,8 +25,21 @@ ctypes.windll.kernel32.SetThreadExecutionState(ES_CONTINUOUS | ES_SYSTEM_REQUIRE
 
 # --- Global config ---
 MAX_RETRIES = 2
-profile_path = "/tmp/selenium_profile"
-url = "https://www.tripadvisor.com/Hotel_Review-g34439-d2443641-Reviews-Boulan_South_Beach-Miami_Beach_Florida.html"
+profile_path = os.environ.get("SELENIUM_PROFILE", "/tmp/selenium_profile")
+SNAPSHOT_DIR = None  # Set to a folder to keep each page_source for offline re-parsing
+url = sys.argv[1] if len(sys.argv) > 1 else "https://www.tripadvisor.com/Hotel_Review-g34439-d2443641-Reviews-Boulan_South_Beach-Miami_Beach_Florida.html"
+output_file = sys.argv[2] if len(sys.argv) > 2 else "tripadvisor_reviews_Boulan.csv"
+REVIEWS_PER_PAGE = 10
+checkpoint_file = output_file + ".checkpoint.json"
+sink_file = os.path.splitext(output_file)[0] + ".arrows"
+CARD_SELECTOR = SPECS["tripadvisor"]["card"]
+
+# Politeness jitter between actions (seconds); readiness is handled by event-driven waits
+POLITENESS = Politeness(0.5, 1.5, budget=None)
+
+# Read reviews from the JSON payloads the page loads, falling back to HTML when none are found
+CAPTURE_MODE = False
+RECORD_DIR = None  # Set to a folder to record captured payloads for offline replay
 
 def start_driver(profile_dir=None):
     if profile_dir is None:
@@ -44,87 +60,49 @@ def start_driver(profile_dir=None):
     options = Options()
     options.add_argument(f"--user-data-dir={profile_dir}")
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36")
+    if CAPTURE_MODE:
+        enable_network_capture(options)
     return uc.Chrome(service=Service(), options=options), profile_dir
 
 def human_scroll(driver, times=3):
     for _ in range(times):
         driver.execute_script(f"window.scrollBy(0, {random.randint(200, 400)});")
-        time.sleep(random.uniform(1.5, 3))
+        POLITENESS.pause()
 
-def extract_total_rating(soup):
-    rating_div = soup.find("div", {"data-automation": "bubbleRatingValue"})
-    if rating_div:
-        try:
-            return round(float(rating_div.text.strip()) * 2, 1)  # Convert to 10 scale
-        except ValueError:
-            return None
-    return None
-
-def extract_total_reviews(soup):
-    review_count_div = soup.find("div", {"data-automation": "bubbleReviewCount"})
-    if review_count_div:
-        match = re.search(r"([\d,]+)", review_count_div.text)
-        if match:
-            return int(match.group(1).replace(",", ""))
-    return None
-
-def parse_reviews(soup):
-    reviews_data = []
-    review_divs = soup.select("div[class*='JVaPo']")
-    if not review_divs:
-        print("No reviews found with new selector")
-        return []
-
-    for div in review_divs:
-        text_el = div.select_one("span._d._c[data-automation^='reviewText']")
-        review_text = text_el.get_text(strip=True) if text_el else None
-        rating = None
-        title_el = div.select_one("svg[data-automation='bubbleRatingImage'] title")
-        if title_el:
-            m = re.search(r"(\d(?:\.\d)?) of 5 bubbles", title_el.text)
-            if m:
-                rating = float(m.group(1)) * 2
-
-        name_el = div.select_one("a.BMQDV._F.Gv.wSSLS.SwZTJ.FGwzt.ukgoS")
-        traveler_name = name_el.get_text(strip=True) if name_el else None
-
-        title_link = div.select_one("div[data-test-target='review-title'] > div > a")
-        review_title = title_link.get_text(strip=True) if title_link else None
-
-        date_el = div.select_one("div.hDWtV span[title]")
-        review_date = date_el["title"] if date_el else None
-
-        visited_divs = div.select("div.TgEgi div.biGQs._P.fiohW.fOtGX")
-        date_visited = visited_divs[0].get_text(strip=True) if len(visited_divs) > 0 else None
-        trip_type_raw = visited_divs[1].get_text(strip=True) if len(visited_divs) > 1 else None
-        if trip_type_raw == "Friends":
-            traveler_type = "Group"
-        elif trip_type_raw == "Business":
-            traveler_type = "Solo"
-        else:
-            traveler_type = trip_type_raw
-
-        reviews_data.append({
-            "review_text": review_text,
-            "review_rating": rating,
-            "traveler_name": traveler_name,
-            "review_title": review_title,
-            "review_date": review_date,
-            "date_visited": date_visited,
-            "traveler_type": traveler_type
-        })
+def page_url(url, page):
+    # TripAdvisor paginates with an "-orN-" review offset after "-Reviews-"
+    if page <= 1:
+        return url
+    return url.replace("-Reviews-", f"-Reviews-or{(page - 1) * REVIEWS_PER_PAGE}-", 1)
 
+def parse_reviews(html):
+    reviews_data = extract_reviews(html, "tripadvisor")
+    if not reviews_data:
+        print("No reviews found with new selector")
     return reviews_data
 
 # --- Main scraping logic ---
-review_list = []
 current_page = 1
 max_pages = 100
 total_rating, total_reviews = None, None
 
+# --- Resume from checkpoint if a previous run was interrupted ---
+state = load_checkpoint(checkpoint_file)
+if state and state["url"] == url:
+    # Rows written after the last checkpoint are dropped so they are not duplicated
+    sink = ReviewSink(sink_file, "tripadvisor", keep_rows=state["row_count"])
+    current_page = state["last_page"] + 1
+    total_rating, total_reviews = state["total_rating"], state["total_reviews"]
+    print(f"Resuming after page {state['last_page']} with {sink.rows} reviews")
+else:
+    clear_checkpoint(checkpoint_file)
+    sink = ReviewSink(sink_file, "tripadvisor")
+
 driver, profile_dir = start_driver()
 wait = WebDriverWait(driver, 15)
-driver.get(url)
+POLITENESS.request()
+with LEDGER.track("page"):
+    driver.get(page_url(url, current_page))
 human_scroll(driver, times=5)
 wait = WebDriverWait(driver, 15)
 wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.JVaPo.Gi.kQjeB")))
@@ -132,19 +110,37 @@ wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.JVaPo.Gi.kQjeB"
 while current_page <= max_pages:
     for retry in range(MAX_RETRIES):
         try:
-            time.sleep(random.uniform(3, 5))
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-
-            if current_page == 1:
-                total_rating = extract_total_rating(soup)
-                total_reviews = extract_total_reviews(soup)
-
-            reviews = parse_reviews(soup)
+            wait_for_cards(driver, CARD_SELECTOR)
+            wait_for_dom_settle(driver)
+            with LEDGER.track("page"):
+                html = driver.page_source
+            if SNAPSHOT_DIR:
+                with LEDGER.track("io"):
+                    save_snapshot(html, SNAPSHOT_DIR, "tripadvisor", current_page)
+
+            with LEDGER.track("parsing"):
+                if current_page == 1:
+                    header = extract_header(html, "tripadvisor")
+                    total_rating = header["total_rating"]
+                    total_reviews = header["total_reviews"]
+
+                reviews = capture_reviews(driver, "tripadvisor", RECORD_DIR) if CAPTURE_MODE else []
+                if not reviews:
+                    reviews = parse_reviews(html)
             if not reviews:
                 print(f"No reviews found on page {current_page}. Possibly last page.")
                 break  # Safely exit the loop instead of crashing
 
-            review_list.extend(reviews)
+            with LEDGER.track("io"):
+                sink.write_page(reviews)
+                save_checkpoint(checkpoint_file, {
+                    "url": url,
+                    "last_page": current_page,
+                    "next_url": page_url(url, current_page + 1),
+                    "row_count": sink.rows,
+                    "total_rating": total_rating,
+                    "total_reviews": total_reviews,
+                })
             print(f"Scraped {len(reviews)} reviews from page {current_page}")
 
             # Try to find the next page link
@@ -159,10 +155,15 @@ while current_page <= max_pages:
                 break
 
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_page_link)
-            time.sleep(random.uniform(1, 2))
+            POLITENESS.pause()
+            before = cards_signature(driver, CARD_SELECTOR)
+            POLITENESS.request()
             next_page_link.click()
             current_page += 1
-            time.sleep(random.uniform(3, 6))
+            try:
+                wait_for_cards_change(driver, CARD_SELECTOR, before)
+            except TimeoutException:
+                print(f"Page {current_page} cards did not change after click.")
             break
 
         except InvalidSessionIdException:
@@ -173,43 +174,35 @@ while current_page <= max_pages:
                 pass
             driver, profile_dir = start_driver(profile_dir)
             wait = WebDriverWait(driver, 15)
-            driver.get(url)
+            # Jump straight back to the current page
+            POLITENESS.request()
+            with LEDGER.track("page"):
+                driver.get(page_url(url, current_page))
             human_scroll(driver, times=5)
 
-            # Navigate back to current page
-            for page_to_navigate in range(1, current_page):
-                try:
-                    next_page_link = wait.until(EC.element_to_be_clickable(
-                        (By.XPATH, f'//a[@aria-label="{page_to_navigate + 1}"]')
-                    ))
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_page_link)
-                    next_page_link.click()
-                    time.sleep(random.uniform(2, 4))
-                except Exception as e_nav:
-                    print(f"Navigation error while resuming: {e_nav}")
-                    break
-
         except WebDriverException as e:
             print(f"WebDriver error on page {current_page}, attempt {retry + 1}: {e}")
-            time.sleep(2)
+            LEDGER.sleep(2)
 
         except Exception as e:
             print(f"Error on page {current_page}, attempt {retry + 1}: {e}")
-            time.sleep(2)
+            LEDGER.sleep(2)
 
     else:
         print(f"Retry limit reached for page {current_page}. Skipping.")
         current_page += 1  # Go to next page anyway
 
 # Save to CSV
-df = pd.DataFrame(review_list)
-df['total_rating'] = total_rating
-df['total_reviews'] = total_reviews
-df.to_csv("tripadvisor_reviews_Boulan.csv", index=False)
+sink.set_metadata(total_rating=total_rating, total_reviews=total_reviews)
+sink.close()
+with LEDGER.track("io"):
+    sink.export_csv(output_file)
+clear_checkpoint(checkpoint_file)
 
-print(f"Total scraped reviews: {len(review_list)}")
+print(f"Total scraped reviews: {sink.rows}")
 print(f"Total rating (10 scale): {total_rating}")
 print(f"Total reviews count: {total_reviews}")
+LEDGER.report()
 
 driver.quit()
 ctypes.windll.kernel32.SetThreadExecutionState(ES_CONTINUOUS)